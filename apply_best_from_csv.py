@@ -1,60 +1,81 @@
-import csv
+import argparse
 import sys
-from src.bitaxe_safe_overclock import BitAxeSafeOverclock
+from src.bitaxe_safe_overclock import (
+    MINER_IP, BitAxeSafeOverclock, add_selection_arguments, joules_per_th, pareto_frontier,
+    read_results_csv, select_best, selection_criteria
+)
+from src.results_db import ResultsDB
 
-def apply_best_from_csv(csv_filename: str):
-    """Apply best settings from a CSV results file"""
+def apply_best_from_csv(csv_filename: str = None, miner_ip: str = None, db_path: str = None, **criteria):
+    """Apply best settings from a CSV results file, or from every sweep in the database
+
+    criteria select among the stable rows, see rank_settings()
+    (objective, max_power, min_hashrate, max_temperature, weights).
+    With db_path the latest verdict of each point across all sweeps is used.
+    """
     try:
-        # Read CSV file
-        stable_results = []
-        with open(csv_filename, 'r') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                if row['stable'] == 'True':
-                    stable_results.append({
-                        'frequency': int(row['frequency_mhz']),
-                        'core_voltage': int(row['core_voltage_mv']),
-                        'hashrate': float(row['hashrate_ghs']),
-                        'temperature': float(row['temperature_c'])
-                    })
-        
-        if not stable_results:
-            print("❌ No stable results found in CSV file")
+        if db_path:
+            with ResultsDB(db_path) as db:
+                results = db.results(miner_ip or MINER_IP, latest=True)
+            source = db_path
+        else:
+            # Read CSV file
+            results = read_results_csv(csv_filename, miner_ip)
+            source = csv_filename
+
+        if not any(r['stable'] for r in results):
+            print(f"❌ No stable results found in {source}")
             return False
-            
+
         # Find best result
-        best = max(stable_results, key=lambda x: x['hashrate'])
-        
-        print(f"🎯 Best settings from {csv_filename}:")
-        print(f"   Frequency: {best['frequency']}MHz")
-        print(f"   Voltage: {best['core_voltage']}mV")
-        print(f"   Expected: {best['hashrate']:.1f} GH/s @ {best['temperature']:.1f}°C")
-        
+        best = select_best(results, **criteria)
+        if not best:
+            print("❌ No stable results satisfy the selection constraints")
+            return False
+
+        print(f"📈 Pareto frontier ({len(pareto_frontier(results))} points):")
+        for r in pareto_frontier(results):
+            print(f"   {r['frequency_mhz']}MHz @ {r['core_voltage_mv']}mV: {r['hashrate_ghs']:.1f} GH/s, "
+                  f"{r['power_w']:.1f}W, {joules_per_th(r):.1f} J/TH, {r['temperature_c']:.1f}°C")
+
+        print(f"🎯 Best settings from {source}:")
+        print(f"   Frequency: {best['frequency_mhz']}MHz")
+        print(f"   Voltage: {best['core_voltage_mv']}mV")
+        print(f"   Expected: {best['hashrate_ghs']:.1f} GH/s @ {best['temperature_c']:.1f}°C, "
+              f"{best['power_w']:.1f}W ({joules_per_th(best):.1f} J/TH)")
+
         # Confirm with user
         response = input("\nApply these settings? (yes/no): ")
         if response.lower() not in ['yes', 'y']:
             print("Operation cancelled.")
             return False
-            
+
         # Apply settings
-        overclocker = BitAxeSafeOverclock()
-        success = overclocker.apply_settings(best['frequency'], best['core_voltage'])
-        
+        overclocker = BitAxeSafeOverclock(miner_ip)
+        success = overclocker.apply_settings(best['frequency_mhz'], best['core_voltage_mv'])
+
         if success:
             print("✅ Settings applied successfully!")
         else:
             print("❌ Failed to apply settings")
-            
+
         return success
-        
+
     except Exception as e:
         print(f"❌ Error: {e}")
         return False
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python apply_best_from_csv.py <csv_filename>")
-        print("Example: python apply_best_from_csv.py bitaxe_safe_tuning_results_20250910_170544.csv")
+    parser = argparse.ArgumentParser(
+        description='Apply best settings from a CSV results file or the results database',
+        epilog='Example: python apply_best_from_csv.py bitaxe_safe_tuning_results_20250910_170544.csv --max-power 20')
+    parser.add_argument('csv_filename', nargs='?', help='Sweep results CSV')
+    parser.add_argument('--db', default=None, metavar='PATH', help='Use every sweep in the results database instead')
+    parser.add_argument('--ip', default=None, help='IP del BitAxe (default: MINER_IP)')
+    add_selection_arguments(parser)
+    args = parser.parse_args()
+    if not args.csv_filename and not args.db:
+        parser.error('a CSV file or --db is required')
+
+    if not apply_best_from_csv(args.csv_filename, args.ip, args.db, **selection_criteria(args)):
         sys.exit(1)
-        
-    apply_best_from_csv(sys.argv[1])
\ No newline at end of file
@@ -8,7 +8,7 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from bitaxe_safe_overclock import BitAxeSafeOverclock
+from bitaxe_safe_overclock import BitAxeSafeOverclock, add_selection_arguments, selection_criteria
 import argparse
 
 def main():
@@ -16,6 +16,7 @@ def main():
     parser.add_argument('csv_file', help='File CSV con i risultati del sweep')
     parser.add_argument('--ip', default='192.168.1.100', help='IP del BitAxe')
     parser.add_argument('--dry-run', action='store_true', help='Mostra solo le impostazioni senza applicarle')
+    add_selection_arguments(parser)
     
     args = parser.parse_args()
     
@@ -37,7 +38,7 @@ def main():
         print(f"✅ Caricati {len(results)} risultati")
         
         # Trova le migliori impostazioni
-        best_settings = overclock.find_best_settings(results)
+        best_settings = overclock.find_best_settings(results, **selection_criteria(args))
         
         if not best_settings:
             print("⚠️ Nessuna configurazione stabile trovata nei risultati")
@@ -48,7 +49,8 @@ def main():
         print(f"   Voltaggio: {best_settings['voltage']}mV")
         print(f"   Frequenza: {best_settings['frequency']}MHz")
         print(f"   Hashrate: {best_settings['hashrate']:.2f} GH/s")
-        print(f"   Efficienza: {best_settings['efficiency']:.2f} GH/J")
+        print(f"   Potenza: {best_settings['power']:.1f}W")
+        print(f"   Efficienza: {best_settings['efficiency']:.2f} GH/J ({best_settings['joules_per_th']:.1f} J/TH)")
         print(f"   Temperatura: {best_settings['temperature']}°C")
         
         if args.dry_run:
@@ -63,7 +65,7 @@ def main():
             
         # Applica le impostazioni
         print("\n⚡ Applicazione impostazioni...")
-        success = overclock.apply_best_settings(results)
+        success = overclock.apply_best_settings(results, **selection_criteria(args))
         
         if success:
             print("✅ Impostazioni applicate con successo!")
@@ -7,93 +7,134 @@ manualmente quali impostazioni applicare tra quelle migliori.
 import sys
 import os
 import csv
-import time
-from datetime import datetime
+from datetime import datetime, timedelta
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from bitaxe_safe_overclock import BitAxeSafeOverclock, MINER_IP, SAFETY_CONFIG
+from bitaxe_safe_overclock import (
+    BitAxeSafeOverclock, MINER_IP, RESULT_FIELDNAMES, SAFETY_CONFIG,
+    evaluate_stability, joules_per_th, pareto_frontier, rank_settings
+)
 
-def display_top_results(results, top_n=5):
-    """Mostra i migliori risultati ordinati per efficienza"""
-    if not results:
-        print("❌ Nessun risultato disponibile")
+def display_top_results(results, top_n=5, criteria=None):
+    """Mostra i migliori risultati stabili ordinati secondo il criterio di scelta"""
+    ranked = rank_settings(results, **(criteria or {}))
+    if not ranked:
+        print("❌ Nessun risultato stabile che soddisfi i criteri")
         return
     
-    # Ordina per efficienza (GH/W) decrescente
-    sorted_results = sorted(results, key=lambda x: x['efficiency'], reverse=True)
-    
-    print(f"\n🏆 Top {min(top_n, len(sorted_results))} risultati (ordinati per efficienza):")
+    frontier = [id(r) for r in pareto_frontier(results)]
+    objective = (criteria or {}).get('objective') or SAFETY_CONFIG['selection_objective']
+    print(f"\n🏆 Top {min(top_n, len(ranked))} risultati (criterio: {objective}, ◆ = frontiera di Pareto):")
     print("=" * 80)
     
-    for i, result in enumerate(sorted_results[:top_n], 1):
-        status = "✅ STABILE" if result['stable'] else "❌ INSTABILE"
+    for i, result in enumerate(ranked[:top_n], 1):
+        pareto = "◆" if id(result) in frontier else " "
         vr_temp = result.get('vr_temperature', 'N/A')
-        print(f"{i:2d}. {result['frequency']:3d}MHz @ {result['voltage']:4d}mV | "
-              f"{result['hashrate']:6.2f} GH/s | {result['temperature']:5.1f}°C | "
-              f"{result['power']:5.1f}W | {result['efficiency']:6.2f} GH/W | "
-              f"VR: {vr_temp}°C | {status}")
+        print(f"{i:2d}. {pareto} {result['frequency_mhz']:3d}MHz @ {result['core_voltage_mv']:4d}mV | "
+              f"{result['hashrate_ghs']:6.2f} GH/s | {result['temperature_c']:5.1f}°C | "
+              f"{result['power_w']:5.1f}W | {joules_per_th(result):5.1f} J/TH | "
+              f"VR: {vr_temp}°C")
+
+def ask_selection_criteria(criteria):
+    """Chiede all'utente criterio e vincoli di scelta (invio = valore attuale)"""
+    objective = input(f"Criterio (hashrate/efficiency/weighted) [{criteria.get('objective') or SAFETY_CONFIG['selection_objective']}]: ").strip()
+    if objective in ('hashrate', 'efficiency', 'weighted'):
+        criteria['objective'] = objective
+    for key, label in (('max_power', 'Potenza massima (W)'), ('min_hashrate', 'Hashrate minimo (GH/s)'),
+                       ('max_temperature', 'Temperatura ASIC massima (°C)')):
+        value = input(f"{label}, '-' per nessun limite [{criteria.get(key) or '-'}]: ").strip()
+        if value == '-':
+            criteria[key] = None
+        elif value:
+            try:
+                criteria[key] = float(value)
+            except ValueError:
+                print(f"❌ Valore non valido per {label}")
+    return criteria
+
+def format_eta(seconds):
+    """ETA leggibile con orario di fine previsto"""
+    finish = datetime.now() + timedelta(seconds=seconds)
+    return f"~{seconds / 60:.0f} min (fine ~{finish:%H:%M})"
 
 def run_custom_sweep(overclock, voltage_range, frequency_range, test_duration):
-    """Esegue uno sweep personalizzato frequency-first e restituisce i risultati"""
+    """Esegue uno sweep personalizzato sulla griglia e restituisce i risultati
+    
+    L'ordine dei test è scelto dal TestPlanner (SAFETY_CONFIG['test_order']) per
+    ridurre i tempi di assestamento; l'ETA si aggiorna con i tempi misurati.
+    """
     results = []
     voltage_min, voltage_max, voltage_step = voltage_range
     freq_min, freq_max, freq_step = frequency_range
     
-    print(f"\n🚀 Avvio sweep frequency-first...")
-    print(f"📊 Range: {voltage_min}-{voltage_max}mV, {freq_min}-{freq_max}MHz")
+    points = [(freq, voltage)
+              for voltage in range(voltage_min, voltage_max + 1, voltage_step)
+              for freq in range(freq_min, freq_max + 1, freq_step)]
+    planner = overclock.planner
+    if overclock.original_settings:
+        planner.position = (overclock.original_settings['frequency'], overclock.original_settings['core_voltage'])
+    ordered = planner.order(points, planner.position)
+    total_tests = len(ordered)
     
-    total_tests = len(range(voltage_min, voltage_max + 1, voltage_step)) * len(range(freq_min, freq_max + 1, freq_step))
-    current_test = 0
+    print(f"\n🚀 Avvio sweep ({SAFETY_CONFIG['test_order']})...")
+    print(f"📊 Range: {voltage_min}-{voltage_max}mV, {freq_min}-{freq_max}MHz")
+    print(f"⏳ Durata prevista: {total_tests} test, {format_eta(planner.cost(ordered, planner.position))}")
     
-    # LOGICA CORRETTA: Prima voltaggio, poi frequenza (frequency-first)
-    for voltage in range(voltage_min, voltage_max + 1, voltage_step):
-        print(f"\n⚡ === Testando {voltage}mV - Sweep frequenze {freq_min}-{freq_max}MHz ===")  # ✅ CORRETTO
+    for current_test, (freq, voltage) in enumerate(ordered, 1):
+        print(f"\n🎯 Test {current_test}/{total_tests}: {freq}MHz @ {voltage}mV")
+        started = overclock.clock.monotonic()
         
-        for freq in range(freq_min, freq_max + 1, freq_step):
-            current_test += 1
-            print(f"\n🎯 Test {current_test}/{total_tests}: {freq}MHz @ {voltage}mV")
-            
-            # Applica le impostazioni
-            if not overclock.apply_settings(freq, voltage):
-                print(f"❌ Errore applicazione {freq}MHz @ {voltage}mV")
-                continue
+        # Applica le impostazioni
+        if not overclock.apply_settings(freq, voltage):
+            print(f"❌ Errore applicazione {freq}MHz @ {voltage}mV")
+            continue
+        
+        # Test di stabilità (include l'attesa di stabilizzazione)
+        stable, hashrates, mean_hashrate = overclock.test_stability(freq, voltage)
+        if stable is None:
+            print(f"❌ Nessuna risposta dal miner durante il test di {freq}MHz @ {voltage}mV")
+            continue
+        
+        # Ottieni stato finale
+        state = overclock.get_current_state()
+        if state:
+            # Calcola efficienza
+            efficiency = mean_hashrate / (state.power if state.power > 0 else 1)
+            cv = evaluate_stability(hashrates)[2] if len(hashrates) >= 2 else 0.0
             
-            # Attendi stabilizzazione
-            print(f"⏱️ Attesa stabilizzazione {SAFETY_CONFIG['settle_time']}s...")
-            time.sleep(SAFETY_CONFIG['settle_time'])
+            # Salva risultato (stesso formato dei file risultati dello sweep)
+            result = {
+                'timestamp': datetime.now().isoformat(),
+                'frequency_mhz': freq,
+                'core_voltage_mv': voltage,
+                'hashrate_ghs': mean_hashrate,
+                'temperature_c': state.temperature,
+                'vr_temperature': state.vr_temperature,
+                'power_w': state.power,
+                'efficiency': efficiency,
+                'stable': stable,
+                'cv': cv,
+                'notes': 'interactive',
+                'samples': len(hashrates),
+                'settle_time_s': overclock.last_settle_time,
+                'shares_accepted': overclock.last_shares.accepted,
+                'shares_rejected': overclock.last_shares.rejected,
+                'share_hashrate_ghs': overclock.last_shares.hashrate
+            }
             
-            # Test di stabilità
-            stable, hashrates, mean_hashrate = overclock.test_stability(freq, voltage)
+            results.append(result)
             
-            # Ottieni stato finale
-            state = overclock.get_current_state()
-            if state:
-                # Calcola efficienza
-                efficiency = mean_hashrate / (state.power if state.power > 0 else 1)
-                
-                # Salva risultato
-                result = {
-                    'frequency': freq,
-                    'core_voltage': voltage,
-                    'hash_rate': mean_hashrate,
-                    'temperature': state.temperature,
-                    'power': state.power,
-                    'efficiency': efficiency,
-                    'stable': stable,
-                    'samples': len(hashrates)
-                }
-                
-                results.append(result)
-                
-                status = "✅ STABILE" if stable else "❌ INSTABILE"
-                print(f"📈 Risultato: {mean_hashrate:.2f} GH/s, {state.temperature:.1f}°C, {efficiency:.2f} GH/J - {status}")
-                
-                # Se stabile, continua con frequenza successiva
-                # Se instabile, probabilmente le frequenze successive falliranno anche
-                if not stable:
-                    print(f"⚠️ {freq}MHz instabile @ {voltage}mV - frequenze superiori probabilmente falliranno")
-            else:
-                print("❌ Errore lettura stato")
+            status = "✅ STABILE" if stable else "❌ INSTABILE"
+            print(f"📈 Risultato: {mean_hashrate:.2f} GH/s, {state.temperature:.1f}°C, {efficiency:.2f} GH/J - {status}")
+        else:
+            print("❌ Errore lettura stato")
+        
+        # Aggiorna il modello con i tempi reali e ricalcola l'ETA
+        planner.fit(results)
+        planner.observe(planner.position, (freq, voltage), overclock.last_settle_time,
+                        overclock.clock.monotonic() - started)
+        remaining = ordered[current_test:]
+        print(f"⏳ Restano {len(remaining)} test, {format_eta(planner.cost(remaining, planner.position))}")
     
     return results
 
@@ -144,8 +185,9 @@ def main():
             return 1
         
         # Menu interattivo
+        criteria = {}
         while True:
-            display_top_results(results)
+            display_top_results(results, criteria=criteria)
             
             print("\n🎯 Opzioni disponibili:")
             print("1. Applica le migliori impostazioni")
@@ -153,13 +195,17 @@ def main():
             print("3. Mostra tutti i risultati")
             print("4. Salva risultati su CSV")
             print("5. Ripristina impostazioni originali")
-            print("6. Esci")
+            print("6. Cambia criterio di scelta (hashrate, J/TH, pesato, vincoli)")
+            print("7. Esci")
             
-            choice = input("\nScegli un'opzione (1-6): ").strip()
+            choice = input("\nScegli un'opzione (1-7): ").strip()
             
             if choice == "1":
                 # Applica le migliori impostazioni (prima in classifica)
-                best = sorted(results, key=lambda x: x['efficiency'], reverse=True)[0]
+                best = overclock.find_best_settings(results, **criteria)
+                if not best:
+                    print("❌ Nessuna impostazione stabile soddisfa i criteri")
+                    continue
                 print(f"\n🚀 Applicando: {best['frequency']}MHz @ {best['core_voltage']}mV")
                 if overclock.apply_settings(best['frequency'], best['core_voltage']):
                     print("✅ Impostazioni applicate con successo!")
@@ -171,11 +217,11 @@ def main():
                 # Scegli dalle top 10
                 try:
                     rank = int(input("Inserisci il rank da applicare (1-10): "))
-                    if 1 <= rank <= min(10, len(results)):
-                        sorted_results = sorted(results, key=lambda x: x['efficiency'], reverse=True)
+                    sorted_results = rank_settings(results, **criteria)
+                    if 1 <= rank <= min(10, len(sorted_results)):
                         selected = sorted_results[rank-1]
-                        print(f"\n🚀 Applicando: {selected['frequency']}MHz @ {selected['core_voltage']}mV")
-                        if overclock.apply_settings(selected['frequency'], selected['core_voltage']):
+                        print(f"\n🚀 Applicando: {selected['frequency_mhz']}MHz @ {selected['core_voltage_mv']}mV")
+                        if overclock.apply_settings(selected['frequency_mhz'], selected['core_voltage_mv']):
                             print("✅ Impostazioni applicate con successo!")
                             break
                         else:
@@ -187,7 +233,7 @@ def main():
             
             elif choice == "3":
                 # Mostra tutti i risultati
-                display_top_results(results, len(results))
+                display_top_results(results, len(results), criteria)
             
             elif choice == "4":
                 # Salva risultati
@@ -195,24 +241,11 @@ def main():
                 filename = f"interactive_sweep_results_{timestamp}.csv"
                 
                 with open(filename, 'w', newline='') as csvfile:
-                    fieldnames = ['timestamp', 'frequency', 'core_voltage', 'temperature', 'vr_temperature', 
-                                'hash_rate', 'power', 'efficiency', 'shares_accepted', 'shares_rejected']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+                    # Colonne dello sweep: il file è leggibile da apply_best_from_csv.py
+                    fieldnames = RESULT_FIELDNAMES + ['vr_temperature', 'efficiency']
+                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames, extrasaction='ignore')
                     writer.writeheader()
-                    
-                    for result in results:
-                        writer.writerow({
-                            'timestamp': datetime.now().isoformat(),
-                            'frequency': result['frequency'],
-                            'core_voltage': result['core_voltage'],
-                            'temperature': result['temperature'],
-                            'vr_temperature': result['vr_temperature'],
-                            'hash_rate': result['hash_rate'],
-                            'power': result['power'],
-                            'efficiency': result['efficiency'],
-                            'shares_accepted': result['shares_accepted'],
-                            'shares_rejected': result['shares_rejected']
-                        })
+                    writer.writerows(results)
                 
                 print(f"✅ Risultati salvati in: {filename}")
             
@@ -225,6 +258,9 @@ def main():
                     print("❌ Errore nel ripristino delle impostazioni")
             
             elif choice == "6":
+                criteria = ask_selection_criteria(criteria)
+            
+            elif choice == "7":
                 print("👋 Uscita...")
                 break
             
@@ -8,18 +8,29 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from bitaxe_safe_overclock import BitAxeSafeOverclock
-import time
+from bitaxe_safe_overclock import MINER_IP, BitAxeSafeOverclock
+from results_db import ResultsDB
+from rollups import RollupPipeline
+from telemetry_store import TelemetryWriter
+import contextlib
+import threading
 import signal
 import csv
-from datetime import datetime
 
 class PerformanceMonitor:
-    def __init__(self, miner_ip, log_file=None):
+    def __init__(self, miner_ip=None, log_file=None, clock=None, db=None, store=None):
         self.miner_ip = miner_ip  # Salviamo l'IP per riferimento
-        self.overclock = BitAxeSafeOverclock()  # Rimuovo il parametro miner_ip
+        self.overclock = BitAxeSafeOverclock(miner_ip, clock=clock)
+        self.clock = self.overclock.clock
+        self.db = db  # Opzionale: ResultsDB, ogni campione anche nella tabella telemetry
+        # Con il database si mantengono anche gli aggregati 1m/1h/1d, con la loro retention
+        self.rollups = RollupPipeline(db, clock=self.clock) if db else None
+        self.store = store  # Opzionale: TelemetryWriter (archivio binario a colonne)
         self.running = True
-        self.log_file = log_file or f"performance_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        self.wake = threading.Event()  # Interrompe l'attesa tra due campioni
+        # Con l'archivio binario il log CSV è scritto solo se richiesto esplicitamente
+        self.log_file = log_file or (None if store else
+                                     f"performance_log_{self.clock.now().strftime('%Y%m%d_%H%M%S')}.csv")
         
         # Gestione segnali per uscita pulita
         signal.signal(signal.SIGINT, self.signal_handler)
@@ -28,35 +39,44 @@ class PerformanceMonitor:
     def signal_handler(self, signum, frame):
         print("\n🛑 Arresto monitoraggio...")
         self.running = False
+        self.wake.set()
         
     def monitor(self, interval=60, duration=None):
         """Monitora le performance per un periodo specificato"""
         print(f"📊 Avvio monitoraggio performance")
-        print(f"📝 Log file: {self.log_file}")
+        if self.log_file:
+            print(f"📝 Log file: {self.log_file}")
+        if self.store:
+            print(f"📦 Telemetry store: {self.store.path}")
         print(f"⏱️ Intervallo: {interval} secondi")
         if duration:
             print(f"⏰ Durata: {duration} secondi")
         print("\nPremi Ctrl+C per fermare il monitoraggio\n")
         
-        start_time = time.time()
+        start_time = self.clock.monotonic()
         
         # Inizializza file CSV
-        with open(self.log_file, 'w', newline='') as csvfile:
+        with (open(self.log_file, 'w', newline='') if self.log_file else contextlib.nullcontext()) as csvfile:
             fieldnames = ['timestamp', 'voltage', 'frequency', 'hashrate', 'temperature', 'power', 'efficiency']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
+            writer = csv.DictWriter(csvfile, fieldnames=fieldnames) if csvfile else None
+            if writer:
+                writer.writeheader()
             
             while self.running:
                 try:
                     # Ottieni stato attuale
                     state = self.overclock.get_current_state()
+                    if state is None:
+                        print("❌ Miner non raggiungibile, nuovo tentativo al prossimo intervallo")
+                        self.clock.sleep(interval, lambda: not self.running, self.wake)
+                        continue
                     
                     # Calcola efficienza
                     efficiency = state.hash_rate / state.power if state.power > 0 else 0  # Cambiato da state.hashrate
                     
                     # Log dati
                     log_entry = {
-                        'timestamp': datetime.now().isoformat(),
+                        'timestamp': self.clock.now().isoformat(),
                         'voltage': state.core_voltage,  # Cambiato da state.voltage
                         'frequency': state.frequency,
                         'hashrate': state.hash_rate,  # Cambiato da state.hashrate
@@ -65,11 +85,17 @@ class PerformanceMonitor:
                         'efficiency': efficiency
                     }
                     
-                    writer.writerow(log_entry)
-                    csvfile.flush()
+                    if writer:
+                        writer.writerow(log_entry)
+                        csvfile.flush()
+                    if self.store:
+                        self.store.append(state)
+                    if self.db:
+                        self.db.add_sample(self.overclock.miner_ip, state)
+                        self.rollups.add(self.overclock.miner_ip, state)
                     
                     # Mostra stato corrente
-                    print(f"⏰ {datetime.now().strftime('%H:%M:%S')} | "
+                    print(f"⏰ {self.clock.now().strftime('%H:%M:%S')} | "
                           f"🔋 {state.core_voltage}mV | "  # Cambiato da state.voltage
                           f"⚡ {state.frequency}MHz | "
                           f"⛏️ {state.hash_rate:.2f}GH/s | "  # Cambiato da state.hashrate
@@ -82,31 +108,54 @@ class PerformanceMonitor:
                         print(f"🚨 ATTENZIONE: Temperatura alta ({state.temperature}°C)!")
                         
                     # Controllo durata
-                    if duration and (time.time() - start_time) >= duration:
+                    if duration and (self.clock.monotonic() - start_time) >= duration:
                         print(f"\n⏰ Durata monitoraggio completata ({duration}s)")
                         break
                         
-                    time.sleep(interval)
+                    self.clock.sleep(interval, lambda: not self.running, self.wake)
                     
                 except Exception as e:
                     print(f"❌ Errore durante il monitoraggio: {e}")
-                    time.sleep(interval)
+                    self.clock.sleep(interval, lambda: not self.running, self.wake)
                     
-        print(f"\n📊 Monitoraggio completato. Log salvato in: {self.log_file}")
+        history = self.overclock.history
+        if len(history):
+            hashrate = history.stats('hash_rate')
+            print(f"\n📈 Ultimi {len(history)} campioni: ⛏️ media {hashrate.mean:.2f}GH/s "
+                  f"(min {hashrate.min:.2f}, max {hashrate.max:.2f}) | "
+                  f"🌡️ max {history.stats('temperature').max:.1f}°C")
+        if self.db:
+            self.rollups.flush()
+            self.db.flush()
+        if self.store:
+            self.store.flush()
+        print(f"\n📊 Monitoraggio completato. Log salvato in: {self.log_file or self.store.path}")
 
 def main():
     import argparse
     
     parser = argparse.ArgumentParser(description='Monitora le performance del BitAxe')
-    parser.add_argument('--ip', default='192.168.1.100', help='IP del BitAxe')
+    parser.add_argument('--ip', help='IP del BitAxe (default: MINER_IP)')
     parser.add_argument('--interval', type=int, default=60, help='Intervallo di monitoraggio in secondi')
     parser.add_argument('--duration', type=int, help='Durata totale in secondi (infinito se non specificato)')
     parser.add_argument('--log-file', help='File di log personalizzato')
+    parser.add_argument('--db', metavar='PATH', help='Salva la telemetria anche nel database risultati')
+    parser.add_argument('--store', metavar='PATH',
+                        help='Archivio telemetria binario a colonne (al posto del CSV, salvo --log-file)')
+    parser.add_argument('--compress', action='store_true', help='Chunk dell\'archivio compressi con zlib')
     
     args = parser.parse_args()
     
-    monitor = PerformanceMonitor(args.ip, args.log_file)
-    monitor.monitor(args.interval, args.duration)
+    db = ResultsDB(args.db) if args.db else None
+    store = TelemetryWriter(args.store, args.ip or MINER_IP, compress=args.compress or None) if args.store else None
+    try:
+        monitor = PerformanceMonitor(args.ip, args.log_file, db=db, store=store)
+        monitor.monitor(args.interval, args.duration)
+    finally:
+        if store:
+            store.close()
+        if db:
+            db.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
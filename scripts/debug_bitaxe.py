@@ -1,11 +1,17 @@
+import sys
+import os
 import requests
 import json
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from bitaxe_safe_overclock import get_transport
 
 MINER_IP = "192.168.1.97"
 
 def test_patch_request():
     """Test PATCH request with detailed logging"""
-    url = f"http://{MINER_IP}/api/system"
+    transport = get_transport(MINER_IP)
+    url = f"{transport.base_url}/api/system"
     
     # Test frequency setting
     freq_data = {"frequency": 400}
@@ -13,7 +19,7 @@ def test_patch_request():
     print(f"Data: {json.dumps(freq_data)}")
     
     try:
-        response = requests.patch(url, json=freq_data, timeout=10)
+        response = transport.patch("/api/system", data=freq_data)
         print(f"Status Code: {response.status_code}")
         print(f"Response Headers: {dict(response.headers)}")
         print(f"Response Text: '{response.text}'")
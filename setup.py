@@ -28,6 +28,9 @@ setup(
     install_requires=[
         "requests>=2.28.0",
     ],
+    extras_require={
+        "analysis": ["numpy>=1.23"],
+    },
     entry_points={
         "console_scripts": [
             "bitaxe-overclock=src.bitaxe_safe_overclock:main",
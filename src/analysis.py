@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Vectorized analysis of results and performance logs
+Streams sweep results CSVs and performance logs (globs, .gz) in chunks
+into NumPy arrays and reduces them to per-(frequency, voltage) aggregates:
+mean hashrate/power/temperature, efficiency, CV and, for sweep results,
+the latest verdict. Rankings over a whole archive use the same criteria
+as rank_settings(). Many files are parsed in a process pool.
+
+Requires NumPy: pip install bitaxe-safe-overclock[analysis]
+
+License: MIT
+"""
+
+import csv
+import glob
+import gzip
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # Dipendenza opzionale (extra 'analysis')
+    np = None
+
+try:
+    from .bitaxe_safe_overclock import ANALYSIS_CONFIG, SAFETY_CONFIG, add_selection_arguments, selection_criteria
+except ImportError:
+    from bitaxe_safe_overclock import ANALYSIS_CONFIG, SAFETY_CONFIG, add_selection_arguments, selection_criteria
+
+logger = logging.getLogger(__name__)
+
+# Colonna canonica -> intestazione, per tipo di file
+RESULT_COLUMNS = {
+    'timestamp': 'timestamp', 'frequency': 'frequency_mhz', 'voltage': 'core_voltage_mv',
+    'hashrate': 'hashrate_ghs', 'power': 'power_w', 'temperature': 'temperature_c',
+    'stable': 'stable', 'cv': 'cv',
+}
+# I log non hanno verdetti: il timestamp non serve
+LOG_COLUMNS = {
+    'frequency': 'frequency', 'voltage': 'voltage',
+    'hashrate': 'hashrate', 'power': 'power', 'temperature': 'temperature',
+}
+KINDS = ('results', 'telemetry')
+KEY_SCALE = 100000                      # chiave = frequenza * KEY_SCALE + tensione
+
+# Campi dei parziali: sommati, massimizzati, o presi dalla riga più recente
+SUM_FIELDS = ('rows', 'hashrate', 'hashrate_sq', 'power', 'temperature', 'cv', 'stable_tests')
+MAX_FIELDS = ('temperature_max',)
+LATEST_FIELDS = ('last_time', 'last_stable')
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("analysis.py requires NumPy: pip install bitaxe-safe-overclock[analysis]")
+
+
+def expand_paths(patterns: Sequence[str]) -> List[str]:
+    """Files matching the glob patterns (** recursive), each once, sorted"""
+    paths = set()
+    for pattern in patterns:
+        matches = glob.glob(pattern, recursive=True)
+        paths.update(matches if matches else [pattern] if os.path.isfile(pattern) else [])
+    return sorted(paths)
+
+
+def _open(path: str):
+    return gzip.open(path, 'rt', newline='') if path.endswith('.gz') else open(path, newline='')
+
+
+def _floats(values: Sequence[str]) -> 'np.ndarray':
+    """Strings to float64 in one call; empty or malformed cells become NaN"""
+    try:
+        return np.array(values, dtype=np.float64)
+    except ValueError:
+        result = np.full(len(values), np.nan)
+        for i, value in enumerate(values):
+            try:
+                result[i] = float(value)
+            except ValueError:
+                pass
+        return result
+
+
+def _epochs(values: Sequence[str]) -> 'np.ndarray':
+    """ISO timestamps to epoch seconds (NaN if missing)"""
+    try:
+        times = np.array(values, dtype='datetime64[us]')
+    except ValueError:
+        times = np.array([_datetime64(value) for value in values], dtype='datetime64[us]')
+    seconds = times.astype(np.int64) / 1e6
+    seconds[np.isnat(times)] = np.nan
+    return seconds
+
+
+def _datetime64(value: str):
+    try:
+        return np.datetime64(value, 'us')
+    except ValueError:
+        return np.datetime64('NaT')
+
+
+TEXT_COLUMNS = ('timestamp', 'stable', 'miner_ip')
+
+
+def _parse_lines(lines: List[str], index: Dict[str, int]) -> Dict[str, 'np.ndarray']:
+    """Columns of a chunk of CSV lines with np.loadtxt (C parser); ValueError on empty or malformed cells"""
+    chunk = {}
+    for names, dtype in (([n for n in index if n not in TEXT_COLUMNS], np.float64),
+                         ([n for n in index if n in TEXT_COLUMNS], str)):
+        if names:
+            values = np.loadtxt(lines, delimiter=',', quotechar='"', dtype=dtype, ndmin=2,
+                                usecols=[index[n] for n in names])
+            chunk.update((name, values[:, j]) for j, name in enumerate(names))
+    return chunk
+
+
+def _parse_rows(lines: List[str], index: Dict[str, int], width: int) -> Dict[str, 'np.ndarray']:
+    """Slow path for chunks with empty or malformed cells: csv module, NaN for bad numbers"""
+    rows = [row for row in csv.reader(lines) if len(row) == width]
+    return {name: np.array([row[i] for row in rows]) if name in TEXT_COLUMNS
+            else _floats([row[i] for row in rows]) for name, i in index.items()}
+
+
+def iter_chunks(path: str, chunk_rows: int = None,
+                miner_ip: str = None) -> Iterator[Tuple[str, Dict[str, 'np.ndarray']]]:
+    """(kind, columns) for each chunk of a results CSV or performance log
+
+    kind is 'results' or 'telemetry'; files of another type yield nothing.
+    Fleet CSV rows of other miners are skipped when miner_ip is given.
+    """
+    _require_numpy()
+    chunk_rows = chunk_rows or ANALYSIS_CONFIG['chunk_rows']
+    with _open(path) as csvfile:
+        header = next(csv.reader([csvfile.readline()]), [])
+        if 'frequency_mhz' in header:
+            kind, columns = 'results', RESULT_COLUMNS
+        elif 'hashrate' in header and 'voltage' in header:
+            kind, columns = 'telemetry', LOG_COLUMNS
+        else:
+            logger.warning(f"Skipping {path}: not a results file or performance log")
+            return
+        if miner_ip and 'miner_ip' in header:
+            columns = {**columns, 'miner_ip': 'miner_ip'}
+        index = {name: header.index(column) for name, column in columns.items() if column in header}
+        while True:
+            lines = list(islice(csvfile, chunk_rows))
+            if not lines:
+                break
+            try:
+                chunk = _parse_lines(lines, index)
+            except ValueError:
+                chunk = _parse_rows(lines, index, len(header))
+            if 'timestamp' in chunk:
+                chunk['timestamp'] = _epochs(chunk['timestamp'])
+            if 'stable' in chunk:
+                chunk['stable'] = chunk['stable'] == 'True'
+            keep = ~(np.isnan(chunk['frequency']) | np.isnan(chunk['voltage']) | np.isnan(chunk['hashrate']))
+            if 'miner_ip' in chunk:
+                ips = chunk.pop('miner_ip')
+                keep &= (ips == miner_ip) | (ips == '')
+            yield kind, {name: values[keep] for name, values in chunk.items()}
+
+
+def _group(keys: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray', int]:
+    unique, inverse = np.unique(keys, return_inverse=True)
+    return unique, inverse.ravel(), len(unique)
+
+
+def _latest(inverse: 'np.ndarray', counts: 'np.ndarray', times: 'np.ndarray') -> 'np.ndarray':
+    """Index of the most recent row of each group (later rows win ties)"""
+    order = np.lexsort((np.arange(len(times)), np.nan_to_num(times, nan=-np.inf), inverse))
+    return order[np.cumsum(counts) - 1]
+
+
+def reduce_chunk(chunk: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Per-setting partial aggregates of one chunk (mergeable with merge_partials)"""
+    keys = chunk['frequency'].astype(np.int64) * KEY_SCALE + chunk['voltage'].astype(np.int64)
+    unique, inverse, n = _group(keys)
+    rows = np.bincount(inverse, minlength=n)
+    total = lambda values: np.bincount(inverse, weights=np.nan_to_num(values), minlength=n)
+    hashrate = chunk['hashrate']
+    partial = {
+        'key': unique,
+        'rows': rows.astype(np.float64),
+        'hashrate': total(hashrate),
+        'hashrate_sq': total(hashrate * hashrate),
+        'power': total(chunk.get('power', np.zeros(len(keys)))),
+        'temperature': total(chunk.get('temperature', np.zeros(len(keys)))),
+        'cv': total(chunk.get('cv', np.zeros(len(keys)))),
+        'stable_tests': total(chunk.get('stable', np.zeros(len(keys))).astype(np.float64)),
+        'temperature_max': np.full(n, -np.inf),
+    }
+    np.maximum.at(partial['temperature_max'], inverse, np.nan_to_num(chunk.get('temperature', np.zeros(len(keys))),
+                                                                     nan=-np.inf))
+    times = chunk.get('timestamp', np.full(len(keys), np.nan))
+    latest = _latest(inverse, rows, times)
+    partial['last_time'] = np.nan_to_num(times[latest], nan=-np.inf)
+    partial['last_stable'] = chunk.get('stable', np.zeros(len(keys), dtype=bool))[latest].astype(np.float64)
+    return partial
+
+
+def merge_partials(partials: List[Dict[str, 'np.ndarray']]) -> Optional[Dict[str, 'np.ndarray']]:
+    """Combine partial aggregates of the same kind; None if there are none"""
+    partials = [p for p in partials if p is not None]
+    if len(partials) <= 1:
+        return partials[0] if partials else None
+    stacked = {name: np.concatenate([p[name] for p in partials]) for name in partials[0]}
+    unique, inverse, n = _group(stacked['key'])
+    merged = {'key': unique}
+    for name in SUM_FIELDS:
+        merged[name] = np.bincount(inverse, weights=stacked[name], minlength=n)
+    for name in MAX_FIELDS:
+        merged[name] = np.full(n, -np.inf)
+        np.maximum.at(merged[name], inverse, stacked[name])
+    latest = _latest(inverse, np.bincount(inverse, minlength=n), stacked['last_time'])
+    for name in LATEST_FIELDS:
+        merged[name] = stacked[name][latest]
+    return merged
+
+
+def analyze_file(path: str, chunk_rows: int = None, miner_ip: str = None) -> Dict[str, Optional[Dict]]:
+    """Partial aggregates of one file, by kind; chunks are merged as they are read"""
+    partials = dict.fromkeys(KINDS)
+    for kind, chunk in iter_chunks(path, chunk_rows, miner_ip):
+        if len(chunk['frequency']):
+            partials[kind] = merge_partials([partials[kind], reduce_chunk(chunk)])
+    return partials
+
+
+def settings_table(kind: str, partial: Dict[str, 'np.ndarray']) -> Dict[str, 'np.ndarray']:
+    """Per-setting columns from merged partials
+
+    Both kinds: frequency_mhz, core_voltage_mv, rows, hashrate_ghs, hashrate_std,
+    power_w, temperature_c, temperature_max, joules_per_th and cv. For sweep
+    results cv is the mean stability-test CV and the table adds stable_tests
+    and stable (verdict of the most recent test); for performance logs cv is
+    the sample CV of the hashrate.
+    """
+    rows = partial['rows']
+    hashrate = partial['hashrate'] / rows
+    std = np.sqrt(np.maximum(partial['hashrate_sq'] / rows - hashrate ** 2, 0.0))
+    power = partial['power'] / rows
+    with np.errstate(divide='ignore', invalid='ignore'):
+        joules = np.where(hashrate > 0, power / hashrate * 1000, np.inf)
+        sample_cv = np.where(hashrate > 0, std / hashrate, 0.0)
+    table = {
+        'frequency_mhz': partial['key'] // KEY_SCALE,
+        'core_voltage_mv': partial['key'] % KEY_SCALE,
+        'rows': rows.astype(np.int64),
+        'hashrate_ghs': hashrate,
+        'hashrate_std': std,
+        'power_w': power,
+        'temperature_c': partial['temperature'] / rows,
+        'temperature_max': partial['temperature_max'],
+        'joules_per_th': joules,
+    }
+    if kind == 'results':
+        table['cv'] = partial['cv'] / rows
+        table['stable_tests'] = partial['stable_tests'].astype(np.int64)
+        table['stable'] = partial['last_stable'] > 0
+    else:
+        table['cv'] = sample_cv
+    return table
+
+
+def analyze(patterns: Sequence[str], chunk_rows: int = None, miner_ip: str = None,
+            processes: int = None) -> Dict[str, Dict[str, 'np.ndarray']]:
+    """Per-setting tables ('results', 'telemetry') over every file matching the patterns
+
+    Files are parsed in a process pool when there are at least
+    ANALYSIS_CONFIG['pool_min_files'] of them (processes=1 disables it).
+    """
+    _require_numpy()
+    paths = expand_paths(patterns)
+    if processes != 1 and len(paths) >= ANALYSIS_CONFIG['pool_min_files']:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            per_file = list(pool.map(analyze_file, paths, repeat(chunk_rows), repeat(miner_ip)))
+    else:
+        per_file = [analyze_file(path, chunk_rows, miner_ip) for path in paths]
+    tables = {}
+    for kind in KINDS:
+        merged = merge_partials([partials[kind] for partials in per_file])
+        if merged is not None:
+            tables[kind] = settings_table(kind, merged)
+    return tables
+
+
+def top_k(table: Dict[str, 'np.ndarray'], k: int = 10, objective: str = None, max_power: float = None,
+          min_hashrate: float = None, max_temperature: float = None,
+          weights: Dict[str, float] = None) -> List[Dict]:
+    """Best k settings of a table as result records, with the rank_settings() criteria
+
+    Only settings whose latest verdict is stable qualify (tables with a
+    stable column); unset arguments default to the selection_* keys of SAFETY_CONFIG.
+    """
+    objective = objective or SAFETY_CONFIG['selection_objective']
+    if max_power is None:
+        max_power = SAFETY_CONFIG['selection_max_power']
+    if min_hashrate is None:
+        min_hashrate = SAFETY_CONFIG['selection_min_hashrate']
+    if max_temperature is None:
+        max_temperature = SAFETY_CONFIG['selection_max_temperature']
+    weights = {**SAFETY_CONFIG['selection_weights'], **(weights or {})}
+
+    hashrate, joules = table['hashrate_ghs'], table['joules_per_th']
+    mask = table['stable'].copy() if 'stable' in table else np.ones(len(hashrate), dtype=bool)
+    if max_power is not None:
+        mask &= table['power_w'] <= max_power
+    if min_hashrate is not None:
+        mask &= hashrate >= min_hashrate
+    if max_temperature is not None:
+        mask &= table['temperature_c'] <= max_temperature
+    candidates = np.flatnonzero(mask)
+
+    if objective == 'hashrate':
+        primary, secondary = hashrate, -joules
+    elif objective == 'efficiency':
+        primary, secondary = -joules, hashrate
+    elif objective == 'weighted':
+        margin = 1.0 - table['cv'] / SAFETY_CONFIG['max_cv_variation']
+        objectives = np.stack([hashrate, -joules, -table['temperature_c'], margin])[:, candidates]
+        finite = np.all(np.isfinite(objectives), axis=0)
+        score = np.full(len(hashrate), -np.inf)
+        if finite.any():
+            lows = objectives[:, finite].min(axis=1, keepdims=True)
+            highs = objectives[:, finite].max(axis=1, keepdims=True)
+            span = highs - lows
+            normalised = np.where(span > 0, (objectives - lows) / np.where(span > 0, span, 1), 1.0)
+            order = np.array([[weights['hashrate']], [weights['efficiency']],
+                              [weights['temperature']], [weights['margin']]])
+            score[candidates[finite]] = (order * normalised[:, finite]).sum(axis=0)
+        primary, secondary = score, hashrate
+    else:
+        raise ValueError(f"Unknown selection objective: {objective}")
+    ranked = candidates[np.lexsort((secondary[candidates], primary[candidates]))[::-1]][:k]
+    return [{name: values[i].item() for name, values in table.items()} for i in ranked]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Rank settings across many sweep results CSVs and performance logs')
+    parser.add_argument('patterns', nargs='+', help='Files or globs (** recursive, .gz allowed)')
+    parser.add_argument('--ip', default=None, help='Only rows of this miner in fleet CSVs')
+    parser.add_argument('--top', type=int, default=10, help='Settings to show')
+    parser.add_argument('--processes', type=int, default=None, help='Parser processes (1: no pool)')
+    add_selection_arguments(parser)
+    args = parser.parse_args()
+
+    tables = analyze(args.patterns, miner_ip=args.ip, processes=args.processes)
+    titles = {'results': '🎯 Sweep results (latest verdict per setting)', 'telemetry': '📊 Performance logs'}
+    for kind, table in tables.items():
+        print(f"{titles[kind]}: {len(table['rows'])} settings, {int(table['rows'].sum())} rows")
+        for r in top_k(table, args.top, **selection_criteria(args)):
+            print(f"   {r['frequency_mhz']}MHz @ {r['core_voltage_mv']}mV: {r['hashrate_ghs']:.1f} GH/s, "
+                  f"{r['power_w']:.1f}W, {r['joules_per_th']:.1f} J/TH, {r['temperature_c']:.1f}°C, "
+                  f"CV {r['cv']:.3f} ({r['rows']} rows)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Deterministic AxeOS simulator
+Local HTTP stand-in for the BitAxe endpoints used by the overclock tools
+
+Serves GET /api/system/info and PATCH /api/system from a configurable chip
+model (hashrate vs frequency, voltage/frequency stability boundary, thermal
+time constant, power draw and fan response). The model is driven by a clock
+object; inject the same VirtualClock into BitAxeSafeOverclock and a
+multi-hour sweep runs in seconds.
+
+License: MIT
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+try:
+    from .bitaxe_safe_overclock import Clock, VirtualClock
+except ImportError:
+    from bitaxe_safe_overclock import Clock, VirtualClock
+
+
+@dataclass
+class ChipModel:
+    """Simulated chip parameters (defaults calibrated on a Gamma 601 sweep)"""
+    hashrate_per_mhz: float = 2.15          # GH/s per MHz when stable
+    hashrate_noise: float = 0.04            # Relative noise of the reported hashrate
+    hashrate_smoothing: float = 30.0        # Firmware hashrate averaging time constant (s)
+    # Minimum stable voltage: base_voltage + slope * (frequency - knee_frequency)
+    base_voltage: float = 1100.0
+    knee_frequency: float = 660.0
+    boundary_slope: float = 0.55            # mV per MHz above the knee
+    instability_noise: float = 0.012        # Extra relative noise per mV below the boundary
+    instability_loss: float = 0.004         # Hashrate lost per mV below the boundary
+    # Power: static + dynamic * MHz * V^2
+    static_power: float = 1.8
+    dynamic_power: float = 0.0221
+    # Thermal: first-order response towards ambient + resistance * power
+    ambient_temperature: float = 39.5
+    thermal_resistance: float = 1.15        # °C/W at 100% fan
+    fan_thermal_gain: float = 0.6           # Extra resistance fraction at 0% fan
+    thermal_time_constant: float = 90.0     # s
+    vr_thermal_resistance: float = 0.9
+    vr_time_constant: float = 120.0
+    fan_time_constant: float = 5.0
+    fan_rpm_per_percent: float = 65.0
+    # Shares
+    pool_difficulty: float = 1000.0
+    base_reject_rate: float = 0.002
+    reject_rate_per_mv: float = 0.01        # Extra reject probability per mV below the boundary
+    invalid_work_per_mv: float = 0.0        # Fraction of reported hashrate producing no shares, per mV below
+    # ASIC errors (hashrateMonitor errorCount), per minute
+    base_error_rate: float = 0.5
+    error_rate_per_mv: float = 2.0          # Extra errors per minute per mV below the boundary
+    # Firmware limits (values outside are clamped, like AxeOS does)
+    frequency_limits: Tuple[int, int] = (400, 1000)
+    voltage_limits: Tuple[int, int] = (1000, 1300)
+
+    def required_voltage(self, frequency: float) -> float:
+        return self.base_voltage + max(0.0, frequency - self.knee_frequency) * self.boundary_slope
+
+    def power(self, frequency: float, core_voltage: float) -> float:
+        volts = core_voltage / 1000.0
+        return self.static_power + self.dynamic_power * frequency * volts * volts
+
+
+class ScaledClock(Clock):
+    """Wall clock running speed times faster (for a standalone simulator)"""
+
+    def __init__(self, speed: float = 1.0):
+        super().__init__()
+        self.speed = speed
+        self._start = time.monotonic()
+        self._epoch = time.time()
+
+    def monotonic(self) -> float:
+        return (time.monotonic() - self._start) * self.speed
+
+    def time(self) -> float:
+        return self._epoch + self.monotonic()
+
+
+class SimulatedMiner:
+    """Chip model state integrated forward in time on every request"""
+
+    def __init__(self, model: ChipModel = None, clock=None, seed: int = 0,
+                 frequency: int = 525, core_voltage: int = 1100, fan_speed: int = 60):
+        self.model = model or ChipModel()
+        self.clock = clock or VirtualClock()
+        self.rng = random.Random(seed)
+        self.share_rng = random.Random(seed + 1)
+        self.error_rng = random.Random(seed + 2)
+        self.lock = threading.Lock()
+
+        self.frequency = frequency
+        self.core_voltage = core_voltage
+        self.fan_speed = fan_speed
+        self.fan_actual = float(fan_speed)
+        self.hashrate_avg = self.target_hashrate()
+        power = self.model.power(frequency, core_voltage)
+        self.temperature = self.steady_temperature(power)
+        self.vr_temperature = self.model.ambient_temperature + self.model.vr_thermal_resistance * power
+        self.shares_accepted = 0
+        self.shares_rejected = 0
+        self._share_credit = self.share_rng.expovariate(1.0)  # Expected shares until the next one
+        self.asic_errors = 0
+        self._error_credit = self.error_rng.expovariate(1.0)
+        self._started = self.clock.monotonic()
+        self._updated = self._started
+        self._noise = self.rng.gauss(0, 1)     # Standardised error of the reported average
+        self._noise_time = self._started
+        self.requests = {"GET": 0, "PATCH": 0}
+
+    def margin(self) -> float:
+        """Voltage margin (mV) above the stability boundary"""
+        return self.core_voltage - self.model.required_voltage(self.frequency)
+
+    def target_hashrate(self) -> float:
+        nominal = self.model.hashrate_per_mhz * self.frequency
+        deficit = max(0.0, -self.margin())
+        return nominal * max(0.2, 1.0 - self.model.instability_loss * deficit)
+
+    def steady_temperature(self, power: float) -> float:
+        resistance = self.model.thermal_resistance * (1 + self.model.fan_thermal_gain * (1 - self.fan_actual / 100.0))
+        return self.model.ambient_temperature + resistance * power
+
+    def valid_fraction(self) -> float:
+        return max(0.1, 1.0 - self.model.invalid_work_per_mv * max(0.0, -self.margin()))
+
+    def error_rate(self) -> float:
+        """ASIC errors per second"""
+        deficit = max(0.0, -self.margin())
+        return (self.model.base_error_rate + self.model.error_rate_per_mv * deficit) / 60.0
+
+    def reject_rate(self) -> float:
+        deficit = max(0.0, -self.margin())
+        return min(0.9, self.model.base_reject_rate + self.model.reject_rate_per_mv * deficit)
+
+    def advance(self):
+        """Integrate the model up to the current clock time (exact first-order steps)"""
+        now = self.clock.monotonic()
+        dt = now - self._updated
+        if dt <= 0:
+            return
+        self._updated = now
+        m = self.model
+
+        self.fan_actual += (self.fan_speed - self.fan_actual) * (1 - math.exp(-dt / m.fan_time_constant))
+        power = m.power(self.frequency, self.core_voltage)
+        self.temperature += (self.steady_temperature(power) - self.temperature) * (1 - math.exp(-dt / m.thermal_time_constant))
+        vr_target = m.ambient_temperature + m.vr_thermal_resistance * power
+        self.vr_temperature += (vr_target - self.vr_temperature) * (1 - math.exp(-dt / m.vr_time_constant))
+        self.hashrate_avg += (self.target_hashrate() - self.hashrate_avg) * (1 - math.exp(-dt / m.hashrate_smoothing))
+
+        # Shares arrive as a Poisson process at the valid part of the average rate, rejects drawn per share
+        expected = self.hashrate_avg * self.valid_fraction() * 1e9 / (m.pool_difficulty * 2 ** 32) * dt
+        found = 0
+        while expected >= self._share_credit:
+            expected -= self._share_credit
+            self._share_credit = self.share_rng.expovariate(1.0)
+            found += 1
+        self._share_credit -= expected
+        reject_rate = self.reject_rate()
+        rejected = sum(1 for _ in range(found) if self.share_rng.random() < reject_rate)
+        self.shares_rejected += rejected
+        self.shares_accepted += found - rejected
+
+        expected = self.error_rate() * dt
+        while expected >= self._error_credit:
+            expected -= self._error_credit
+            self._error_credit = self.error_rng.expovariate(1.0)
+            self.asic_errors += 1
+        self._error_credit -= expected
+
+    def system_info(self) -> Dict:
+        with self.lock:
+            self.requests["GET"] += 1
+            self.advance()
+            m = self.model
+            noise = m.hashrate_noise + m.instability_noise * max(0.0, -self.margin())
+            # The firmware reports an average, so its error decorrelates over hashrate_smoothing
+            now = self.clock.monotonic()
+            rho = math.exp(-(now - self._noise_time) / m.hashrate_smoothing)
+            self._noise = rho * self._noise + math.sqrt(1 - rho * rho) * self.rng.gauss(0, 1)
+            self._noise_time = now
+            reported = max(0.0, self.hashrate_avg * (1 + noise * self._noise))
+            return {
+                "ASICModel": "BM1370",
+                "frequency": self.frequency,
+                "coreVoltage": self.core_voltage,
+                "coreVoltageActual": self.core_voltage - 8,
+                "temp": round(self.temperature * 8) / 8,  # Risoluzione sensore 0.125°C
+                "vrTemp": round(self.vr_temperature),
+                "hashRate": reported,
+                "power": m.power(self.frequency, self.core_voltage),
+                "fanspeed": self.fan_speed,
+                "fanrpm": int(self.fan_actual * m.fan_rpm_per_percent),
+                "sharesAccepted": self.shares_accepted,
+                "sharesRejected": self.shares_rejected,
+                "poolDifficulty": m.pool_difficulty,
+                "hashrateMonitor": {"asics": [{"errorCount": self.asic_errors}]},
+                "uptimeSeconds": int(self.clock.monotonic() - self._started),
+            }
+
+    def patch_system(self, data: Dict):
+        with self.lock:
+            self.requests["PATCH"] += 1
+            self.advance()
+            lo, hi = self.model.frequency_limits
+            if "frequency" in data:
+                self.frequency = int(min(hi, max(lo, data["frequency"])))
+            lo, hi = self.model.voltage_limits
+            if "coreVoltage" in data:
+                self.core_voltage = int(min(hi, max(lo, data["coreVoltage"])))
+            if "fanspeed" in data:
+                self.fan_speed = int(min(100, max(0, data["fanspeed"])))
+
+
+class _AxeOSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _reply(self, status: int, payload: Optional[Dict] = None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/system/info":
+            self._reply(200, self.server.miner.system_info())
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_PATCH(self):
+        if self.path != "/api/system":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            data = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError:
+            self._reply(400, {"error": "invalid json"})
+            return
+        self.server.miner.patch_system(data)
+        self._reply(200)
+
+    def log_message(self, *args):
+        pass
+
+
+class AxeOSSimulator:
+    """HTTP server exposing a SimulatedMiner on 127.0.0.1"""
+
+    def __init__(self, miner: SimulatedMiner = None, host: str = "127.0.0.1", port: int = 0):
+        self.miner = miner or SimulatedMiner()
+        self.server = ThreadingHTTPServer((host, port), _AxeOSHandler)
+        self.server.daemon_threads = True
+        self.server.miner = self.miner
+        self._thread = None
+
+    @property
+    def address(self) -> str:
+        """host:port string usable as a miner IP"""
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def start(self) -> 'AxeOSSimulator':
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Simulated AxeOS miner for safe testing')
+    parser.add_argument('--port', type=int, default=8080, help='Porta HTTP')
+    parser.add_argument('--speed', type=float, default=1.0, help='Accelerazione del tempo simulato')
+    parser.add_argument('--seed', type=int, default=0, help='Seed del rumore')
+    args = parser.parse_args()
+
+    miner = SimulatedMiner(clock=ScaledClock(args.speed), seed=args.seed)
+    simulator = AxeOSSimulator(miner, port=args.port)
+    print(f"🧪 Simulated AxeOS listening on http://{simulator.address} (speed x{args.speed})")
+    try:
+        simulator.server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Simulator stopped")
+    finally:
+        simulator.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
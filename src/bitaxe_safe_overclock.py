@@ -9,16 +9,24 @@ Warning: Use at your own risk. Overclocking can damage hardware.
 """
 
 import requests
+import array
+import bisect
+import threading
 import time
 import csv
+import glob
 import json
 import logging
+import math
+import os
+import random
 import statistics
 import sys
 import signal
-from datetime import datetime
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+from dataclasses import dataclass, fields, replace
+from requests.adapters import HTTPAdapter
 
 # ==================== CONFIGURATION ====================
 
@@ -42,14 +50,70 @@ SAFETY_CONFIG = {
     'cv_end': 1200,
     'cv_step': 25,
     'cv_danger_threshold': 1150,
+    'voltage_search': 'linear',     # 'linear' (passi cv_step) o 'bisection' (galoppo + bisezione)
+    'cv_resolution': 5,             # Risoluzione finale della bisezione (mV)
+    # Strategia dello sweep: griglia progressiva o guidata da modello surrogato
+    'sweep_strategy': 'progressive', # 'progressive', 'surrogate' o 'grid' (tutta la griglia, in ordine pianificato)
+    'surrogate_objective': 'hashrate', # 'hashrate' (GH/s) o 'efficiency' (GH/W)
+    'surrogate_max_tests': 20,      # Budget massimo di test
+    'surrogate_tolerance': 0.005,   # Convergenza: EI massimo < 0.5% del migliore
+    'surrogate_exploration': 0.05,  # Incertezza lontano dai punti testati (frazione del migliore)
+    'surrogate_min_stability': 0.05, # Non testare punti con P(stabile) inferiore
+    'surrogate_trust_steps': 2,     # Max freq_step oltre un punto stabile a tensione <= (espansione sicura)
+    # Scelta delle impostazioni finali tra i punti stabili (frontiera di Pareto + vincoli)
+    'selection_objective': 'hashrate', # 'hashrate' (GH/s), 'efficiency' (J/TH minimo) o 'weighted'
+    'selection_max_power': None,    # Solo punti con potenza <= X W
+    'selection_min_hashrate': None, # Solo punti con hashrate >= Y GH/s
+    'selection_max_temperature': None, # Solo punti con temperatura ASIC <= Z °C
+    'selection_weights': {'hashrate': 1.0, 'efficiency': 1.0, 'temperature': 0.5, 'margin': 0.5},
     'freq_start': 600,
     'freq_end': 850,
     'freq_step': 25,
-    'settle_time': 5,
+    'settle_time': 5,               # Attesa fissa (settle_mode 'fixed')
+    # Rilevamento assestamento: telemetria ad alta frequenza finché le derivate sono piccole
+    'settle_mode': 'adaptive',      # 'adaptive' o 'fixed'
+    'settle_poll_interval': 1.0,    # s
+    'settle_window': 10.0,          # Finestra di regressione (s)
+    'settle_hashrate_slope': 1.0,   # Max pendenza hashrate (%/s)
+    'settle_temp_slope': 0.05,      # Max pendenza temperatura ASIC (°C/s)
+    'settle_max_time': 120,         # Attesa massima (s)
+    # Predizione termica: modello del primo ordine per miner, estrapola la temperatura di regime
+    'thermal_prediction': True,
+    'thermal_tau': 90.0,            # Costante di tempo iniziale ASIC (s), poi appresa
+    'thermal_vr_tau': 120.0,        # Costante di tempo iniziale VR (s)
+    'thermal_min_time': 20.0,       # Osservazione minima prima di estrapolare (s)
+    'thermal_min_rise': 1.0,        # Variazione minima (°C) per aggiornare la costante di tempo
+    # Pianificazione: ordine dei test che minimizza i tempi di assestamento, con ETA
+    'test_order': 'auto',           # 'auto' (il più rapido), 'cold_to_hot', 'snake', 'nearest' o 'given'
+    'plan_voltage_change_time': 5.0, # Assestamento extra stimato dopo un cambio di tensione (s)
+    'plan_static_power': 2.0,       # Potenza iniziale: statica + dinamica * MHz * V^2 (poi stimata dai risultati)
+    'plan_dynamic_power': 0.022,
+    'plan_thermal_resistance': 1.2, # °C/W iniziale (poi stimata dai risultati)
+    # Sweep distribuito su miner identici (fleet_sweep --distribute)
+    'distributed_anchors': 2,       # Punti ancora testati da tutti i miner per calibrare gli offset
+    'distributed_max_offset': 0.10, # Scarto massimo di hashrate/potenza dal miner di riferimento
     'stability_samples': 10,
     'stability_interval': 30,
+    'sample_interval': 5.0,         # Campionamento denso (1-5 s) nella stessa durata del test; None = stability_interval
+    'hashrate_smoothing': 30.0,     # Finestra di media dell'hashrate nel firmware (s): campioni correlati
+    # Stima indipendente dell'hashrate dalle share (accepted + rejected) × difficoltà
+    'share_confidence': 0.99,       # Livello dell'intervallo di confidenza (Poisson)
+    'share_min_count': 20,          # Share minime per confrontare la stima con l'hashrate del firmware
+    'share_hashrate_tolerance': 0.05,  # Firmware oltre il limite superiore dell'intervallo (+5%) = lavoro non valido
+    # Criterio errori: share rifiutate ed errori ASIC al minuto (None = non controllato).
+    # Disattivato di default: valori consigliati 0.5 e 6.0
+    'max_reject_rate': None,        # Share rifiutate al minuto
+    'max_asic_error_rate': None,    # Errori ASIC al minuto (hashrateMonitor del firmware)
+    'error_abort_pvalue': 0.001,    # Interrompe il test appena il conteggio è improbabile alla soglia (Poisson)
     'min_hashrate_threshold': 10.0,
     'max_cv_variation': 0.10,
+    # Test sequenziale (SPRT): si ferma appena il CV è chiaramente sopra/sotto soglia
+    'stability_mode': 'fixed',      # 'fixed' (tutti i campioni) o 'sequential'
+    'sequential_min_samples': 3,
+    'sequential_error_rate': 0.05,  # Probabilità di errore (falso stabile / falso instabile)
+    'sequential_cv_margin': 0.3,    # Zona di indifferenza: soglia CV ±30%
+    'snapshot_ttl': 2.0,            # Validità snapshot telemetria (secondi)
+    'history_size': 720,            # Campioni recenti tenuti in memoria per miner (1h a 5s)
     # Controllo ventola automatico
     'fan_control_enabled': True,
     'fan_temp_threshold_66': 66.0,  # Temperatura per ventola al 100%
@@ -64,6 +128,70 @@ SAFETY_CONFIG = {
     'fan_hysteresis': 2.0           # Isteresi per evitare oscillazioni
 }
 
+# Colonne del file risultati dello sweep
+RESULT_FIELDNAMES = [
+    'timestamp', 'frequency_mhz', 'core_voltage_mv', 'hashrate_ghs',
+    'temperature_c', 'power_w', 'stable', 'cv', 'notes', 'samples', 'settle_time_s',
+    'shares_accepted', 'shares_rejected', 'share_hashrate_ghs'
+]
+
+# File risultati di sweep precedenti usati dal warm start
+RESULTS_GLOB = "bitaxe_safe_tuning_results_*.csv"
+JOURNAL_SUFFIX = ".journal"  # Journal accanto al file risultati (stesso nome, estensione diversa)
+
+# Database risultati e telemetria (SQLite, vedi results_db.py)
+DATABASE_CONFIG = {
+    'path': "bitaxe_results.db",
+    'batch_size': 500,              # Campioni di telemetria per insert batch
+    'flush_interval': 30.0,         # Secondi massimi prima di scrivere il batch
+}
+
+# Archivio telemetria binario a colonne (vedi telemetry_store.py)
+TELEMETRY_STORE_CONFIG = {
+    'chunk_rows': 720,              # Campioni per chunk (1 ora a 5s)
+    'flush_interval': 300.0,        # Secondi massimi prima di scrivere un chunk parziale
+    'compress': False,              # zlib per chunk: file più piccoli, lettura con una copia
+}
+
+# Aggregati della telemetria (vedi rollups.py): risoluzione -> secondi per bucket
+ROLLUP_CONFIG = {
+    'resolutions': {'1m': 60, '1h': 3600, '1d': 86400},
+    # Secondi di storia conservati per risoluzione ('raw': tabella telemetry), None = per sempre
+    'retention': {'raw': 7 * 86400, '1m': 30 * 86400, '1h': 365 * 86400, '1d': None},
+    'prune_interval': 3600.0,       # Secondi tra due pulizie della retention
+    'quantile': 0.95,
+}
+
+# Analisi vettoriale di archivi di CSV (vedi analysis.py, richiede NumPy)
+ANALYSIS_CONFIG = {
+    'chunk_rows': 100000,           # Righe CSV convertite in array per volta
+    'pool_min_files': 4,            # Da quanti file si usa un pool di processi
+}
+
+# HTTP transport (keep-alive pool per miner)
+TRANSPORT_CONFIG = {
+    'pool_size': 2,                 # Connessioni persistenti per miner
+    'default_timeout': 10,          # Timeout di default (secondi)
+    'connect_timeout': 3,           # L'ESP32 accetta lentamente, ma non serve di più
+    'endpoint_timeouts': {
+        '/api/system/info': 5,
+        '/api/system': 10,
+    },
+}
+
+# Retry policy, adaptive timeouts and circuit breaker (per miner)
+RETRY_CONFIG = {
+    'max_attempts': 3,
+    'backoff_base': 0.5,            # Primo backoff (secondi), raddoppia ad ogni tentativo
+    'backoff_max': 8.0,
+    'jitter': 0.5,                  # Frazione casuale del backoff (0 = nessun jitter)
+    'adaptive_timeout': True,       # Timeout di lettura derivato dalla latenza osservata
+    'min_timeout': 1.0,
+    'latency_deviations': 4,        # timeout = latenza media + N * deviazione
+    'breaker_failure_threshold': 5, # Errori consecutivi prima di aprire il circuito
+    'breaker_reset_timeout': 30.0,  # Secondi prima di un tentativo di prova
+}
+
 # Logging configuration
 LOGGING_CONFIG = {
     "level": logging.INFO,
@@ -71,9 +199,26 @@ LOGGING_CONFIG = {
     "file": "bitaxe_safe_overclock.log"
 }
 
-@dataclass
+def _slotted(cls):
+    """Rebuild a dataclass with __slots__ for its fields (dataclass(slots=True) needs Python 3.10)"""
+    names = tuple(f.name for f in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names + ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    # Pickle/copy: lo stato va ripristinato senza passare dal __setattr__ bloccato
+    namespace['__getstate__'] = lambda self: [getattr(self, name) for name in names]
+    namespace['__setstate__'] = lambda self, state: [object.__setattr__(self, name, value)
+                                                     for name, value in zip(names, state)]
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+@_slotted
+@dataclass(frozen=True)
 class MinerState:
-    """Represents the current state of the miner"""
+    """Represents the current state of the miner
+    
+    Immutable record without a per-instance __dict__; timestamp is in epoch
+    seconds (a datetime passed in is converted).
+    """
     frequency: int
     core_voltage: int
     temperature: float
@@ -83,30 +228,1237 @@ class MinerState:
     shares_accepted: int
     shares_rejected: int
     uptime: int
-    timestamp: datetime = None
-    efficiency: float = 0.0
+    fan_speed: int = 0
+    pool_difficulty: float = 0.0
+    asic_errors: int = 0
+    timestamp: float = None
     stable: bool = False
     
     def __post_init__(self):
         if self.timestamp is None:
-            self.timestamp = datetime.now()
-        self.efficiency = self.hash_rate / self.power if self.power > 0 else 0
-    timestamp: datetime
-    stable: bool = False
+            object.__setattr__(self, 'timestamp', time.time())
+        elif isinstance(self.timestamp, datetime):
+            object.__setattr__(self, 'timestamp', self.timestamp.timestamp())
+
+    @property
+    def efficiency(self) -> float:
+        return self.hash_rate / self.power if self.power > 0 else 0
+
+    def isotime(self) -> str:
+        """Local ISO timestamp, as written in the results CSV"""
+        return datetime.fromtimestamp(self.timestamp).isoformat()
+
+    @classmethod
+    def from_system_info(cls, data: Dict, timestamp: float = None) -> 'MinerState':
+        """Build a MinerState from a /api/system/info response"""
+        return cls(
+            frequency=data.get('frequency', 0),
+            core_voltage=data.get('coreVoltage', 0),  # Corretto nome attributo
+            temperature=data.get('temp', 0),
+            vr_temperature=data.get('vrTemp', 0),
+            hash_rate=data.get('hashRate', 0),
+            power=data.get('power', 0),
+            shares_accepted=data.get('sharesAccepted', 0),
+            shares_rejected=data.get('sharesRejected', 0),
+            uptime=data.get('uptimeSeconds', 0),
+            fan_speed=data.get('fanspeed', 0),
+            pool_difficulty=data.get('poolDifficulty', 0),
+            # Contatori errori per ASIC (firmware recenti); 0 se assenti
+            asic_errors=sum(asic.get('errorCount', 0) for asic in (data.get('hashrateMonitor') or {}).get('asics', [])),
+            timestamp=timestamp  # Se None viene impostato in __post_init__
+        )
     
 class SafetyException(Exception):
     """Custom exception for safety-related issues"""
     pass
 
-class BitAxeSafeOverclock:
+class RunningStats:
+    """Running mean/variance (Welford) with min/max in O(1) memory
+    
+    Hashrate samples taken every interval seconds are correlated when the firmware
+    averages over hashrate_smoothing seconds (lag-k correlation exp(-k * interval /
+    smoothing)). With an interval, effective_samples and variance account for it;
+    without one the samples are treated as independent.
+    """
+
+    def __init__(self, values: List[float] = (), interval: float = None):
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        smoothing = SAFETY_CONFIG['hashrate_smoothing']
+        self.rho = math.exp(-interval / smoothing) if interval and smoothing > 0 else 0.0
+        for value in values:
+            self.add(value)
+
+    def add(self, value: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def effective_samples(self) -> float:
+        """Independent samples carrying the same information about the mean"""
+        n, rho = self.n, self.rho
+        if n < 2 or rho <= 0:
+            return float(n)
+        correlation = rho / (1 - rho) - rho * (1 - rho ** n) / (n * (1 - rho) ** 2)
+        return n / (1 + 2 * correlation)
+
+    @property
+    def variance(self) -> float:
+        """Variance estimate, unbiased for AR(1)-correlated samples"""
+        if self.n < 2:
+            return 0.0
+        # E[varianza campionaria] = sigma^2 * n / (n - 1) * (1 - 1 / n_eff)
+        return self._m2 / self.n / max(1 - 1 / self.effective_samples, 1 / self.n)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    @property
+    def cv(self) -> float:
+        return self.stdev / self.mean if self.mean > 0 else float('inf')
+
+class TelemetryRing:
+    """Fixed-capacity history of recent MinerState samples in typed arrays
+    
+    One preallocated array per field (under 80 bytes per sample): memory is the
+    same after an hour or a year of polling, the oldest samples are overwritten.
+    Samples must arrive in time order.
+    """
+
+    FIELDS = [
+        ('timestamp', 'd'),
+        ('frequency', 'i'),
+        ('core_voltage', 'i'),
+        ('temperature', 'f'),
+        ('vr_temperature', 'f'),
+        ('hash_rate', 'f'),
+        ('power', 'f'),
+        ('fan_speed', 'i'),
+        ('shares_accepted', 'q'),
+        ('shares_rejected', 'q'),
+        ('asic_errors', 'q'),
+        ('uptime', 'q'),
+        ('pool_difficulty', 'd'),
+    ]
+
+    def __init__(self, capacity: int = None):
+        self.capacity = capacity or SAFETY_CONFIG['history_size']
+        self.arrays = {name: array.array(code, bytes(array.array(code).itemsize * self.capacity))
+                       for name, code in self.FIELDS}
+        self.count = 0
+        self._head = 0      # Prossima posizione da scrivere
+
+    def __len__(self) -> int:
+        return self.count
+
+    def append(self, state: MinerState):
+        for name, values in self.arrays.items():
+            value = getattr(state, name) or 0
+            values[self._head] = value if values.typecode in 'df' else int(value)
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def column(self, name: str, seconds: float = None) -> array.array:
+        """Values of one field, oldest first; only the last `seconds` before the newest sample if given"""
+        values = self.arrays[name]
+        start = self._head - self.count
+        ordered = values[start:self._head] if start >= 0 else values[start:] + values[:self._head]
+        if seconds is None or not ordered:
+            return ordered
+        timestamps = self.column('timestamp')
+        return ordered[bisect.bisect_left(timestamps, timestamps[-1] - seconds):]
+
+    def stats(self, name: str, seconds: float = None) -> RunningStats:
+        """Mean/min/max/stdev of one field over the window"""
+        return RunningStats(self.column(name, seconds))
+
+    def latest(self) -> Optional[MinerState]:
+        if not self.count:
+            return None
+        i = self._head - 1
+        return MinerState(**{name: values[i] for name, values in self.arrays.items()})
+
+def sample_schedule() -> Tuple[int, float]:
+    """(polls, seconds between polls) of a stability test
+    
+    The test lasts (stability_samples - 1) * stability_interval whatever the rate;
+    a shorter sample_interval only polls more densely.
+    """
+    interval = SAFETY_CONFIG['stability_interval']
+    fast = SAFETY_CONFIG['sample_interval']
+    if not fast or fast >= interval:
+        return SAFETY_CONFIG['stability_samples'], interval
+    return int(round((SAFETY_CONFIG['stability_samples'] - 1) * interval / fast)) + 1, fast
+
+class ShareEstimator:
+    """Hashrate estimated from share-count deltas between snapshots
+    
+    Every share (accepted or rejected) proves pool_difficulty * 2^32 hashes, and shares
+    arrive as a Poisson process, so the count gives a confidence interval that is
+    independent of the firmware's own hashRate. ASIC error deltas are counted alongside.
+    Counter resets (miner restart) are skipped.
+    """
+
     def __init__(self):
-        self.miner_ip = MINER_IP  # Aggiunto attributo mancante
-        self.base_url = f"http://{MINER_IP}"
+        self.accepted = 0
+        self.rejected = 0
+        self.errors = 0
+        self.work = 0.0       # Share × difficoltà
+        self.seconds = 0.0
+        self.difficulty = 0.0
+        self._last = None
+
+    def add(self, state: MinerState):
+        last, self._last = self._last, state
+        if last is None:
+            return
+        accepted = state.shares_accepted - last.shares_accepted
+        rejected = state.shares_rejected - last.shares_rejected
+        errors = state.asic_errors - last.asic_errors
+        if accepted < 0 or rejected < 0 or errors < 0:
+            return
+        self.accepted += accepted
+        self.rejected += rejected
+        self.errors += errors
+        self.difficulty = state.pool_difficulty or self.difficulty
+        self.work += (accepted + rejected) * self.difficulty
+        self.seconds += state.timestamp - last.timestamp
+
+    @property
+    def shares(self) -> int:
+        return self.accepted + self.rejected
+
+    @property
+    def reject_rate(self) -> float:
+        return self.rejected / self.shares if self.shares else 0.0
+
+    @property
+    def hashrate(self) -> Optional[float]:
+        """Share-based hashrate (GH/s), None without elapsed time or pool difficulty"""
+        if self.seconds <= 0 or not self.difficulty:
+            return None
+        return self.work * 2 ** 32 / self.seconds / 1e9
+
+    def interval(self, confidence: float = None) -> Optional[Tuple[float, float]]:
+        """Confidence interval of hashrate (GH/s), exact Poisson bounds via Wilson-Hilferty"""
+        if self.hashrate is None:
+            return None
+        confidence = confidence or SAFETY_CONFIG['share_confidence']
+        z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+        n = self.shares
+        low = n * (1 - 1 / (9 * n) - z / (3 * math.sqrt(n))) ** 3 if n > 0 else 0.0
+        high = (n + 1) * (1 - 1 / (9 * (n + 1)) + z / (3 * math.sqrt(n + 1))) ** 3
+        # Ogni share vale in media work / n
+        per_share = (self.work / n if n else self.difficulty) * 2 ** 32 / self.seconds / 1e9
+        return max(0.0, low) * per_share, high * per_share
+
+    def mismatch(self, reported_hashrate: float) -> bool:
+        """True when the firmware reports clearly more hashrate than the shares support"""
+        if self.hashrate is None or self.shares < SAFETY_CONFIG['share_min_count']:
+            return False
+        # Test a una coda: solo il limite superiore conta
+        upper = self.interval(2 * SAFETY_CONFIG['share_confidence'] - 1)[1]
+        return reported_hashrate > upper * (1 + SAFETY_CONFIG['share_hashrate_tolerance'])
+
+def poisson_sf(count: int, mean: float) -> float:
+    """P(X >= count) for X ~ Poisson(mean)"""
+    term = math.exp(-mean)
+    below = 0.0
+    for k in range(count):
+        below += term
+        term *= mean / (k + 1)
+    return max(0.0, 1.0 - below)
+
+def error_rate_violation(shares: ShareEstimator, final: bool = False) -> Optional[str]:
+    """Reason if rejected shares or ASIC errors exceed their per-minute limit, else None
+    
+    While sampling (final=False) only a count that is implausible at the limit rate
+    (Poisson p-value below error_abort_pvalue) is a violation, so a bad point is
+    dropped within a minute or so. With final=True the observed rate is compared with the limit.
+    """
+    minutes = shares.seconds / 60
+    if minutes <= 0:
+        return None
+    for label, count, limit in (('rejected shares', shares.rejected, SAFETY_CONFIG['max_reject_rate']),
+                                ('ASIC errors', shares.errors, SAFETY_CONFIG['max_asic_error_rate'])):
+        if limit is None:
+            continue
+        if (poisson_sf(count, limit * minutes) < SAFETY_CONFIG['error_abort_pvalue'] or
+                (final and count / minutes > limit)):
+            return f"{count} {label} in {minutes:.1f} min (limit {limit}/min)"
+    return None
+
+def evaluate_stability(hashrates) -> Tuple[bool, float, float]:
+    """Apply the stability criteria to a full sample set (list or RunningStats); returns (stable, mean, cv)"""
+    stats = hashrates if isinstance(hashrates, RunningStats) else RunningStats(hashrates)
+    is_stable = (
+        stats.cv <= SAFETY_CONFIG['max_cv_variation'] and
+        stats.mean >= SAFETY_CONFIG['min_hashrate_threshold']
+    )
+    return is_stable, stats.mean, stats.cv
+
+def sequential_verdict(hashrates) -> Optional[bool]:
+    """Wald SPRT on the hashrate CV; returns True/False once conclusive, None to keep sampling
+    
+    H0: CV = max_cv_variation * (1 - margin) (stable) against
+    H1: CV = max_cv_variation * (1 + margin) (unstable), with both error
+    rates equal to sequential_error_rate. Correlated samples (RunningStats with
+    an interval) count as their effective sample size.
+    """
+    stats = hashrates if isinstance(hashrates, RunningStats) else RunningStats(hashrates)
+    if stats.n < 2 or stats.effective_samples < SAFETY_CONFIG['sequential_min_samples']:
+        return None
+    mean_hashrate = stats.mean
+    if mean_hashrate < SAFETY_CONFIG['min_hashrate_threshold']:
+        return False
+    
+    threshold = SAFETY_CONFIG['max_cv_variation']
+    margin = SAFETY_CONFIG['sequential_cv_margin']
+    sigma0 = threshold * (1 - margin) * mean_hashrate
+    sigma1 = threshold * (1 + margin) * mean_hashrate
+    # Log-likelihood ratio H1/H0 (n_eff - 1 degrees of freedom, mean estimated)
+    dof = stats.effective_samples - 1
+    llr = dof * (math.log(sigma0 / sigma1) + stats.variance / 2 * (1 / sigma0 ** 2 - 1 / sigma1 ** 2))
+    
+    error_rate = SAFETY_CONFIG['sequential_error_rate']
+    if llr >= math.log((1 - error_rate) / error_rate):
+        return False
+    if llr <= math.log(error_rate / (1 - error_rate)):
+        return True
+    return None
+
+def read_results_csv(filename: str, miner_ip: str = None) -> List[Dict]:
+    """Read result records from a sweep CSV, with the types the sweep writes
+    
+    Works with older files without the samples/settle_time_s or share columns. Rows that carry a
+    miner_ip column (fleet sweeps) for another miner are skipped.
+    """
+    results = []
+    with open(filename, newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            if miner_ip and row.get('miner_ip') and row['miner_ip'] != miner_ip:
+                continue
+            try:
+                results.append({
+                    'timestamp': row.get('timestamp', ''),
+                    'frequency_mhz': int(float(row['frequency_mhz'])),
+                    'core_voltage_mv': int(float(row['core_voltage_mv'])),
+                    'hashrate_ghs': float(row.get('hashrate_ghs') or 0),
+                    'temperature_c': float(row.get('temperature_c') or 0),
+                    'power_w': float(row.get('power_w') or 0),
+                    'stable': row.get('stable') == 'True',
+                    'cv': float(row.get('cv') or 0),
+                    'notes': row.get('notes', ''),
+                    'samples': int(row['samples']) if row.get('samples') else None,
+                    'settle_time_s': float(row['settle_time_s']) if row.get('settle_time_s') else None,
+                    'shares_accepted': int(row['shares_accepted']) if row.get('shares_accepted') else None,
+                    'shares_rejected': int(row['shares_rejected']) if row.get('shares_rejected') else None,
+                    'share_hashrate_ghs': float(row['share_hashrate_ghs']) if row.get('share_hashrate_ghs') else None,
+                })
+            except (KeyError, ValueError):
+                logging.getLogger(__name__).warning(f"Skipping malformed row in {filename}: {row}")
+    return results
+
+def joules_per_th(result: Dict) -> float:
+    """Energy per terahash (J/TH) of a result record; inf without hashrate"""
+    if result['hashrate_ghs'] <= 0:
+        return math.inf
+    return result['power_w'] / result['hashrate_ghs'] * 1000
+
+def stability_margin(result: Dict) -> float:
+    """Distance of the CV from the stability threshold (1 = no variation, 0 = at the limit)"""
+    return 1.0 - result.get('cv', 0.0) / SAFETY_CONFIG['max_cv_variation']
+
+def _objectives(result: Dict) -> Tuple[float, float, float, float]:
+    """Objectives of a result, all oriented so that larger is better"""
+    return (result['hashrate_ghs'], -joules_per_th(result), -result['temperature_c'], stability_margin(result))
+
+def pareto_frontier(results: List[Dict]) -> List[Dict]:
+    """Stable results not dominated on hashrate, J/TH, ASIC temperature and stability margin
+    
+    Sorted by hashrate, highest first.
+    """
+    stable = [r for r in results if r['stable']]
+    points = [_objectives(r) for r in stable]
+    frontier = []
+    for i, result in enumerate(stable):
+        dominated = any(
+            all(a >= b for a, b in zip(other, points[i])) and other != points[i]
+            for other in points
+        )
+        if not dominated:
+            frontier.append(result)
+    return sorted(frontier, key=lambda r: r['hashrate_ghs'], reverse=True)
+
+def rank_settings(results: List[Dict], objective: str = None, max_power: float = None,
+                  min_hashrate: float = None, max_temperature: float = None,
+                  weights: Dict[str, float] = None) -> List[Dict]:
+    """Stable results that satisfy the constraints, best first
+    
+    objective: 'hashrate' (max GH/s), 'efficiency' (min J/TH) or 'weighted'
+    (weighted sum of the objectives min-max normalised over the candidates).
+    Unset arguments default to the selection_* keys of SAFETY_CONFIG.
+    """
+    objective = objective or SAFETY_CONFIG['selection_objective']
+    if max_power is None:
+        max_power = SAFETY_CONFIG['selection_max_power']
+    if min_hashrate is None:
+        min_hashrate = SAFETY_CONFIG['selection_min_hashrate']
+    if max_temperature is None:
+        max_temperature = SAFETY_CONFIG['selection_max_temperature']
+    weights = {**SAFETY_CONFIG['selection_weights'], **(weights or {})}
+
+    candidates = [
+        r for r in results
+        if r['stable']
+        and (max_power is None or r['power_w'] <= max_power)
+        and (min_hashrate is None or r['hashrate_ghs'] >= min_hashrate)
+        and (max_temperature is None or r['temperature_c'] <= max_temperature)
+    ]
+    if objective == 'hashrate':
+        key = lambda r: (r['hashrate_ghs'], -joules_per_th(r))
+    elif objective == 'efficiency':
+        key = lambda r: (-joules_per_th(r), r['hashrate_ghs'])
+    elif objective == 'weighted':
+        points = {id(r): _objectives(r) for r in candidates}
+        finite = [p for p in points.values() if math.isfinite(p[1])]
+        lows = [min(p[i] for p in finite) for i in range(4)] if finite else [0.0] * 4
+        highs = [max(p[i] for p in finite) for i in range(4)] if finite else [0.0] * 4
+        order = [weights['hashrate'], weights['efficiency'], weights['temperature'], weights['margin']]
+
+        def key(r):
+            score = 0.0
+            for value, low, high, weight in zip(points[id(r)], lows, highs, order):
+                if not math.isfinite(value):
+                    return (-math.inf, r['hashrate_ghs'])
+                score += weight * ((value - low) / (high - low) if high > low else 1.0)
+            return (score, r['hashrate_ghs'])
+    else:
+        raise ValueError(f"Unknown selection objective: {objective}")
+    return sorted(candidates, key=key, reverse=True)
+
+def select_best(results: List[Dict], **criteria) -> Optional[Dict]:
+    """Best result according to rank_settings(), or None if nothing qualifies"""
+    ranked = rank_settings(results, **criteria)
+    return ranked[0] if ranked else None
+
+def add_selection_arguments(parser):
+    """Command line options for rank_settings(), shared by the sweep and the apply scripts"""
+    parser.add_argument('--objective', choices=['hashrate', 'efficiency', 'weighted'], default=None,
+                        help='Criterio di scelta: max GH/s, min J/TH o punteggio pesato')
+    parser.add_argument('--max-power', type=float, default=None, metavar='W',
+                        help='Solo impostazioni con potenza <= W')
+    parser.add_argument('--min-hashrate', type=float, default=None, metavar='GHS',
+                        help='Solo impostazioni con hashrate >= GH/s')
+    parser.add_argument('--max-temp', type=float, default=None, metavar='C',
+                        help='Solo impostazioni con temperatura ASIC <= °C')
+
+def selection_criteria(args) -> Dict:
+    """rank_settings() keyword arguments from parsed add_selection_arguments() options"""
+    return {'objective': args.objective, 'max_power': args.max_power,
+            'min_hashrate': args.min_hashrate, 'max_temperature': args.max_temp}
+
+class Clock:
+    """Real time source; every wait in the sweep path goes through sleep()
+    
+    Waits are cut short by the caller's own wake event (one per overclocker or
+    monitor), so an emergency stop never wakes up an unrelated wait.
+    """
+
+    poll_interval = 0.25  # Granularità del controllo di interruzione (secondi)
+
+    def time(self) -> float:
+        return time.time()
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def now(self) -> datetime:
+        return datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds: float, interrupted: Callable[[], bool] = None,
+              wake: threading.Event = None) -> bool:
+        """Wait up to seconds; return False if wake is set or interrupted() became true"""
+        deadline = self.monotonic() + seconds
+        while True:
+            if (interrupted and interrupted()) or (wake is not None and wake.is_set()):
+                return False
+            remaining = deadline - self.monotonic()
+            if remaining <= 0:
+                return True
+            if wake is not None:
+                wake.wait(min(remaining, self.poll_interval))
+            else:
+                time.sleep(min(remaining, self.poll_interval))
+
+class VirtualClock(Clock):
+    """Manually advanced clock for simulation and benchmarks; sleep() returns immediately"""
+
+    def __init__(self, start: float = None):
+        self._epoch = time.time() if start is None else start
+        self._elapsed = 0.0
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        return self._epoch + self._elapsed
+
+    def monotonic(self) -> float:
+        return self._elapsed
+
+    def sleep(self, seconds: float, interrupted: Callable[[], bool] = None,
+              wake: threading.Event = None) -> bool:
+        if (interrupted and interrupted()) or (wake is not None and wake.is_set()):
+            return False
+        self.advance(seconds)
+        return True
+
+    def advance(self, seconds: float):
+        with self._lock:
+            self._elapsed += max(0.0, seconds)
+
+REAL_CLOCK = Clock()
+
+def safety_violation(state: MinerState) -> Optional[str]:
+    """Return a description of the first safety limit exceeded by state, or None"""
+    if state.temperature > SAFETY_CONFIG['max_temperature']:
+        return f"Temperatura ASIC troppo alta: {state.temperature}°C"
+    
+    if state.vr_temperature > SAFETY_CONFIG['max_vr_temperature']:
+        return f"Temperatura VR troppo alta: {state.vr_temperature}°C"
+    
+    if state.power > SAFETY_CONFIG['max_power']:
+        return f"Potenza troppo alta: {state.power}W"
+    
+    if state.efficiency < SAFETY_CONFIG['min_efficiency']:
+        return f"Efficienza troppo bassa: {state.efficiency} GH/W"
+    
+    return None
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """Solve a small dense linear system (Gaussian elimination, partial pivoting)"""
+    n = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        if abs(rows[col][col]) < 1e-12:
+            continue
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, n + 1):
+                rows[r][c] -= factor * rows[col][c]
+    solution = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        if abs(rows[r][r]) < 1e-12:
+            continue
+        solution[r] = (rows[r][n] - sum(rows[r][c] * solution[c] for c in range(r + 1, n))) / rows[r][r]
+    return solution
+
+def _ridge_fit(features: List[List[float]], targets: List[float], penalties: List[float]) -> List[float]:
+    """Least squares with a per-coefficient L2 penalty"""
+    k = len(features[0])
+    gram = [[sum(x[i] * x[j] for x in features) + (penalties[i] if i == j else 0.0)
+             for j in range(k)] for i in range(k)]
+    return _solve(gram, [sum(x[i] * y for x, y in zip(features, targets)) for i in range(k)])
+
+class SurrogateModel:
+    """Stability boundary and performance surface fitted on sweep results
+    
+    P(stable) is a ridge-regularised logistic regression on (frequency, voltage).
+    On the stable points, hashrate is fitted as a quadratic in frequency and
+    power as static + k * f * V^2; the curvature and static terms are shrunk
+    until the data supports them. The surrogate sweep tests the point with the highest
+    expected improvement.
+    """
+
+    def __init__(self, objective: str = None, ridge: float = 0.01):
+        self.objective = objective or SAFETY_CONFIG['surrogate_objective']
+        self.ridge = ridge
+        # Normalizzazione sul range dello sweep
+        self.freq_center = (SAFETY_CONFIG['freq_start'] + SAFETY_CONFIG['freq_end']) / 2
+        self.freq_scale = max(1.0, (SAFETY_CONFIG['freq_end'] - SAFETY_CONFIG['freq_start']) / 2)
+        self.volt_center = (SAFETY_CONFIG['cv_start'] + SAFETY_CONFIG['cv_end']) / 2
+        self.volt_scale = max(1.0, (SAFETY_CONFIG['cv_end'] - SAFETY_CONFIG['cv_start']) / 2)
+        self.stable_points = []
+        self.unstable_points = []
+        self.best = 0.0
+        self.residual = 0.0
+        self._logit = [0.0, 0.0, 0.0]
+        self._hashrate = None
+        self._power = None
+
+    def _normalize(self, frequency: float, core_voltage: float) -> Tuple[float, float]:
+        return ((frequency - self.freq_center) / self.freq_scale,
+                (core_voltage - self.volt_center) / self.volt_scale)
+
+    def _hashrate_features(self, frequency: float) -> List[float]:
+        f = (frequency - self.freq_center) / self.freq_scale
+        return [1.0, f, f * f]
+
+    def _power_features(self, frequency: float, core_voltage: float) -> List[float]:
+        # Potenza dinamica CMOS ~ f * V^2 (relativa al centro della griglia)
+        return [1.0, frequency * core_voltage ** 2 / (self.freq_center * self.volt_center ** 2)]
+
+    def score(self, hashrate: float, power: float) -> float:
+        """Objective value of a (hashrate, power) pair"""
+        if self.objective == 'efficiency':
+            return hashrate / power if power > 0 else 0.0
+        return hashrate
+
+    def fit(self, results: List[Dict]):
+        """Refit the model on the result records written by the sweep"""
+        points = [(r['frequency_mhz'], r['core_voltage_mv'], bool(r['stable']),
+                   r['hashrate_ghs'], r['power_w']) for r in results]
+        self.stable_points = [(f, v) for f, v, stable, _, _ in points if stable]
+        self.unstable_points = [(f, v) for f, v, stable, _, _ in points if not stable]
+        stable = [(f, v, h, p) for f, v, ok, h, p in points if ok]
+        self.best = max((self.score(h, p) for _, _, h, p in stable), default=0.0)
+        
+        # Logistic boundary (Newton / IRLS). Two half-weight pseudo-points encode the
+        # prior that stability falls with frequency and rises with voltage.
+        observations = [(f, v, 1.0 if ok else 0.0, 1.0) for f, v, ok, _, _ in points] + [
+            (SAFETY_CONFIG['freq_start'], SAFETY_CONFIG['cv_end'], 1.0, 0.5),
+            (SAFETY_CONFIG['freq_end'], SAFETY_CONFIG['cv_start'], 0.0, 0.5),
+        ]
+        rows = [[1.0, *self._normalize(f, v)] for f, v, _, _ in observations]
+        weights = [0.0, 0.0, 0.0]
+        for _ in range(25):
+            probs = [self._sigmoid(weights, row) for row in rows]
+            gradient = [sum(n * (y - p) * row[i] for row, (_, _, y, n), p in zip(rows, observations, probs))
+                        - (self.ridge * weights[i] if i else 0.0) for i in range(3)]
+            hessian = [[sum(n * p * (1 - p) * row[i] * row[j] for row, (_, _, _, n), p in zip(rows, observations, probs))
+                        + (self.ridge if i == j and i else 0.0) for j in range(3)] for i in range(3)]
+            step = _solve(hessian, gradient)
+            weights = [w + d for w, d in zip(weights, step)]
+            if max(abs(d) for d in step) < 1e-6:
+                break
+        self._logit = weights
+        
+        # Superfici quadratiche di hashrate e potenza (solo punti stabili)
+        if stable:
+            self._hashrate = _ridge_fit([self._hashrate_features(f) for f, _, _, _ in stable],
+                                        [h for _, _, h, _ in stable], [1e-6, self.ridge, 1.0])
+            self._power = _ridge_fit([self._power_features(f, v) for f, v, _, _ in stable],
+                                     [p for _, _, _, p in stable], [1.0, 1e-6])
+            errors = [self.score(*self.predict(f, v)) - self.score(h, p) for f, v, h, p in stable]
+            self.residual = math.sqrt(sum(e * e for e in errors) / len(errors))
+
+    @staticmethod
+    def _sigmoid(weights: List[float], row: List[float]) -> float:
+        z = sum(w * x for w, x in zip(weights, row))
+        return 1 / (1 + math.exp(-max(-30.0, min(30.0, z))))
+
+    def stability(self, frequency: float, core_voltage: float) -> float:
+        """Probability that (frequency, core_voltage) is stable"""
+        return self._sigmoid(self._logit, [1.0, *self._normalize(frequency, core_voltage)])
+
+    def predict(self, frequency: float, core_voltage: float) -> Tuple[float, float]:
+        """Predicted (hashrate, power) if stable"""
+        if self._hashrate is None:
+            return 0.0, 0.0
+        hashrate = sum(w * x for w, x in zip(self._hashrate, self._hashrate_features(frequency)))
+        power = sum(w * x for w, x in zip(self._power, self._power_features(frequency, core_voltage)))
+        return max(0.0, hashrate), max(0.0, power)
+
+    def dominated(self, frequency: int, core_voltage: int) -> bool:
+        """True if results already settle the point
+        
+        Higher frequency at lower voltage than an unstable point is unstable; lower
+        frequency at higher voltage than a stable point cannot be better.
+        """
+        return (any(frequency >= f and core_voltage <= v for f, v in self.unstable_points) or
+                any(frequency <= f and core_voltage >= v for f, v in self.stable_points))
+
+    def expected_improvement(self, frequency: int, core_voltage: int) -> float:
+        """Expected objective gain over the best stable result, weighted by P(stable)"""
+        # Incertezza: errore del fit + termine che cresce lontano (in frequenza) dai punti
+        # misurati; la dipendenza dalla tensione è coperta da P(stable) e dal modello di potenza
+        tested = self.stable_points + self.unstable_points
+        distance = min((abs(frequency - f) / self.freq_scale for f, _ in tested), default=1.0)
+        sigma = self.residual + SAFETY_CONFIG['surrogate_exploration'] * max(self.best, 1.0) * min(1.0, distance)
+        gain = self.score(*self.predict(frequency, core_voltage)) - self.best
+        if sigma <= 0:
+            improvement = max(0.0, gain)
+        else:
+            z = gain / sigma
+            cdf = 0.5 * (1 + math.erf(z / math.sqrt(2)))
+            pdf = math.exp(-z * z / 2) / math.sqrt(2 * math.pi)
+            improvement = gain * cdf + sigma * pdf
+        return self.stability(frequency, core_voltage) * improvement
+
+class SettleDetector:
+    """Decides when telemetry has settled after a settings change
+    
+    Fits a least-squares slope to hashrate and ASIC temperature over the last
+    settle_window seconds; the miner is settled once both slopes are under
+    settle_hashrate_slope (%/s) and settle_temp_slope (°C/s).
+    """
+
+    def __init__(self, window: float = None, hashrate_slope: float = None, temperature_slope: float = None):
+        self.window = SAFETY_CONFIG['settle_window'] if window is None else window
+        self.hashrate_slope = SAFETY_CONFIG['settle_hashrate_slope'] if hashrate_slope is None else hashrate_slope
+        self.temperature_slope = SAFETY_CONFIG['settle_temp_slope'] if temperature_slope is None else temperature_slope
+        self.samples = []  # (t, hashrate, temperature)
+
+    def add(self, t: float, hashrate: float, temperature: float):
+        self.samples.append((t, hashrate, temperature))
+        self.samples = [s for s in self.samples if s[0] >= t - self.window]
+
+    @staticmethod
+    def _slope(times: List[float], values: List[float]) -> float:
+        mean_t = statistics.mean(times)
+        mean_v = statistics.mean(values)
+        spread = sum((t - mean_t) ** 2 for t in times)
+        return sum((t - mean_t) * (v - mean_v) for t, v in zip(times, values)) / spread if spread > 0 else 0.0
+
+    def slopes(self) -> Tuple[float, float]:
+        """(hashrate slope in %/s, temperature slope in °C/s) over the window"""
+        if len(self.samples) < 3:
+            return float('inf'), float('inf')
+        times = [s[0] for s in self.samples]
+        hashrates = [s[1] for s in self.samples]
+        mean_hashrate = statistics.mean(hashrates)
+        hashrate_slope = self._slope(times, hashrates) / mean_hashrate * 100 if mean_hashrate > 0 else float('inf')
+        return hashrate_slope, self._slope(times, [s[2] for s in self.samples])
+
+    @property
+    def settled(self) -> bool:
+        # Serve una finestra piena prima di decidere
+        if not self.samples or self.samples[-1][0] - self.samples[0][0] < self.window * 0.9:
+            return False
+        hashrate_slope, temperature_slope = self.slopes()
+        return abs(hashrate_slope) <= self.hashrate_slope and abs(temperature_slope) <= self.temperature_slope
+
+class ThermalModel:
+    """Online first-order model of one temperature sensor
+    
+    T(t) = T_ss + (T_0 - T_ss) * exp(-t / tau), with t measured from the last
+    settings change. With tau known, T_ss is a linear least-squares fit on the
+    samples of the current point; tau itself is re-estimated at the end of each
+    point with a clear temperature step and smoothed across points.
+    """
+
+    def __init__(self, tau: float):
+        self.tau = tau
+        self.samples = []  # (t, temperature)
+
+    def reset(self):
+        """Start a new point (learning tau from the previous one first)"""
+        self.learn()
+        self.samples = []
+
+    def add(self, t: float, temperature: float):
+        self.samples.append((t, temperature))
+
+    def _fit(self, tau: float) -> Tuple[float, float, float]:
+        """(steady state, amplitude, squared error) of the fit with time constant tau"""
+        xs = [math.exp(-t / tau) for t, _ in self.samples]
+        ys = [temperature for _, temperature in self.samples]
+        mean_x, mean_y = statistics.mean(xs), statistics.mean(ys)
+        spread = sum((x - mean_x) ** 2 for x in xs)
+        amplitude = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread > 0 else 0.0
+        steady = mean_y - amplitude * mean_x
+        error = sum((y - steady - amplitude * x) ** 2 for x, y in zip(xs, ys))
+        return steady, amplitude, error
+
+    def steady_state(self) -> Optional[float]:
+        """Projected steady-state temperature of the current point, or None if too few samples"""
+        if len(self.samples) < 3:
+            return None
+        return self._fit(self.tau)[0]
+
+    def learn(self):
+        """Re-estimate tau from the current samples if they show a clear step"""
+        if len(self.samples) < 5:
+            return
+        candidates = [10 * 1.1 ** k for k in range(42)]  # 10s .. ~500s
+        fits = [(self._fit(tau), tau) for tau in candidates]
+        (_, amplitude, _), best_tau = min(fits, key=lambda fit: fit[0][2])
+        span = self.samples[-1][0] - self.samples[0][0]
+        if abs(amplitude) >= SAFETY_CONFIG['thermal_min_rise'] and best_tau < 2 * span:
+            self.tau = 0.5 * self.tau + 0.5 * best_tau
+
+class TestPlanner:
+    """Orders sweep points by expected settle time and predicts the sweep ETA
+    
+    Moving between two points changes the power by dP; with a first-order thermal
+    response (time constant tau) the temperature slope R * dP / tau * exp(-t / tau)
+    falls below settle_temp_slope after tau * ln(R * dP / (tau * settle_temp_slope)),
+    on top of one settle_window. A core voltage change adds plan_voltage_change_time.
+    Power (static + dynamic * MHz * V^2) and R are re-fitted on the results, and
+    measured settle times rescale the predictions while the sweep runs.
+    """
+
+    ORDERS = ('cold_to_hot', 'snake', 'nearest')
+
+    def __init__(self, tau: float = None):
+        self.tau = tau or SAFETY_CONFIG['thermal_tau']
+        self.static_power = SAFETY_CONFIG['plan_static_power']
+        self.dynamic_power = SAFETY_CONFIG['plan_dynamic_power']
+        self.thermal_resistance = SAFETY_CONFIG['plan_thermal_resistance']
+        self.correction = 1.0      # Assestamento misurato / previsto (media mobile)
+        polls, interval = sample_schedule()
+        self.test_time = (polls - 1) * interval   # n campioni = n - 1 intervalli
+        self.tests_observed = 0
+        self.position = None       # Ultimo punto applicato (frequency, voltage)
+
+    def power(self, frequency: int, core_voltage: int) -> float:
+        volts = core_voltage / 1000.0
+        return self.static_power + self.dynamic_power * frequency * volts * volts
+
+    def fit(self, results: List[Dict]):
+        """Re-estimate the power model and thermal resistance from result records"""
+        measured = [r for r in results if r['power_w'] > 0]
+        loads = [r['frequency_mhz'] * (r['core_voltage_mv'] / 1000.0) ** 2 for r in measured]
+        if len(set(loads)) < 2:
+            return
+        static, dynamic = _ridge_fit([[1.0, x] for x in loads], [r['power_w'] for r in measured], [1e-6, 1e-6])
+        if dynamic > 0:
+            self.static_power, self.dynamic_power = static, dynamic
+        powers = [r['power_w'] for r in measured]
+        if max(powers) - min(powers) >= 1.0:
+            _, resistance = _ridge_fit([[1.0, p] for p in powers], [r['temperature_c'] for r in measured], [1e-6, 1e-6])
+            if resistance > 0:
+                self.thermal_resistance = resistance
+
+    def settle_time(self, origin: Optional[Tuple[int, int]], target: Tuple[int, int]) -> float:
+        """Expected settle time (s) after moving from origin (None: unknown) to target"""
+        if SAFETY_CONFIG['settle_mode'] == 'fixed':
+            seconds = SAFETY_CONFIG['settle_time']
+        else:
+            rise = self.thermal_resistance * abs(self.power(*target) - self.power(*origin)) if origin else 0.0
+            limit = self.tau * SAFETY_CONFIG['settle_temp_slope']
+            seconds = SAFETY_CONFIG['settle_window']
+            if rise > limit:
+                seconds += self.tau * math.log(rise / limit)
+            seconds = min(seconds, SAFETY_CONFIG['settle_max_time']) * self.correction
+        if origin and origin[1] != target[1]:
+            seconds += SAFETY_CONFIG['plan_voltage_change_time']
+        return seconds
+
+    def cost(self, points: List[Tuple[int, int]], start: Tuple[int, int] = None) -> float:
+        """Expected duration (s) of testing points in this order, starting at start"""
+        total, current = 0.0, start
+        for point in points:
+            total += self.settle_time(current, point) + self.test_time
+            current = point
+        return total
+
+    def order(self, points: List[Tuple[int, int]], start: Tuple[int, int] = None, method: str = None,
+              prune: bool = False) -> List[Tuple[int, int]]:
+        """Points in the order given by method (default: SAFETY_CONFIG['test_order'])
+        
+        cold_to_hot: increasing predicted power. snake: grouped by voltage (lowest
+        first), frequency direction alternating between groups. nearest: always the
+        cheapest next transition. auto: whichever of these has the lowest cost().
+        With prune, frequencies stay ascending within each voltage (a failure then
+        rules out the rest of the group, see grid_search).
+        """
+        method = method or SAFETY_CONFIG['test_order']
+        points = list(dict.fromkeys(points))
+        if method == 'given':
+            return points
+        if method == 'auto':
+            return min((self.order(points, start, m, prune) for m in self.ORDERS), key=lambda p: self.cost(p, start))
+        if method == 'cold_to_hot':
+            return sorted(points, key=lambda p: (self.power(*p), p))
+        if method == 'snake':
+            ordered = []
+            for i, core_voltage in enumerate(sorted({v for _, v in points})):
+                row = sorted(f for f, v in points if v == core_voltage)
+                ordered += [(f, core_voltage) for f in (reversed(row) if i % 2 and not prune else row)]
+            return ordered
+        if method == 'nearest':
+            remaining = sorted(points, key=lambda p: (self.power(*p), p))
+            ordered, current = [], start
+            while remaining:
+                candidates = remaining
+                if prune:
+                    lowest = {}
+                    for f, v in remaining:
+                        lowest[v] = min(f, lowest.get(v, f))
+                    candidates = [p for p in remaining if p[0] == lowest[p[1]]]
+                # min() tiene il primo a parità di costo: il più freddo
+                current = min(candidates, key=lambda p: self.settle_time(current, p))
+                remaining.remove(current)
+                ordered.append(current)
+            return ordered
+        raise ValueError(f"Unknown test order: {method}")
+
+    def observe(self, origin: Optional[Tuple[int, int]], target: Tuple[int, int],
+                settle_time: Optional[float], duration: float):
+        """Update the corrections with a measured point (settle time and total duration)"""
+        if settle_time is not None and SAFETY_CONFIG['settle_mode'] != 'fixed':
+            predicted = self.settle_time(origin, target)
+            if origin and origin[1] != target[1]:
+                predicted -= SAFETY_CONFIG['plan_voltage_change_time']
+            if predicted > 0:
+                ratio = settle_time / (predicted / self.correction)
+                self.correction = min(5.0, max(0.2, 0.7 * self.correction + 0.3 * ratio))
+        if settle_time is not None:
+            duration -= settle_time
+        self.tests_observed += 1
+        self.test_time += (duration - self.test_time) / self.tests_observed
+        self.position = target
+
+class SnapshotCache:
+    """Short-TTL cache of the last /api/system/info snapshot"""
+
+    def __init__(self, ttl: float = None, clock: Clock = None, history: TelemetryRing = None):
+        self.ttl = SAFETY_CONFIG['snapshot_ttl'] if ttl is None else ttl
+        self.clock = clock or REAL_CLOCK
+        self.history = history  # Opzionale: ogni snapshot letto dal miner finisce anche qui
+        self.hits = 0
+        self.misses = 0
+        self._state: Optional[MinerState] = None
+        self._fetched_at = 0.0
+
+    def get(self, max_age: float = None) -> Optional[MinerState]:
+        """Return the cached snapshot if still fresh, counting hits and misses"""
+        max_age = self.ttl if max_age is None else max_age
+        if self._state is not None and self.clock.monotonic() - self._fetched_at <= max_age:
+            self.hits += 1
+            return self._state
+        self.misses += 1
+        return None
+
+    def put(self, state: MinerState):
+        self._state = state
+        if self.history is not None:
+            self.history.append(state)
+        self._fetched_at = self.clock.monotonic()
+
+    def update(self, **fields):
+        """Patch fields of the cached snapshot without refreshing its age"""
+        if self._state is not None:
+            self._state = replace(self._state, **fields)
+
+    def invalidate(self):
+        """Drop the snapshot (settings changed on the miner)"""
+        self._state = None
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised when a miner's circuit breaker is open and calls fail fast"""
+    pass
+
+class RetryPolicy:
+    """Exponential backoff with jitter and idempotency-aware retry decisions"""
+
+    IDEMPOTENT_METHODS = ("GET",)
+
+    def __init__(self, max_attempts: int = None, backoff_base: float = None,
+                 backoff_max: float = None, jitter: float = None):
+        self.max_attempts = max_attempts or RETRY_CONFIG['max_attempts']
+        self.backoff_base = RETRY_CONFIG['backoff_base'] if backoff_base is None else backoff_base
+        self.backoff_max = RETRY_CONFIG['backoff_max'] if backoff_max is None else backoff_max
+        self.jitter = RETRY_CONFIG['jitter'] if jitter is None else jitter
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number attempt + 1"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * (1 - self.jitter * random.random())
+
+    def should_retry(self, method: str, error: Exception = None, status_code: int = None) -> bool:
+        """Decide whether a failed call may be repeated
+        
+        GET is always safe to repeat. Writes are only repeated when the request
+        cannot have reached the miner (connection failures), never after a read
+        timeout or an HTTP error response.
+        """
+        if isinstance(error, CircuitOpenError):
+            return False
+        if status_code is not None:
+            return status_code >= 500 and method in self.IDEMPOTENT_METHODS
+        if method in self.IDEMPOTENT_METHODS:
+            return isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError))
+        return isinstance(error, requests.exceptions.ConnectionError) and \
+            not isinstance(error, requests.exceptions.ReadTimeout)
+
+class CircuitBreaker:
+    """Per-miner circuit breaker: closed -> open -> half-open -> closed"""
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None, clock: Clock = None):
+        self.clock = clock or REAL_CLOCK
+        self.failure_threshold = failure_threshold or RETRY_CONFIG['breaker_failure_threshold']
+        self.reset_timeout = RETRY_CONFIG['breaker_reset_timeout'] if reset_timeout is None else reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a call may go through
+        
+        Half-open lets exactly one trial call through; another is allowed only if
+        that one reports no outcome within reset_timeout.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.clock.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half-open"
+                self.opened_at = self.clock.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = "closed"
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = self.clock.monotonic()
+
+class LatencyTracker:
+    """Smoothed round-trip latency used to derive adaptive read timeouts"""
+
+    def __init__(self, alpha: float = 0.125, beta: float = 0.25):
+        self.alpha = alpha
+        self.beta = beta
+        self.mean = None
+        self.deviation = 0.0
+
+    def observe(self, latency: float):
+        if self.mean is None:
+            self.mean = latency
+            self.deviation = latency / 2
+        else:
+            self.deviation = (1 - self.beta) * self.deviation + self.beta * abs(latency - self.mean)
+            self.mean = (1 - self.alpha) * self.mean + self.alpha * latency
+
+    def timeout(self, ceiling: float) -> float:
+        """Adaptive timeout, never above the configured endpoint ceiling"""
+        if self.mean is None:
+            return ceiling
+        adaptive = self.mean + RETRY_CONFIG['latency_deviations'] * self.deviation
+        return min(ceiling, max(RETRY_CONFIG['min_timeout'], adaptive))
+
+class MinerTransport:
+    """Persistent keep-alive HTTP session for a single miner"""
+
+    def __init__(self, miner_ip: str, pool_size: int = None, endpoint_timeouts: Dict[str, float] = None,
+                 clock: Clock = None):
+        self.miner_ip = miner_ip
+        self.base_url = f"http://{miner_ip}"
+        self.pool_size = pool_size or TRANSPORT_CONFIG['pool_size']
+        self.endpoint_timeouts = dict(TRANSPORT_CONFIG['endpoint_timeouts'])
+        if endpoint_timeouts:
+            self.endpoint_timeouts.update(endpoint_timeouts)
+
+        self.session = requests.Session()
+        self.session.headers.update({"Connection": "keep-alive"})
+        # Retries are handled by make_api_request, never by urllib3
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0, pool_block=True)
+        self.session.mount("http://", adapter)
+
+        self.breaker = CircuitBreaker(clock=clock)
+        # Latenza di rete (sempre in tempo reale) per (metodo, endpoint): una PATCH
+        # che reinizializza l'ASIC è molto più lenta di una GET di stato
+        self.latency: Dict[Tuple[str, str], LatencyTracker] = {}
+
+    def timeout_for(self, endpoint: str, method: str = "GET") -> Tuple[float, float]:
+        """Return the (connect, read) timeout for a request"""
+        read_timeout = self.endpoint_timeouts.get(endpoint, TRANSPORT_CONFIG['default_timeout'])
+        latency = self.latency.get((method, endpoint))
+        if RETRY_CONFIG['adaptive_timeout'] and latency:
+            read_timeout = latency.timeout(read_timeout)
+        return (min(TRANSPORT_CONFIG['connect_timeout'], read_timeout), read_timeout)
+
+    def request(self, method: str, endpoint: str, data: Dict = None, timeout: float = None) -> requests.Response:
+        """Send a request over the pooled session
+        
+        Raises CircuitOpenError without touching the network while the miner's
+        circuit breaker is open.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open for {self.miner_ip}, failing fast")
+        
+        url = f"{self.base_url}{endpoint}"
+        started = time.monotonic()
+        try:
+            response = self.session.request(
+                method,
+                url,
+                json=data,
+                timeout=timeout if timeout is not None else self.timeout_for(endpoint, method)
+            )
+        except requests.exceptions.RequestException:
+            self.breaker.record_failure()
+            raise
+        
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+            self.latency.setdefault((method, endpoint), LatencyTracker()).observe(time.monotonic() - started)
+        return response
+
+    def get(self, endpoint: str, **kwargs) -> requests.Response:
+        return self.request("GET", endpoint, **kwargs)
+
+    def post(self, endpoint: str, data: Dict = None, **kwargs) -> requests.Response:
+        return self.request("POST", endpoint, data=data, **kwargs)
+
+    def patch(self, endpoint: str, data: Dict = None, **kwargs) -> requests.Response:
+        return self.request("PATCH", endpoint, data=data, **kwargs)
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+_transports: Dict[Tuple[str, Clock], MinerTransport] = {}
+
+def get_transport(miner_ip: str = None, clock: Clock = None) -> MinerTransport:
+    """Return the shared transport for a miner and clock, creating it on first use
+    
+    Keyed on the clock too, so the circuit breaker cool-down always runs on the
+    caller's clock (e.g. a simulator's VirtualClock).
+    """
+    key = (miner_ip or MINER_IP, clock or REAL_CLOCK)
+    transport = _transports.get(key)
+    if transport is None:
+        transport = MinerTransport(key[0], clock=key[1])
+        _transports[key] = transport
+    return transport
+
+def close_transports():
+    """Close every pooled miner connection"""
+    for transport in _transports.values():
+        transport.close()
+    _transports.clear()
+
+class SweepJournal:
+    """Append-only, fsync'd JSON-lines journal of a sweep
+    
+    Records: 'start' (results file, config, original settings), 'state'
+    (search phase and position), 'point' (one completed result record)
+    and 'end'. Every record is on disk before append() returns.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        created = not os.path.exists(path)
+        if not created:
+            self._drop_torn_line()
+        self._file = open(path, 'a', encoding='utf-8')
+        if created:
+            # Rende persistente anche la voce di directory del nuovo file
+            self._sync_directory()
+
+    def _drop_torn_line(self):
+        """Truncate a half-written last record so new records start on their own line"""
+        with open(self.path, 'rb+') as journal:
+            data = journal.read()
+            end = data.rfind(b'\n') + 1
+            if end < len(data):
+                journal.truncate(end)
+                journal.flush()
+                os.fsync(journal.fileno())
+
+    def _sync_directory(self):
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return  # Non supportato (Windows)
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def append(self, record_type: str, **fields):
+        self._file.write(json.dumps({'type': record_type, **fields}, default=str) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    @staticmethod
+    def read(path: str) -> List[Dict]:
+        """Read journal records; unreadable lines (a crash mid-write) are skipped"""
+        records = []
+        with open(path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    @staticmethod
+    def find_unfinished(pattern: str = None) -> Optional[str]:
+        """Most recent journal without an 'end' record, or None"""
+        pattern = pattern or RESULTS_GLOB.replace('.csv', JOURNAL_SUFFIX)
+        for path in sorted(glob.glob(pattern), reverse=True):
+            records = SweepJournal.read(path)
+            if records and records[-1]['type'] != 'end':
+                return path
+        return None
+
+class BitAxeSafeOverclock:
+    def __init__(self, miner_ip: str = None, clock: Clock = None, signals: bool = True):
+        self.miner_ip = miner_ip or MINER_IP  # Aggiunto attributo mancante
+        self.base_url = f"http://{self.miner_ip}"
+        self.clock = clock or REAL_CLOCK
+        self.wake = threading.Event()  # Interrompe le attese di questo overclocker (emergency stop)
+        self.transport = get_transport(self.miner_ip, self.clock)
+        self.history = TelemetryRing()  # Telemetria recente, memoria costante
+        self.snapshot = SnapshotCache(clock=self.clock, history=self.history)
+        self.retry_policy = RetryPolicy()
         self.original_settings = None
         self.emergency_stop = False
         self.results = []
+        self.confirmed_voltages = {}  # frequency -> highest dangerous voltage confirmed
+        self.prior_results = []       # Warm start: risultati di sweep precedenti
+        self.prior_verdicts = {}      # (frequency, voltage) -> stable, ultimo esito noto
+        self.warm_start_files = []
+        self.results_file = None
+        self.journal = None
+        self.replay = {}              # Resume: (frequency, voltage) -> risultato dal journal
+        self.db = None                # Opzionale: ResultsDB (results_db.py) per risultati e telemetria
+        self.sweep_id = None          # Sweep corrente nel database
+        self.warm_start_db = False    # Warm start dai risultati nel database
+        self.last_settle_time = None  # Assestamento misurato dell'ultimo punto (s)
+        self.last_shares = ShareEstimator()  # Share contate durante l'ultimo test
+        self.thermal = {
+            'asic': ThermalModel(SAFETY_CONFIG['thermal_tau']),
+            'vr': ThermalModel(SAFETY_CONFIG['thermal_vr_tau']),
+        }
+        self.thermal_started = 0.0
+        self.thermal_infeasible = None  # Motivo se il punto corrente è termicamente infattibile
+        self.error_violation = None     # Motivo se share rifiutate/errori ASIC oltre soglia
+        self.planner = TestPlanner()
+        self.plan = []                # Strategia 'grid': punti da testare, in ordine
+        self.telemetry_sink = None    # Opzionale: callable(MinerState) per i campioni grezzi
+        self.asic_model = None
         self.setup_logging()
-        self.setup_signal_handlers()
+        if signals:
+            # Solo per lo sweep interattivo: nella flotta lo stop passa da FleetSweep.stop()
+            self.setup_signal_handlers()
         
     def setup_logging(self):
         """Configure comprehensive logging"""
@@ -129,6 +1481,7 @@ class BitAxeSafeOverclock:
         """Emergency shutdown procedure"""
         self.logger.critical("🚨 EMERGENCY SHUTDOWN INITIATED (Ctrl+C detected)")
         self.emergency_stop = True
+        self.wake.set()
         
         # Don't call sys.exit() here - let the main loop handle it gracefully
         print("\n⚠️  Emergency stop requested. Cleaning up safely...")
@@ -139,12 +1492,16 @@ class BitAxeSafeOverclock:
         self.logger.info("Emergency shutdown complete")
         sys.exit(1)
         
+    def wait(self, seconds: float) -> bool:
+        """Sleep on the injected clock; returns False early on emergency stop"""
+        return self.clock.sleep(seconds, lambda: self.emergency_stop, self.wake)
+        
     def validate_configuration(self) -> bool:
         """Validate configuration and connectivity"""
         self.logger.info("Validating configuration...")
         
         # Check IP address format
-        if MINER_IP == "REPLACE_WITH_YOUR_BITAXE_IP":
+        if self.miner_ip == "REPLACE_WITH_YOUR_BITAXE_IP":
             self.logger.error("Please update MINER_IP with your BitAxe IP address")
             return False
             
@@ -154,6 +1511,7 @@ class BitAxeSafeOverclock:
             if not response:
                 return False
                 
+            self.asic_model = response.get('ASICModel')
             self.logger.info(f"Connected to BitAxe: {response.get('ASICModel', 'Unknown')}")
             return True
             
@@ -163,19 +1521,14 @@ class BitAxeSafeOverclock:
             
     def make_api_request(self, endpoint: str, method: str = "GET", data: Dict = None) -> Optional[Dict]:
         """Make API request with error handling and retries"""
-        url = f"http://{MINER_IP}{endpoint}"
+        if method not in ("GET", "POST", "PATCH"):
+            self.logger.error(f"Unsupported HTTP method: {method}")
+            return None
         
-        for attempt in range(3):  # 3 retry attempts
+        for attempt in range(self.retry_policy.max_attempts):
+            last_attempt = attempt == self.retry_policy.max_attempts - 1
             try:
-                if method == "GET":
-                    response = requests.get(url, timeout=10)
-                elif method == "POST":
-                    response = requests.post(url, json=data, timeout=10)
-                elif method == "PATCH":
-                    response = requests.patch(url, json=data, timeout=10)
-                else:
-                    self.logger.error(f"Unsupported HTTP method: {method}")
-                    return None
+                response = self.transport.request(method, endpoint, data=data)
                 
                 # Log the response details for debugging
                 self.logger.debug(f"Response: {response.status_code} for {method} {endpoint}")
@@ -191,64 +1544,48 @@ class BitAxeSafeOverclock:
                             return {}  # Treat invalid JSON as successful empty response
                     else:
                         return {}  # Return empty dict for successful empty responses
-                else:
-                    self.logger.error(f"HTTP error {response.status_code}: {endpoint}")
-                    if attempt == 2:  # Last attempt
-                        return None
+                
+                self.logger.error(f"HTTP error {response.status_code}: {endpoint}")
+                if last_attempt or not self.retry_policy.should_retry(method, status_code=response.status_code):
+                    return None
                     
-            except requests.exceptions.Timeout:
-                self.logger.warning(f"Timeout on attempt {attempt + 1} for {endpoint}")
-            except requests.exceptions.ConnectionError:
-                self.logger.error(f"Connection error for {endpoint}")
+            except CircuitOpenError:
+                self.logger.warning(f"Circuit breaker open for {self.miner_ip}, skipping {method} {endpoint}")
                 return None
             except requests.exceptions.RequestException as e:
-                self.logger.error(f"Request error for {endpoint}: {e}")
+                self.logger.warning(f"{type(e).__name__} on attempt {attempt + 1} for {method} {endpoint}")
+                if last_attempt or not self.retry_policy.should_retry(method, error=e):
+                    self.logger.error(f"Request failed for {endpoint}: {e}")
+                    return None
                 
-            if attempt < 2:  # Don't sleep on last attempt
-                time.sleep(1)
+            # Not interruptible: restore_original_settings relies on these retries
+            self.clock.sleep(self.retry_policy.backoff(attempt))
                 
         return None
         
-    def get_current_state(self) -> MinerState:
-        """Ottiene lo stato attuale del miner"""
-        try:
-            response = requests.get(f"http://{self.miner_ip}/api/system/info", timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            return MinerState(
-                frequency=data.get('frequency', 0),
-                core_voltage=data.get('coreVoltage', 0),  # Corretto nome attributo
-                temperature=data.get('temp', 0),
-                vr_temperature=data.get('vrTemp', 0),
-                hash_rate=data.get('hashRate', 0),
-                power=data.get('power', 0),
-                efficiency=0,  # Calcolato in __post_init__
-                shares_accepted=data.get('sharesAccepted', 0),
-                shares_rejected=data.get('sharesRejected', 0),
-                uptime=data.get('uptimeSeconds', 0)
-                # timestamp viene impostato automaticamente in __post_init__
-            )
-        except Exception as e:
-            self.logger.error(f"Errore nel recupero stato: {e}")
-            raise
-        
-    def check_safety_limits(self, state: MinerState) -> bool:
-        """Verifica che tutti i parametri siano entro i limiti di sicurezza"""
-        if state.temperature > SAFETY_CONFIG['max_temperature']:
-            self.logger.warning(f"Temperatura ASIC troppo alta: {state.temperature}°C")
-            return False
+    def get_current_state(self, max_age: float = None) -> Optional[MinerState]:
+        """Ottiene lo stato attuale del miner (snapshot condiviso per tick)
+
+        max_age overrides the snapshot TTL; pass 0 to force a fresh poll.
+        """
+        state = self.snapshot.get(max_age)
+        if state is not None:
+            return state
         
-        if state.vr_temperature > SAFETY_CONFIG['max_vr_temperature']:
-            self.logger.warning(f"Temperatura VR troppo alta: {state.vr_temperature}°C")
-            return False
+        data = self.make_api_request("/api/system/info")
+        if not data:
+            self.logger.error("Errore nel recupero stato del miner")
+            return None
         
-        if state.power > SAFETY_CONFIG['max_power']:
-            self.logger.warning(f"Potenza troppo alta: {state.power}W")
-            return False
+        state = MinerState.from_system_info(data, self.clock.time())
+        self.snapshot.put(state)
+        return state
         
-        if state.efficiency < SAFETY_CONFIG['min_efficiency']:
-            self.logger.warning(f"Efficienza troppo bassa: {state.efficiency} GH/W")
+    def check_safety_limits(self, state: MinerState) -> bool:
+        """Verifica che tutti i parametri siano entro i limiti di sicurezza"""
+        violation = safety_violation(state)
+        if violation:
+            self.logger.warning(violation)
             return False
         
         return True
@@ -290,49 +1627,162 @@ class BitAxeSafeOverclock:
             
         return success
         
-    def apply_settings(self, frequency: int, core_voltage: int) -> bool:
+    def apply_settings(self, frequency: int, core_voltage: int, fan_speed: int = None) -> bool:
         """Apply frequency and voltage settings safely"""
         self.logger.info(f"Applying settings: {frequency}MHz, {core_voltage}mV")
         
-        # Apply frequency using PATCH method
-        freq_data = {"frequency": frequency}
-        freq_response = self.make_api_request("/api/system", "PATCH", freq_data)
-        if freq_response is None:
-            self.logger.error("Failed to set frequency")
-            return False
-            
-        # Apply core voltage using PATCH method
-        voltage_data = {"coreVoltage": core_voltage}
-        voltage_response = self.make_api_request("/api/system", "PATCH", voltage_data)
-        if voltage_response is None:
-            self.logger.error("Failed to set core voltage")
+        success, mismatches = self.apply_settings_atomic(frequency, core_voltage, fan_speed)
+        if not success:
+            for field, (requested, reported) in mismatches.items():
+                self.logger.error(f"Failed to set {field}: requested {requested}, miner reports {reported}")
             return False
             
-        # Wait for settings to take effect
-        time.sleep(SAFETY_CONFIG["settle_time"])
+        # Wait for settings to take effect (adaptive mode settles where the telemetry is used)
+        if SAFETY_CONFIG['settle_mode'] == 'fixed':
+            self.wait(SAFETY_CONFIG["settle_time"])
         return True
         
-    def test_stability(self, frequency: int, core_voltage: int) -> Tuple[bool, List[float], float]:
-        """Test stability with automatic fan control"""
+    def wait_until_settled(self, max_time: float = None) -> float:
+        """Poll fresh telemetry until SettleDetector reports settled (or max_time)
+        
+        Returns the time actually waited in seconds. Stops early on emergency stop,
+        a safety limit breach or a thermally infeasible point (the caller's own
+        checks handle them).
+        """
+        max_time = SAFETY_CONFIG['settle_max_time'] if max_time is None else max_time
+        detector = SettleDetector()
+        started = self.clock.monotonic()
+        while not self.emergency_stop:
+            elapsed = self.clock.monotonic() - started
+            state = self.get_current_state(max_age=0)
+            if state:
+                if safety_violation(state) or self.thermal_check(state):
+                    break
+                detector.add(elapsed, state.hash_rate, state.temperature)
+                if detector.settled:
+                    self.logger.info(f"⏱️ Settled after {elapsed:.0f}s")
+                    return elapsed
+            if elapsed >= max_time:
+                hashrate_slope, temperature_slope = detector.slopes()
+                self.logger.warning(f"⏱️ Not settled after {max_time:.0f}s "
+                                    f"(hashrate {hashrate_slope:+.2f}%/s, temperature {temperature_slope:+.3f}°C/s)")
+                break
+            self.wait(SAFETY_CONFIG['settle_poll_interval'])
+        return self.clock.monotonic() - started
+        
+    def reset_thermal(self):
+        """New point for the thermal models (after every settings change)"""
+        for model in self.thermal.values():
+            model.reset()
+        self.thermal_started = self.clock.monotonic()
+        self.thermal_infeasible = None
+
+    def thermal_check(self, state: MinerState) -> Optional[str]:
+        """Feed the thermal models; return a reason if the projected steady state is over the limits
+        
+        The reason is also kept in thermal_infeasible for the current point.
+        """
+        if not SAFETY_CONFIG['thermal_prediction']:
+            return None
+        t = self.clock.monotonic() - self.thermal_started
+        self.thermal['asic'].add(t, state.temperature)
+        self.thermal['vr'].add(t, state.vr_temperature)
+        if self.thermal_infeasible or t < SAFETY_CONFIG['thermal_min_time']:
+            return self.thermal_infeasible
+            
+        for sensor, limit in (('asic', SAFETY_CONFIG['max_temperature']), ('vr', SAFETY_CONFIG['max_vr_temperature'])):
+            steady = self.thermal[sensor].steady_state()
+            if steady is not None and steady > limit:
+                self.thermal_infeasible = f"{sensor.upper()} projected to settle at {steady:.1f}°C (limit {limit}°C)"
+                self.logger.warning(f"🌡️ Thermally infeasible: {self.thermal_infeasible}")
+                break
+        return self.thermal_infeasible
+        
+    def apply_settings_atomic(self, frequency: int, core_voltage: int,
+                              fan_speed: int = None) -> Tuple[bool, Dict[str, Tuple[int, Optional[int]]]]:
+        """Send frequency, voltage and fan in one PATCH and verify with a single read-back
+        
+        Returns (success, mismatches) where mismatches maps each API field the miner
+        rejected or clamped to (requested, reported). With autofanspeed on, the fan
+        speed is left to the firmware and only logged.
+        """
+        payload = {"frequency": frequency, "coreVoltage": core_voltage}
+        if fan_speed is not None:
+            payload["fanspeed"] = fan_speed
+            
+        patch_response = self.make_api_request("/api/system", "PATCH", payload)
+        self.snapshot.invalidate()
+        if patch_response is None:
+            self.logger.error(f"Miner rejected settings PATCH: {payload}")
+            
+        # Single read-back tells us exactly which values were applied
+        info = self.make_api_request("/api/system/info")
+        if info is None:
+            self.logger.error("Failed to read back settings after PATCH")
+            return False, {field: (value, None) for field, value in payload.items()}
+        self.snapshot.put(MinerState.from_system_info(info, self.clock.time()))
+            
+        mismatches = {}
+        for field, requested in payload.items():
+            reported = info.get(field)
+            if field == "fanspeed" and info.get("autofanspeed"):
+                # Con autofan attivo il firmware regola la ventola da sé: il valore letto non è un rifiuto
+                if reported != requested:
+                    self.logger.warning(f"⚠️ Autofan is on: requested fanspeed {requested}%, firmware reports {reported}%")
+                continue
+            if reported is None or int(round(float(reported))) != requested:
+                mismatches[field] = (requested, reported)
+                
+        return patch_response is not None and not mismatches, mismatches
+        
+    def test_stability(self, frequency: int, core_voltage: int) -> Tuple[Optional[bool], RunningStats, float]:
+        """Test stability with automatic fan control
+        
+        Polls every sample_interval over the test duration; the hashrate is
+        accumulated in a RunningStats (the raw samples go to telemetry_sink, if set).
+        The verdict is None when failed polls left too few samples: an unreachable
+        miner is not an unstable one.
+        """
         self.logger.info(f"Testing stability: {frequency}MHz @ {core_voltage}mV")
         
-        hashrates = []
-        start_time = time.time()
+        polls, interval = sample_schedule()
+        hashrates = RunningStats(interval=interval)
+        self.last_shares = ShareEstimator()
+        verdict = None
+        sequential = SAFETY_CONFIG['stability_mode'] == 'sequential'
+        # Log at roughly the stability_interval cadence whatever the polling rate
+        log_every = max(1, int(round(SAFETY_CONFIG['stability_interval'] / interval))) if interval else 1
+        
+        self.reset_thermal()
+        self.error_violation = None
         
         # Initial settle time
-        self.logger.info(f"Settling for {SAFETY_CONFIG['settle_time']} seconds...")
-        time.sleep(SAFETY_CONFIG['settle_time'])
+        if SAFETY_CONFIG['settle_mode'] == 'fixed':
+            self.logger.info(f"Settling for {SAFETY_CONFIG['settle_time']} seconds...")
+            self.wait(SAFETY_CONFIG['settle_time'])
+            self.last_settle_time = SAFETY_CONFIG['settle_time']
+        else:
+            self.last_settle_time = self.wait_until_settled()
+        if self.thermal_infeasible:
+            return False, hashrates, 0.0
         
         # Collect stability samples
-        for i in range(SAFETY_CONFIG['stability_samples']):
+        failed_polls = 0
+        for i in range(polls):
             if self.emergency_stop:
                 break
                 
-            # Get current state
-            state = self.get_current_state()
+            # Get current state (fresh poll; the snapshot then feeds fan, safety and results)
+            state = self.get_current_state(max_age=0)
             if not state:
                 self.logger.error("Failed to get miner state during stability test")
+                failed_polls += 1
+                # Stesso ritmo anche senza risposta (con il breaker aperto il fallimento è immediato)
+                if i < polls - 1:
+                    self.wait(interval)
                 continue
+            if self.telemetry_sink:
+                self.telemetry_sink(state)
             
             # Gestione automatica ventola
             self.manage_fan_control(state)
@@ -342,28 +1792,66 @@ class BitAxeSafeOverclock:
                 self.logger.error("Safety limits exceeded during stability test")
                 return False, hashrates, 0.0
             
-            hashrates.append(state.hash_rate)
-            self.logger.info(f"Sample {i+1}/{SAFETY_CONFIG['stability_samples']}: {state.hash_rate:.1f} GH/s, {state.temperature:.1f}°C")
+            # Stop a doomed point before it overheats
+            if self.thermal_check(state):
+                return False, hashrates, 0.0
+            
+            hashrates.add(state.hash_rate)
+            self.last_shares.add(state)
+            message = f"Sample {i+1}/{polls}: {state.hash_rate:.1f} GH/s, {state.temperature:.1f}°C"
+            if i % log_every == 0 or i == polls - 1:
+                self.logger.info(message)
+            else:
+                self.logger.debug(message)
+            
+            # Rejects/ASIC errors rise before the CV does: fail fast
+            self.error_violation = error_rate_violation(self.last_shares)
+            if self.error_violation:
+                self.logger.warning(f"⚠️ Error rate too high: {self.error_violation}")
+                return False, hashrates, hashrates.mean
+            
+            # Sequential mode: stop as soon as the outcome is statistically clear
+            if sequential:
+                verdict = sequential_verdict(hashrates)
+                if verdict is not None:
+                    self.logger.info(f"Sequential test conclusive after {len(hashrates)} samples "
+                                     f"({hashrates.effective_samples:.1f} effective)")
+                    break
             
             # Wait between samples (except for last sample)
-            if i < SAFETY_CONFIG['stability_samples'] - 1:
-                time.sleep(SAFETY_CONFIG['stability_interval'])
+            if i < polls - 1:
+                self.wait(interval)
         
         # Calculate statistics
         if len(hashrates) < 2:
             self.logger.error("Insufficient samples for stability analysis")
+            if failed_polls:
+                self.logger.error(f"{failed_polls} of {polls} polls failed: point not tested")
+                return None, hashrates, 0.0
             return False, hashrates, 0.0
         
-        mean_hashrate = statistics.mean(hashrates)
-        cv = statistics.stdev(hashrates) / mean_hashrate if mean_hashrate > 0 else float('inf')
+        # Check stability criteria (an early sequential verdict takes precedence)
+        is_stable, mean_hashrate, cv = evaluate_stability(hashrates)
+        if verdict is not None:
+            is_stable = verdict
         
-        # Check stability criteria
-        is_stable = (
-            cv <= SAFETY_CONFIG['max_cv_variation'] and
-            mean_hashrate >= SAFETY_CONFIG['min_hashrate_threshold']
-        )
+        self.logger.info(f"Stability test completed: CV={cv:.4f}, Mean={mean_hashrate:.1f} GH/s "
+                         f"[{hashrates.min:.1f}-{hashrates.max:.1f}], Stable={is_stable}, "
+                         f"Samples={len(hashrates)} ({hashrates.effective_samples:.1f} effective)")
         
-        self.logger.info(f"Stability test completed: CV={cv:.4f}, Mean={mean_hashrate:.1f} GH/s, Stable={is_stable}")
+        # Good reported hashrate, but the shares don't back it up
+        shares = self.last_shares
+        if shares.hashrate is not None:
+            low, high = shares.interval()
+            self.logger.info(f"Shares: {shares.accepted} accepted, {shares.rejected} rejected "
+                             f"({shares.reject_rate:.1%}), {shares.hashrate:.1f} GH/s [{low:.1f}-{high:.1f}]")
+        if is_stable and shares.mismatch(mean_hashrate):
+            self.logger.warning(f"⚠️ Reported {mean_hashrate:.1f} GH/s above the share-based estimate: invalid work")
+            is_stable = False
+        self.error_violation = error_rate_violation(shares, final=True)
+        if is_stable and self.error_violation:
+            self.logger.warning(f"⚠️ Error rate too high: {self.error_violation}")
+            is_stable = False
         return is_stable, hashrates, mean_hashrate
         
     def require_user_confirmation(self, message: str) -> bool:
@@ -379,16 +1867,15 @@ class BitAxeSafeOverclock:
             self.logger.info("User cancelled operation")
             return False
             
+    def new_results_filename(self) -> str:
+        return f"bitaxe_safe_tuning_results_{self.clock.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        
     def save_results(self):
         """Save results to CSV with comprehensive data"""
-        filename = f"bitaxe_safe_tuning_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        filename = self.results_file or self.new_results_filename()
         
         with open(filename, 'w', newline='') as csvfile:
-            fieldnames = [
-                'timestamp', 'frequency_mhz', 'core_voltage_mv', 'hashrate_ghs',
-                'temperature_c', 'power_w', 'stable', 'cv', 'notes'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
+            writer = csv.DictWriter(csvfile, fieldnames=RESULT_FIELDNAMES)
             writer.writeheader()
             
             for result in self.results:
@@ -397,35 +1884,116 @@ class BitAxeSafeOverclock:
         self.logger.info(f"Results saved to {filename}")
         return filename  # Return filename for apply_best_settings
 
-    def find_best_settings(self) -> Optional[Dict]:
-        """Find the best stable settings from results"""
-        if not self.results:
+    def load_results_from_csv(self, filename: str) -> List[Dict]:
+        """Load result records for this miner from a sweep CSV"""
+        results = read_results_csv(filename, self.miner_ip)
+        self.logger.info(f"Loaded {len(results)} results from {filename}")
+        return results
+        
+    def warm_start(self, filenames: List[str] = None) -> int:
+        """Seed the sweep with previous results (default: this miner's results in the
+        database, or the RESULTS_GLOB files in the cwd without one)
+        
+        Points whose verdict follows from other prior results are skipped by
+        test_point(); only the stable/unstable frontier is re-tested.
+        Returns the number of prior results loaded.
+        """
+        if filenames is None and self.db:
+            self.warm_start_db = True
+            self.prior_results.extend(r for r in self.db.results(self.miner_ip)
+                                      if r['sweep_id'] != self.sweep_id)
+            source = self.db.path
+        else:
+            if filenames is None:
+                filenames = sorted(glob.glob(RESULTS_GLOB))
+            self.warm_start_files = list(filenames)
+            for filename in filenames:
+                self.prior_results.extend(self.load_results_from_csv(filename))
+            source = f"{len(filenames)} files"
+            
+        # Per ogni punto vale l'esito più recente
+        for result in sorted(self.prior_results, key=lambda r: r['timestamp']):
+            self.prior_verdicts[(result['frequency_mhz'], result['core_voltage_mv'])] = result['stable']
+            
+        stable = sum(1 for ok in self.prior_verdicts.values() if ok)
+        self.logger.info(f"🔥 Warm start: {len(self.prior_verdicts)} known points "
+                         f"({stable} stable) from {source}")
+        return len(self.prior_results)
+        
+    def known_verdict(self, frequency: int, core_voltage: int) -> Optional[bool]:
+        """Verdict implied by prior results, or None if the point must be tested
+        
+        A point is known stable if another prior point at the same or higher
+        frequency and the same or lower voltage was stable, and known unstable if
+        another prior point at the same or lower frequency and the same or higher
+        voltage was unstable. Frontier points (no other point implies them) and
+        conflicting evidence are re-tested.
+        """
+        stable = unstable = False
+        for (f, v), ok in self.prior_verdicts.items():
+            if (f, v) == (frequency, core_voltage):
+                continue
+            if ok and f >= frequency and v <= core_voltage:
+                stable = True
+            elif not ok and f <= frequency and v >= core_voltage:
+                unstable = True
+        if stable == unstable:
+            return None
+        return stable
+        
+    def known_results(self) -> List[Dict]:
+        """Latest result per point: warm start results, then this sweep's
+        
+        Prior results are left out once the sweep contradicted them (see record_result).
+        """
+        prior = sorted(self.prior_results, key=lambda r: r['timestamp']) if self.prior_verdicts else []
+        latest = {}
+        for result in prior + self.results:
+            latest[(result['frequency_mhz'], result['core_voltage_mv'])] = result
+        return list(latest.values())
+        
+    def find_best_settings(self, results: List[Dict] = None, **criteria) -> Optional[Dict]:
+        """Find the best stable settings (default: known_results(), warm start included)
+        
+        criteria are passed to rank_settings(): objective, max_power, min_hashrate,
+        max_temperature, weights. Defaults come from the selection_* config keys.
+        """
+        if results is None:
+            results = self.known_results()
+        if not results:
             self.logger.error("No results available to analyze")
             return None
             
-        # Filter only stable results
-        stable_results = [r for r in self.results if r['stable']]
-        
-        if not stable_results:
+        if not any(r['stable'] for r in results):
             self.logger.error("No stable results found")
             return None
             
-        # Find best result based on highest hashrate
-        best_result = max(stable_results, key=lambda x: x['hashrate_ghs'])
+        best_result = select_best(results, **criteria)
+        if not best_result:
+            self.logger.error("No stable results satisfy the selection constraints")
+            return None
         
+        frontier = pareto_frontier(results)
+        self.logger.info(f"Pareto frontier: {len(frontier)} of {sum(r['stable'] for r in results)} stable points")
         self.logger.info(f"Best settings found: {best_result['frequency_mhz']}MHz @ {best_result['core_voltage_mv']}mV")
-        self.logger.info(f"Performance: {best_result['hashrate_ghs']:.1f} GH/s, {best_result['temperature_c']:.1f}°C")
+        self.logger.info(f"Performance: {best_result['hashrate_ghs']:.1f} GH/s, {best_result['power_w']:.1f}W "
+                         f"({joules_per_th(best_result):.1f} J/TH), {best_result['temperature_c']:.1f}°C")
         
         return {
             'frequency': best_result['frequency_mhz'],
             'core_voltage': best_result['core_voltage_mv'],
+            'voltage': best_result['core_voltage_mv'],
             'hashrate': best_result['hashrate_ghs'],
-            'temperature': best_result['temperature_c']
+            'temperature': best_result['temperature_c'],
+            'power': best_result['power_w'],
+            'efficiency': best_result['hashrate_ghs'] / best_result['power_w'] if best_result['power_w'] > 0 else 0,
+            'joules_per_th': joules_per_th(best_result),
+            'stability_margin': stability_margin(best_result),
         }
 
-    def apply_best_settings(self) -> bool:
-        """Apply the best settings found during sweep"""
-        best_settings = self.find_best_settings()
+    def apply_best_settings(self, results: List[Dict] = None, **criteria) -> bool:
+        """Apply the best settings found during sweep (or among results, see find_best_settings)"""
+        best_settings = self.find_best_settings(results, **criteria)
         
         if not best_settings:
             self.logger.error("Cannot apply best settings - no optimal configuration found")
@@ -435,7 +2003,8 @@ class BitAxeSafeOverclock:
         
         # Ask for user confirmation
         message = f"Apply best settings: {best_settings['frequency']}MHz @ {best_settings['core_voltage']}mV?\n"
-        message += f"Expected performance: {best_settings['hashrate']:.1f} GH/s @ {best_settings['temperature']:.1f}°C"
+        message += f"Expected performance: {best_settings['hashrate']:.1f} GH/s @ {best_settings['temperature']:.1f}°C, "
+        message += f"{best_settings['power']:.1f}W ({best_settings['joules_per_th']:.1f} J/TH)"
         
         if not self.require_user_confirmation(message):
             self.logger.info("User cancelled applying best settings")
@@ -449,7 +2018,11 @@ class BitAxeSafeOverclock:
             self.logger.info(f"New settings: {best_settings['frequency']}MHz @ {best_settings['core_voltage']}mV")
             
             # Verify the settings are working
-            time.sleep(30)  # Wait for stabilization
+            self.reset_thermal()
+            if SAFETY_CONFIG['settle_mode'] == 'fixed':
+                self.wait(30)  # Wait for stabilization
+            else:
+                self.wait_until_settled()
             current_state = self.get_current_state()
             if current_state:
                 self.logger.info(f"Current performance: {current_state.hash_rate:.1f} GH/s @ {current_state.temperature:.1f}°C")
@@ -458,219 +2031,515 @@ class BitAxeSafeOverclock:
             
         return success
 
-    def run_overclock_sweep(self):
-        """Optimized overclocking sweep - maintains voltage and increases frequency until instability"""
-        self.logger.info("Starting optimized BitAxe overclock sweep (progressive frequency-voltage)")
+    def test_point(self, frequency: int, core_voltage: int, stable_note: str, unstable_note: str) -> Optional[bool]:
+        """Apply, test and record one sweep point
         
-        # Validation phase
-        if not self.validate_configuration():
-            self.logger.error("Configuration validation failed")
+        Returns the stability verdict, or None if the point could not be tested.
+        Sets emergency_stop if the final state exceeds the safety limits.
+        With warm start, points settled by prior results are not re-tested.
+        """
+        self.thermal_infeasible = None
+        known = self.known_verdict(frequency, core_voltage)
+        if known is not None:
+            self.logger.info(f"⏭️ {frequency}MHz @ {core_voltage}mV known {'stable' if known else 'unstable'} from previous results")
+            return known
+            
+        replayed = self.replay.pop((frequency, core_voltage), None)
+        if replayed is not None:
+            self.logger.info(f"↩️ {frequency}MHz @ {core_voltage}mV replayed from journal "
+                             f"({'stable' if replayed['stable'] else 'unstable'})")
+            if replayed['notes'] == 'thermally_infeasible':
+                self.thermal_infeasible = replayed['notes']
+            self.record_result(replayed, journal=False)
+            return replayed['stable']
+            
+        self.logger.info(f"Testing {frequency}MHz @ {core_voltage}mV")
+        started = self.clock.monotonic()
+        
+        # Apply settings (fan included: one PATCH instead of a second one at the first sample)
+        if not self.apply_settings(frequency, core_voltage, self.planned_fan_speed()):
+            self.logger.error("Failed to apply settings, skipping")
+            return None
+            
+        # Test stability
+        stable, hashrates, mean_hashrate = self.test_stability(frequency, core_voltage)
+        if stable is None:
+            self.logger.error("Miner did not answer during the stability test, skipping")
+            return None
+        
+        # Get final state
+        final_state = self.get_current_state()
+        if not final_state:
+            self.logger.error("Failed to get final state")
+            return None
+            
+        # Calculate coefficient of variation
+        cv_value = 0.0
+        if len(hashrates) > 1 and mean_hashrate > 0:
+            cv_value = hashrates.cv
+        
+        shares = self.last_shares
+        note = stable_note
+        if not stable:
+            if self.thermal_infeasible:
+                note = 'thermally_infeasible'
+            elif self.error_violation:
+                note = f"{unstable_note}_error_rate"
+            elif shares.mismatch(mean_hashrate):
+                note = f"{unstable_note}_invalid_work"
+            else:
+                note = unstable_note
+            
+        # Record results
+        self.record_result({
+            'timestamp': final_state.isotime(),
+            'frequency_mhz': frequency,
+            'core_voltage_mv': core_voltage,
+            'hashrate_ghs': mean_hashrate,
+            'temperature_c': final_state.temperature,
+            'power_w': final_state.power,
+            'stable': stable,
+            'cv': cv_value,
+            'notes': note,
+            'samples': len(hashrates),
+            'settle_time_s': self.last_settle_time,
+            'shares_accepted': shares.accepted,
+            'shares_rejected': shares.rejected,
+            'share_hashrate_ghs': shares.hashrate
+        })
+        
+        # Safety check after each test
+        if not self.check_safety_limits(final_state):
+            self.logger.error("Safety limits exceeded, stopping sweep")
+            self.emergency_stop = True
+            
+        self.planner.observe(self.planner.position, (frequency, core_voltage), self.last_settle_time,
+                             self.clock.monotonic() - started)
+        self.log_eta()
+        return stable
+        
+    def record_result(self, result: Dict, journal: bool = True):
+        """Append a result record (journaled before anything else happens)"""
+        if journal and self.journal:
+            self.journal.append('point', result=result)
+        if journal and self.db and self.sweep_id is not None:
+            self.db.add_result(self.sweep_id, result)
+        self.results.append(result)
+        
+        point = (result['frequency_mhz'], result['core_voltage_mv'])
+        if self.prior_verdicts.get(point, result['stable']) != result['stable']:
+            # Il fronte si è spostato (firmware, raffreddamento...): i risultati precedenti non valgono più
+            self.logger.warning(f"⚠️ {point[0]}MHz @ {point[1]}mV no longer matches previous results - "
+                                f"dropping warm start data")
+            self.prior_verdicts.clear()
+        elif self.prior_verdicts:
+            self.prior_verdicts[point] = result['stable']
+            
+    def journal_state(self, phase: str, frequency: int = None, core_voltage: int = None):
+        """Record the search position in the journal"""
+        if self.journal:
+            self.journal.append('state', phase=phase, frequency=frequency, core_voltage=core_voltage)
+            
+    def start_journal(self, strategy: str):
+        """Open the journal of a new sweep (next to its results file)"""
+        self.results_file = self.new_results_filename()
+        self.journal = SweepJournal(self.results_file[:-len('.csv')] + JOURNAL_SUFFIX)
+        self.journal.append('start', results_file=self.results_file, miner_ip=self.miner_ip,
+                            strategy=strategy, config=SAFETY_CONFIG,
+                            original_settings=self.original_settings,
+                            warm_start=self.warm_start_files, warm_start_db=self.warm_start_db)
+        self.logger.info(f"📝 Journal: {self.journal.path}")
+        if self.db:
+            self.sweep_id = self.db.start_sweep(self.miner_ip, strategy, source=os.path.abspath(self.results_file))
+        
+    def resume(self, journal_path: str = None) -> bool:
+        """Prepare to resume an interrupted sweep from its journal
+        
+        Restores the sweep configuration, original settings and warm start of
+        the interrupted run. Points already in the journal are replayed by
+        test_point() instead of re-tested, so run_overclock_sweep() walks the
+        same path up to the last finished point and continues from there,
+        rebuilding the same results file.
+        """
+        journal_path = journal_path or SweepJournal.find_unfinished()
+        if not journal_path:
+            self.logger.error("No unfinished sweep journal found")
             return False
             
-        # Backup original settings
-        if not self.backup_original_settings():
-            self.logger.error("Failed to backup original settings")
+        records = SweepJournal.read(journal_path)
+        if not records or records[0]['type'] != 'start':
+            self.logger.error(f"Invalid sweep journal: {journal_path}")
+            return False
+        start = records[0]
+        if start.get('miner_ip') != self.miner_ip:
+            self.logger.error(f"Journal {journal_path} belongs to miner {start.get('miner_ip')}")
             return False
             
-        try:
-            # Start with minimum frequency and find stable voltage
-            current_freq = SAFETY_CONFIG["freq_start"]
-            current_voltage = None
+        SAFETY_CONFIG.update({k: v for k, v in start['config'].items() if k in SAFETY_CONFIG})
+        self.original_settings = start['original_settings']
+        self.results_file = start['results_file']
+        if self.db:
+            self.sweep_id = self.db.start_sweep(self.miner_ip, start.get('strategy'),
+                                                source=os.path.abspath(self.results_file))
+        if start.get('warm_start_db') and self.db:
+            self.warm_start()
+        elif start.get('warm_start'):
+            self.warm_start(start['warm_start'])
+        points = [r['result'] for r in records if r['type'] == 'point']
+        self.replay = {(p['frequency_mhz'], p['core_voltage_mv']): p for p in points}
+        states = [r for r in records if r['type'] == 'state']
+        
+        self.journal = SweepJournal(journal_path)
+        self.journal.append('resume', points=len(points))
+        where = f" (last phase: {states[-1]['phase']} at {states[-1]['frequency']}MHz @ {states[-1]['core_voltage']}mV)" if states else ""
+        self.logger.info(f"♻️ Resuming sweep from {journal_path}: {len(points)} points done{where}")
+        return True
+        
+    def voltage_allowed(self, frequency: int, core_voltage: int) -> bool:
+        """Check hard voltage limits and ask confirmation for dangerous voltages"""
+        if not SAFETY_CONFIG['min_voltage'] <= core_voltage <= SAFETY_CONFIG['max_voltage']:
+            self.logger.warning(f"Voltage {core_voltage}mV outside hard limits, not testing")
+            return False
             
-            self.logger.info(f"\n🎯 === Finding initial stable configuration at {current_freq}MHz ===")
+        # Require confirmation for dangerous voltages (a confirmed voltage covers lower ones)
+        if core_voltage >= SAFETY_CONFIG["cv_danger_threshold"]:
+            if core_voltage <= self.confirmed_voltages.get(frequency, 0) or (frequency, core_voltage) in self.replay:
+                return True
+            if not self.require_user_confirmation(
+                f"About to test potentially dangerous voltage: {core_voltage}mV at {frequency}MHz"):
+                self.logger.info("User declined dangerous voltage test")
+                return False
+            self.confirmed_voltages[frequency] = core_voltage
+        return True
+        
+    def find_min_stable_voltage(self, frequency: int, low: int, high: int, stable_note: str,
+                                unstable_note: str, known_unstable: int = None) -> Optional[int]:
+        """Find the lowest stable voltage in [low, high] at a frequency
+        
+        Uses the strategy selected by SAFETY_CONFIG['voltage_search'].
+        Returns None if no stable voltage was found (or the sweep was stopped).
+        """
+        if SAFETY_CONFIG['voltage_search'] == 'bisection':
+            return self._bisect_voltage(frequency, low, high, stable_note, unstable_note, known_unstable)
             
-            # Find minimum stable voltage for starting frequency
-            for cv in range(SAFETY_CONFIG["cv_start"], SAFETY_CONFIG["cv_end"] + 1, SAFETY_CONFIG["cv_step"]):
-                if self.emergency_stop:
-                    break
-                    
-                # Require confirmation for dangerous voltages
-                if cv >= SAFETY_CONFIG["cv_danger_threshold"]:
-                    if not self.require_user_confirmation(
-                        f"About to test potentially dangerous voltage: {cv}mV at {current_freq}MHz"):
-                        self.logger.info("User declined dangerous voltage test")
-                        break
-                        
-                self.logger.info(f"Testing {current_freq}MHz @ {cv}mV")
-                
-                # Apply settings
-                if not self.apply_settings(current_freq, cv):
-                    self.logger.error("Failed to apply settings, skipping")
-                    continue
-                    
-                # Test stability
-                stable, hashrates, mean_hashrate = self.test_stability(current_freq, cv)
-                
-                # Get final state
-                final_state = self.get_current_state()
-                if not final_state:
-                    self.logger.error("Failed to get final state")
-                    continue
-                    
-                # Calculate coefficient of variation
-                cv_value = 0.0
-                if len(hashrates) > 1 and mean_hashrate > 0:
-                    cv_value = statistics.stdev(hashrates) / mean_hashrate
-                    
-                # Record results
-                result = {
-                    'timestamp': final_state.timestamp.isoformat(),
-                    'frequency_mhz': current_freq,
-                    'core_voltage_mv': cv,
-                    'hashrate_ghs': mean_hashrate,
-                    'temperature_c': final_state.temperature,
-                    'power_w': final_state.power,
-                    'stable': stable,
-                    'cv': cv_value,
-                    'notes': f'initial_stable_voltage' if stable else 'unstable'
-                }
-                
-                self.results.append(result)
+        for cv in range(low, high + 1, SAFETY_CONFIG["cv_step"]):
+            if self.emergency_stop or not self.voltage_allowed(frequency, cv):
+                break
+            stable = self.test_point(frequency, cv, stable_note, unstable_note)
+            if self.emergency_stop:
+                break
+            if stable:
+                return cv
+            if stable is False and self.thermal_infeasible:
+                break  # Higher voltage only runs hotter
+            if stable is False:
+                self.logger.info(f"❌ UNSTABLE: {frequency}MHz @ {cv}mV - trying higher voltage")
+        return None
+        
+    def _bisect_voltage(self, frequency: int, low: int, high: int, stable_note: str,
+                        unstable_note: str, known_unstable: int = None) -> Optional[int]:
+        """Galloping search up from low, then bisection down to cv_resolution"""
+        resolution = SAFETY_CONFIG['cv_resolution']
+        unstable_at = known_unstable
+        stable_at = None
+        
+        # Gallop: cv_step, 2*cv_step, 4*cv_step... until a stable voltage is found
+        cv, jump = low, SAFETY_CONFIG['cv_step']
+        while cv <= high:
+            if self.emergency_stop or not self.voltage_allowed(frequency, cv):
+                break
+            stable = self.test_point(frequency, cv, stable_note, unstable_note)
+            if self.emergency_stop:
+                return None
+            if stable:
+                stable_at = cv
+                break
+            if stable is False and self.thermal_infeasible:
+                break  # Higher voltage only runs hotter
+            if stable is False:
+                unstable_at = cv
+            if cv == high:
+                break
+            cv, jump = min(high, cv + jump), jump * 2
+            
+        if stable_at is None:
+            return None
+            
+        # Bisect the bracket (unstable_at, stable_at] on the resolution grid
+        while unstable_at is not None and stable_at - unstable_at > resolution:
+            mid = int(round((unstable_at + stable_at) / 2 / resolution)) * resolution
+            if not unstable_at < mid < stable_at:
+                break
+            stable = self.test_point(frequency, mid, stable_note, unstable_note)
+            if self.emergency_stop:
+                return None
+            if stable is None:
+                break
+            if stable:
+                stable_at = mid
+            else:
+                unstable_at = mid
                 
-                # Safety check after each test
-                if not self.check_safety_limits(final_state):
-                    self.logger.error("Safety limits exceeded, stopping sweep")
-                    self.emergency_stop = True
+        self.logger.info(f"🔋 Minimum stable voltage at {frequency}MHz: {stable_at}mV (±{resolution}mV)")
+        return stable_at
+        
+    def grid_points(self) -> List[Tuple[int, int]]:
+        """The freq_start..freq_end x cv_start..cv_end sweep grid"""
+        return [(f, v)
+                for v in range(SAFETY_CONFIG['cv_start'], SAFETY_CONFIG['cv_end'] + 1, SAFETY_CONFIG['cv_step'])
+                for f in range(SAFETY_CONFIG['freq_start'], SAFETY_CONFIG['freq_end'] + 1, SAFETY_CONFIG['freq_step'])]
+        
+    def progressive_path(self) -> List[Tuple[int, int]]:
+        """Expected remaining points of the progressive sweep
+        
+        The actual path depends on the verdicts; the estimate assumes the minimum
+        stable voltage rises evenly from the current point to cv_end at freq_end,
+        each voltage step costing one failed test.
+        """
+        tested = {(r['frequency_mhz'], r['core_voltage_mv']) for r in self.results}
+        stable = [r for r in self.results if r['stable']]
+        path = []
+        if stable:
+            best = max(stable, key=lambda r: (r['frequency_mhz'], -r['core_voltage_mv']))
+            frequency, core_voltage = best['frequency_mhz'], best['core_voltage_mv']
+        else:
+            frequency, core_voltage = SAFETY_CONFIG['freq_start'], SAFETY_CONFIG['cv_start']
+            while (frequency, core_voltage) in tested and core_voltage < SAFETY_CONFIG['cv_end']:
+                core_voltage += SAFETY_CONFIG['cv_step']
+            path.append((frequency, core_voltage))
+        freqs = list(range(frequency + SAFETY_CONFIG['freq_step'], SAFETY_CONFIG['freq_end'] + 1, SAFETY_CONFIG['freq_step']))
+        start_voltage = core_voltage
+        for i, freq in enumerate(freqs, 1):
+            target = start_voltage + (SAFETY_CONFIG['cv_end'] - start_voltage) * i / len(freqs)
+            path.append((freq, core_voltage))
+            while core_voltage + SAFETY_CONFIG['cv_step'] <= target + 1e-9:
+                core_voltage += SAFETY_CONFIG['cv_step']
+                path.append((freq, core_voltage))
+        return [p for p in path if p not in tested]
+        
+    def eta(self) -> Tuple[int, float]:
+        """(points, seconds) expected for the rest of the sweep"""
+        self.planner.fit(self.prior_results + self.results)
+        if SAFETY_CONFIG['thermal_prediction']:
+            self.planner.tau = self.thermal['asic'].tau
+        strategy = SAFETY_CONFIG['sweep_strategy']
+        if strategy == 'surrogate':
+            # Punti scelti uno alla volta: stima sul budget rimasto
+            remaining = max(0, SAFETY_CONFIG['surrogate_max_tests'] - len(self.results))
+            point = self.planner.position or (SAFETY_CONFIG['freq_start'], SAFETY_CONFIG['cv_start'])
+            return remaining, remaining * (self.planner.settle_time(None, point) + self.planner.test_time)
+        if strategy == 'grid':
+            tested = {(r['frequency_mhz'], r['core_voltage_mv']) for r in self.results}
+            points = [p for p in self.plan if p not in tested and not self.beyond_failure(*p)]
+        else:
+            points = self.progressive_path()
+        return len(points), self.planner.cost(points, self.planner.position)
+        
+    def log_eta(self, label: str = "ETA"):
+        """Log the expected remaining sweep time and finish time"""
+        points, seconds = self.eta()
+        finish = self.clock.now() + timedelta(seconds=seconds)
+        self.logger.info(f"⏳ {label}: {points} points, ~{seconds / 60:.0f} min (finish ~{finish:%H:%M})")
+        
+    def beyond_failure(self, frequency: int, core_voltage: int) -> bool:
+        """True if this sweep already failed at the same or lower frequency and the same or higher voltage"""
+        return any(not r['stable'] and r['frequency_mhz'] <= frequency and r['core_voltage_mv'] >= core_voltage
+                   for r in self.results)
+        
+    def grid_search(self) -> bool:
+        """Test the whole sweep grid in the order planned by TestPlanner
+        
+        Points beyond a failure are skipped. Returns True if a stable point was found.
+        """
+        for frequency, core_voltage in self.plan:
+            if self.emergency_stop:
+                break
+            if self.beyond_failure(frequency, core_voltage):
+                self.logger.info(f"⏭️ {frequency}MHz @ {core_voltage}mV skipped - unstable at lower frequency/higher voltage")
+                continue
+            if not self.voltage_allowed(frequency, core_voltage):
+                continue
+            self.test_point(frequency, core_voltage, 'grid_stable', 'grid_unstable')
+        return any(r['stable'] for r in self.prior_results + self.results)
+        
+    def surrogate_search(self) -> bool:
+        """Model-guided sweep: test the point with the highest expected improvement until converged
+        
+        Candidates are the freq_start..freq_end x cv_start..cv_end grid, limited to
+        surrogate_trust_steps frequency steps beyond a point proven stable at the same
+        or lower voltage. Until a point is stable, the voltage is raised at freq_start. Every point goes through voltage_allowed() and test_point(),
+        so results have the same records as the progressive sweep. Returns True if a
+        stable point was found.
+        """
+        freqs = list(range(SAFETY_CONFIG['freq_start'], SAFETY_CONFIG['freq_end'] + 1, SAFETY_CONFIG['freq_step']))
+        volts = list(range(SAFETY_CONFIG['cv_start'], SAFETY_CONFIG['cv_end'] + 1, SAFETY_CONFIG['cv_step']))
+        candidates = [(f, v) for f in freqs for v in volts]
+        reach = SAFETY_CONFIG['surrogate_trust_steps'] * SAFETY_CONFIG['freq_step']
+        initial = [(freqs[0], volts[0])]
+        skipped = set()
+        model = SurrogateModel()
+        
+        tests = 0
+        while tests < SAFETY_CONFIG['surrogate_max_tests'] and not self.emergency_stop:
+            history = self.prior_results + self.results
+            model.fit(history)
+            tested = {(r['frequency_mhz'], r['core_voltage_mv']) for r in history}
+            initial = [p for p in initial if p not in tested and self.known_verdict(*p) is None]
+            if not initial and not model.stable_points:
+                # Nessun punto stabile ancora: si sale in tensione alla frequenza iniziale
+                initial = [(freqs[0], v) for v in volts if (freqs[0], v) not in tested
+                           and (freqs[0], v) not in skipped and self.known_verdict(freqs[0], v) is None][:1]
+                if not initial:
+                    self.logger.info("🧭 No stable point at the starting frequency")
                     break
-                
-                # If stable, we found our starting point
-                if stable:
-                    current_voltage = cv
-                    self.logger.info(f"✅ INITIAL STABLE CONFIG: {current_freq}MHz @ {cv}mV - {mean_hashrate:.1f} GH/s")
+            if initial:
+                frequency, core_voltage = initial.pop(0)
+            else:
+                scored = []
+                for frequency, core_voltage in candidates:
+                    if (frequency, core_voltage) in tested or (frequency, core_voltage) in skipped:
+                        continue
+                    if model.dominated(frequency, core_voltage) or self.known_verdict(frequency, core_voltage) is not None:
+                        continue
+                    # Espansione sicura: solo vicino a punti già provati stabili
+                    if not any(frequency - f <= reach and v <= core_voltage for f, v in model.stable_points):
+                        continue
+                    if model.stability(frequency, core_voltage) < SAFETY_CONFIG['surrogate_min_stability']:
+                        continue
+                    if model.predict(frequency, core_voltage)[1] > SAFETY_CONFIG['max_power']:
+                        continue
+                    scored.append((model.expected_improvement(frequency, core_voltage), frequency, core_voltage))
+                if not scored:
+                    self.logger.info("🧭 No candidate left inside the safety envelope")
                     break
-                else:
-                    self.logger.info(f"❌ UNSTABLE: {current_freq}MHz @ {cv}mV - trying higher voltage")
+                improvement, frequency, core_voltage = max(scored)
+                # Convergenza solo quando la superficie di hashrate è determinata (3 coefficienti)
+                if len(model.stable_points) >= 3 and improvement < SAFETY_CONFIG['surrogate_tolerance'] * model.best:
+                    self.logger.info(f"🧭 Converged after {tests} tests (expected improvement {improvement:.2f})")
+                    break
+                self.logger.info(f"🧭 Next point {frequency}MHz @ {core_voltage}mV: "
+                                 f"P(stable)={model.stability(frequency, core_voltage):.2f}, EI={improvement:.2f}")
+                
+            if not self.voltage_allowed(frequency, core_voltage):
+                skipped.add((frequency, core_voltage))
+                continue
+            stable = self.test_point(frequency, core_voltage, 'surrogate_stable', 'surrogate_unstable')
+            tests += 1
+            if stable is None:
+                skipped.add((frequency, core_voltage))
+                
+        return any(r['stable'] for r in self.prior_results + self.results)
+        
+    def prepare_sweep(self) -> bool:
+        """Validate, back up the original settings, plan and open the journal"""
+        # Validation phase
+        if not self.validate_configuration():
+            self.logger.error("Configuration validation failed")
+            return False
             
-            # If no stable voltage found at starting frequency, abort
-            if current_voltage is None:
-                self.logger.error(f"No stable voltage found at starting frequency {current_freq}MHz")
-                return False
+        # Backup original settings (a resumed sweep keeps the ones in its journal)
+        if self.original_settings:
+            self.logger.info(f"Original settings from journal: {self.original_settings}")
+        elif not self.backup_original_settings():
+            self.logger.error("Failed to backup original settings")
+            return False
             
-            # Now progressively increase frequency while maintaining voltage
-            self.logger.info(f"\n🚀 === Progressive frequency increase from {current_freq}MHz @ {current_voltage}mV ===")
+        # Piano e ETA prima di toccare le impostazioni del miner
+        self.planner.position = (self.original_settings['frequency'], self.original_settings['core_voltage'])
+        if SAFETY_CONFIG['sweep_strategy'] == 'grid':
+            self.plan = self.planner.order(self.grid_points(), self.planner.position, prune=True)
+            self.logger.info(f"📅 Test order ({SAFETY_CONFIG['test_order']}): "
+                             + ", ".join(f"{f}/{v}" for f, v in self.plan))
+        self.log_eta("Planned sweep")
             
-            for freq in range(current_freq + SAFETY_CONFIG["freq_step"], SAFETY_CONFIG["freq_end"] + 1, SAFETY_CONFIG["freq_step"]):
-                if self.emergency_stop:
-                    break
-                    
-                self.logger.info(f"\n🎯 Testing {freq}MHz @ {current_voltage}mV (maintaining voltage)")
-                
-                # Apply settings with current voltage
-                if not self.apply_settings(freq, current_voltage):
-                    self.logger.error("Failed to apply settings, skipping")
-                    continue
-                    
-                # Test stability
-                stable, hashrates, mean_hashrate = self.test_stability(freq, current_voltage)
+        if not self.journal:
+            self.start_journal(SAFETY_CONFIG['sweep_strategy'])
+        return True
+        
+    def search(self) -> bool:
+        """Run the search of SAFETY_CONFIG['sweep_strategy']; True if a stable point was found"""
+        if SAFETY_CONFIG['sweep_strategy'] == 'grid':
+            self.logger.info("🗺️ Full grid sweep in planned order")
+            self.journal_state('grid')
+            return self.grid_search()
+            
+        if SAFETY_CONFIG['sweep_strategy'] == 'surrogate':
+            self.logger.info("🧭 Model-guided sweep (surrogate + expected improvement)")
+            self.journal_state('surrogate')
+            return self.surrogate_search()
+            
+        return self.progressive_search()
+        
+    def progressive_search(self) -> bool:
+        """Maintain the voltage and raise the frequency until instability, then raise the voltage"""
+        # Start with minimum frequency and find stable voltage
+        current_freq = SAFETY_CONFIG["freq_start"]
+        
+        self.logger.info(f"\n🎯 === Finding initial stable configuration at {current_freq}MHz ===")
+        self.journal_state('initial_voltage', current_freq, SAFETY_CONFIG["cv_start"])
+        
+        # Find minimum stable voltage for starting frequency
+        current_voltage = self.find_min_stable_voltage(
+            current_freq, SAFETY_CONFIG["cv_start"], SAFETY_CONFIG["cv_end"],
+            'initial_stable_voltage', 'unstable'
+        )
+        
+        # If no stable voltage found at starting frequency, abort
+        if current_voltage is None:
+            self.logger.error(f"No stable voltage found at starting frequency {current_freq}MHz")
+            return False
+        self.logger.info(f"✅ INITIAL STABLE CONFIG: {current_freq}MHz @ {current_voltage}mV")
+        self.journal_state('progressive', current_freq, current_voltage)
+        
+        # Now progressively increase frequency while maintaining voltage
+        self.logger.info(f"\n🚀 === Progressive frequency increase from {current_freq}MHz @ {current_voltage}mV ===")
+        
+        for freq in range(current_freq + SAFETY_CONFIG["freq_step"], SAFETY_CONFIG["freq_end"] + 1, SAFETY_CONFIG["freq_step"]):
+            if self.emergency_stop:
+                break
                 
-                # Get final state
-                final_state = self.get_current_state()
-                if not final_state:
-                    self.logger.error("Failed to get final state")
-                    continue
-                    
-                # Calculate coefficient of variation
-                cv_value = 0.0
-                if len(hashrates) > 1 and mean_hashrate > 0:
-                    cv_value = statistics.stdev(hashrates) / mean_hashrate
-                    
-                # Record results
-                result = {
-                    'timestamp': final_state.timestamp.isoformat(),
-                    'frequency_mhz': freq,
-                    'core_voltage_mv': current_voltage,
-                    'hashrate_ghs': mean_hashrate,
-                    'temperature_c': final_state.temperature,
-                    'power_w': final_state.power,
-                    'stable': stable,
-                    'cv': cv_value,
-                    'notes': f'progressive_freq_test' if stable else 'freq_limit_reached'
-                }
+            self.logger.info(f"\n🎯 Testing {freq}MHz @ {current_voltage}mV (maintaining voltage)")
+            
+            stable = self.test_point(freq, current_voltage, 'progressive_freq_test', 'freq_limit_reached')
+            if self.emergency_stop:
+                break
+            if stable is None:
+                continue
+            
+            if stable:
+                self.logger.info(f"✅ STABLE: {freq}MHz @ {current_voltage}mV")
+                current_freq = freq  # Update current stable frequency
+            else:
+                self.logger.info(f"❌ UNSTABLE: {freq}MHz @ {current_voltage}mV - frequency limit reached")
+                self.logger.info(f"🎯 MAXIMUM STABLE FREQUENCY: {current_freq}MHz @ {current_voltage}mV")
                 
-                self.results.append(result)
+                # Try to find higher voltage for this frequency
+                self.logger.info(f"\n🔋 Trying higher voltages for {freq}MHz...")
+                self.journal_state('higher_voltage', freq, current_voltage)
+                voltage = self.find_min_stable_voltage(
+                    freq, current_voltage + SAFETY_CONFIG["cv_step"], SAFETY_CONFIG["cv_end"],
+                    'higher_voltage_test', 'voltage_limit_reached', known_unstable=current_voltage
+                )
                 
-                # Safety check after each test
-                if not self.check_safety_limits(final_state):
-                    self.logger.error("Safety limits exceeded, stopping sweep")
-                    self.emergency_stop = True
+                if voltage is None:
+                    self.logger.info(f"🏁 FINAL RESULT: Maximum stable configuration is {current_freq}MHz @ {current_voltage}mV")
                     break
                 
-                if stable:
-                    self.logger.info(f"✅ STABLE: {freq}MHz @ {current_voltage}mV - {mean_hashrate:.1f} GH/s, {final_state.temperature:.1f}°C")
-                    current_freq = freq  # Update current stable frequency
-                else:
-                    self.logger.info(f"❌ UNSTABLE: {freq}MHz @ {current_voltage}mV - frequency limit reached")
-                    self.logger.info(f"🎯 MAXIMUM STABLE FREQUENCY: {current_freq}MHz @ {current_voltage}mV")
-                    
-                    # Try to find higher voltage for this frequency
-                    self.logger.info(f"\n🔋 Trying higher voltages for {freq}MHz...")
-                    voltage_found = False
-                    
-                    for cv in range(current_voltage + SAFETY_CONFIG["cv_step"], SAFETY_CONFIG["cv_end"] + 1, SAFETY_CONFIG["cv_step"]):
-                        if self.emergency_stop:
-                            break
-                            
-                        # Require confirmation for dangerous voltages
-                        if cv >= SAFETY_CONFIG["cv_danger_threshold"]:
-                            if not self.require_user_confirmation(
-                                f"About to test potentially dangerous voltage: {cv}mV at {freq}MHz"):
-                                self.logger.info("User declined dangerous voltage test")
-                                break
-                                
-                        self.logger.info(f"Testing {freq}MHz @ {cv}mV")
-                        
-                        # Apply settings
-                        if not self.apply_settings(freq, cv):
-                            self.logger.error("Failed to apply settings, skipping")
-                            continue
-                            
-                        # Test stability
-                        stable_hv, hashrates_hv, mean_hashrate_hv = self.test_stability(freq, cv)
-                        
-                        # Get final state
-                        final_state_hv = self.get_current_state()
-                        if not final_state_hv:
-                            self.logger.error("Failed to get final state")
-                            continue
-                            
-                        # Calculate coefficient of variation
-                        cv_value_hv = 0.0
-                        if len(hashrates_hv) > 1 and mean_hashrate_hv > 0:
-                            cv_value_hv = statistics.stdev(hashrates_hv) / mean_hashrate_hv
-                            
-                        # Record results
-                        result_hv = {
-                            'timestamp': final_state_hv.timestamp.isoformat(),
-                            'frequency_mhz': freq,
-                            'core_voltage_mv': cv,
-                            'hashrate_ghs': mean_hashrate_hv,
-                            'temperature_c': final_state_hv.temperature,
-                            'power_w': final_state_hv.power,
-                            'stable': stable_hv,
-                            'cv': cv_value_hv,
-                            'notes': f'higher_voltage_test' if stable_hv else 'voltage_limit_reached'
-                        }
-                        
-                        self.results.append(result_hv)
-                        
-                        # Safety check
-                        if not self.check_safety_limits(final_state_hv):
-                            self.logger.error("Safety limits exceeded, stopping sweep")
-                            self.emergency_stop = True
-                            break
-                        
-                        if stable_hv:
-                            self.logger.info(f"✅ STABLE with higher voltage: {freq}MHz @ {cv}mV - {mean_hashrate_hv:.1f} GH/s")
-                            current_voltage = cv
-                            current_freq = freq
-                            voltage_found = True
-                            break
-                        else:
-                            self.logger.info(f"❌ UNSTABLE: {freq}MHz @ {cv}mV - trying higher voltage")
-                    
-                    if not voltage_found:
-                        self.logger.info(f"🏁 FINAL RESULT: Maximum stable configuration is {current_freq}MHz @ {current_voltage}mV")
-                        break
+                self.logger.info(f"✅ STABLE with higher voltage: {freq}MHz @ {voltage}mV")
+                current_voltage = voltage
+                current_freq = freq
+                self.journal_state('progressive', current_freq, current_voltage)
+        return True
+        
+    def run_overclock_sweep(self):
+        """Optimized overclocking sweep - maintains voltage and increases frequency until instability"""
+        self.logger.info("Starting optimized BitAxe overclock sweep (progressive frequency-voltage)")
+        
+        if not self.prepare_sweep():
+            return False
+            
+        try:
+            return self.search()
                         
         except SafetyException as e:
             self.logger.critical(f"Safety exception: {e}")
@@ -682,6 +2551,7 @@ class BitAxeSafeOverclock:
         finally:
             # Cleanup and restore
             self.logger.info("Cleaning up...")
+            self.logger.info(f"📡 Telemetry polls: {self.snapshot.misses} fetched, {self.snapshot.hits} served from snapshot cache")
             
             if self.emergency_stop:
                 self.logger.info("🛑 Emergency stop detected - restoring settings immediately")
@@ -703,6 +2573,9 @@ class BitAxeSafeOverclock:
                     self.restore_original_settings()
             
             filename = self.save_results()
+            if self.journal:
+                self.journal.append('end', results_file=filename, emergency_stop=self.emergency_stop)
+                self.journal.close()
             
             if self.emergency_stop:
                 self.logger.info("✅ Emergency shutdown completed safely")
@@ -755,6 +2628,7 @@ class BitAxeSafeOverclock:
         try:
             data = {"fanspeed": fan_speed}
             response = self.make_api_request("/api/system", method="PATCH", data=data)
+            self.snapshot.update(fan_speed=fan_speed)
             
             if response is not None:  # PATCH può restituire None ma essere comunque riuscito
                 self.logger.info(f"🌀 Velocità ventola impostata a {fan_speed}%")
@@ -767,15 +2641,28 @@ class BitAxeSafeOverclock:
             self.logger.error(f"❌ Errore nell'impostazione velocità ventola: {e}")
             return False
     
+    def planned_fan_speed(self) -> Optional[int]:
+        """Fan speed manage_fan_control would set for the last sample, or None if unchanged
+        
+        Uses the telemetry already in history (no request). Miners that report no
+        fan speed (0) are left to manage_fan_control.
+        """
+        if not SAFETY_CONFIG['fan_control_enabled']:
+            return None
+        state = self.history.latest()
+        if state is None or not state.fan_speed:
+            return None
+        optimal_speed = self.get_optimal_fan_speed(state.temperature, state.fan_speed)
+        return optimal_speed if optimal_speed != state.fan_speed else None
+        
     def manage_fan_control(self, current_state: MinerState) -> bool:
         """Gestisce il controllo automatico della ventola basato sulla temperatura"""
         if not SAFETY_CONFIG['fan_control_enabled']:
             return True
         
         try:
-            # Ottieni informazioni correnti per la velocità ventola attuale
-            system_info = self.make_api_request("/api/system/info")
-            current_fan_speed = system_info.get('fanspeed', SAFETY_CONFIG['fan_speed_medium']) if system_info else None
+            # La velocità attuale arriva dallo stesso snapshot del campione
+            current_fan_speed = current_state.fan_speed
             
             # Calcola velocità ottimale
             optimal_speed = self.get_optimal_fan_speed(current_state.temperature, current_fan_speed)
@@ -794,6 +2681,20 @@ class BitAxeSafeOverclock:
 
 def main():
     """Main entry point"""
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='BitAxe Safe Overclock')
+    parser.add_argument('--ip', default=None, help='IP del BitAxe (default: MINER_IP)')
+    parser.add_argument('--warm-start', nargs='*', metavar='CSV',
+                        help=f'Riparti da risultati precedenti (default: {RESULTS_GLOB})')
+    parser.add_argument('--resume', nargs='?', const='', metavar='JOURNAL',
+                        help='Riprendi uno sweep interrotto (default: ultimo journal non terminato)')
+    parser.add_argument('--db', default=DATABASE_CONFIG['path'], metavar='PATH',
+                        help='Database risultati e telemetria (default: %(default)s)')
+    parser.add_argument('--no-db', action='store_true', help='Solo file CSV, nessun database')
+    add_selection_arguments(parser)
+    args = parser.parse_args()
+    
     print("BitAxe Safe Overclock Script")
     print("=============================")
     print("⚠️  WARNING: Overclocking can damage your hardware!")
@@ -807,8 +2708,28 @@ def main():
         print("Operation cancelled by user.")
         return
         
-    overclocker = BitAxeSafeOverclock()
-    overclocker.run_overclock_sweep()
+    for key, value in selection_criteria(args).items():
+        if value is not None:
+            SAFETY_CONFIG[f'selection_{key}'] = value
+    
+    overclocker = BitAxeSafeOverclock(args.ip)
+    if not args.no_db:
+        try:
+            from .results_db import ResultsDB
+        except ImportError:
+            from results_db import ResultsDB
+        overclocker.db = ResultsDB(args.db, clock=overclocker.clock)
+        overclocker.telemetry_sink = lambda state: overclocker.db.add_sample(overclocker.miner_ip, state)
+    try:
+        if args.resume is not None:
+            if not overclocker.resume(args.resume or None):
+                return
+        elif args.warm_start is not None:
+            overclocker.warm_start(args.warm_start or None)
+        overclocker.run_overclock_sweep()
+    finally:
+        if overclocker.db:
+            overclocker.db.close()
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+"""
+Asyncio fleet sweep engine
+Runs the progressive frequency/voltage search on many BitAxe miners at once,
+or splits one grid sweep across identical miners (DistributedSweep)
+
+Every miner runs the single-miner sweep engine (BitAxeSafeOverclock: fan
+control, thermal guard, voltage bisection, journal) with its own safety
+state on a worker thread; all results are merged into one combined stream.
+
+License: MIT
+Warning: Use at your own risk. Overclocking can damage hardware.
+"""
+
+import asyncio
+import csv
+import logging
+import statistics
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+try:
+    from .bitaxe_safe_overclock import (
+        SAFETY_CONFIG, RESULT_FIELDNAMES, REAL_CLOCK, Clock, BitAxeSafeOverclock,
+        select_best, TestPlanner, TelemetryRing
+    )
+except ImportError:
+    from bitaxe_safe_overclock import (
+        SAFETY_CONFIG, RESULT_FIELDNAMES, REAL_CLOCK, Clock, BitAxeSafeOverclock,
+        select_best, TestPlanner, TelemetryRing
+    )
+
+FLEET_RESULT_FIELDNAMES = ['miner_ip'] + RESULT_FIELDNAMES
+
+logger = logging.getLogger(__name__)
+
+
+class MinerLogger(logging.LoggerAdapter):
+    """Prefixes every message with the miner IP (fleet logs interleave)"""
+
+    def process(self, msg, kwargs):
+        return f"[{self.extra['miner_ip']}] {msg}", kwargs
+
+
+class FleetOverclocker(BitAxeSafeOverclock):
+    """The single-miner sweep engine, unattended
+
+    Dangerous voltages are decided up front by allow_danger_voltage instead of
+    a prompt, results and journal files carry the miner IP, and every recorded
+    row is also handed to result_sink (with a miner_ip column).
+    """
+
+    def __init__(self, miner_ip: str, clock: Clock = None, allow_danger_voltage: bool = False,
+                 result_sink: Callable[[Dict], None] = None):
+        self.allow_danger_voltage = allow_danger_voltage
+        self.result_sink = result_sink
+        super().__init__(miner_ip, clock, signals=False)
+
+    def setup_logging(self):
+        self.logger = MinerLogger(logger, {'miner_ip': self.miner_ip})
+
+    def require_user_confirmation(self, message: str) -> bool:
+        if not self.allow_danger_voltage:
+            self.logger.warning(f"{message}: skipped (needs --allow-danger-voltage)")
+        return self.allow_danger_voltage
+
+    def new_results_filename(self) -> str:
+        miner = self.miner_ip.replace(':', '_')
+        return f"bitaxe_fleet_miner_{miner}_{self.clock.now().strftime('%Y%m%d_%H%M%S')}.csv"
+
+    def record_result(self, result: Dict, journal: bool = True):
+        super().record_result(result, journal)
+        if self.result_sink:
+            self.result_sink({'miner_ip': self.miner_ip, **result})
+
+
+class FleetMiner:
+    """Per-miner sweep worker: a FleetOverclocker driven from the fleet's executor
+
+    Each miner has its own safety state, thermal guard, fan control and
+    journal; its blocking calls run one at a time on the executor.
+    """
+
+    def __init__(self, miner_ip: str, results: 'asyncio.Queue', executor: ThreadPoolExecutor,
+                 allow_danger_voltage: bool = False, clock: Clock = None):
+        self.miner_ip = miner_ip
+        self.executor = executor
+        self.result_queue = results
+        self.loop = asyncio.get_running_loop()
+        self.overclocker = FleetOverclocker(miner_ip, clock, allow_danger_voltage, self.put_result)
+        self.clock = self.overclocker.clock
+        self.stop_reason = None
+        self.failed = False
+
+    def put_result(self, row: Dict):
+        """Result sink, called from the executor thread"""
+        self.loop.call_soon_threadsafe(self.result_queue.put_nowait, row)
+
+    async def call(self, fn: Callable, *args):
+        """Run one blocking overclocker call on the executor"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    @property
+    def emergency_stop(self) -> bool:
+        return self.overclocker.emergency_stop
+
+    @property
+    def asic_model(self) -> Optional[str]:
+        return self.overclocker.asic_model
+
+    @property
+    def history(self) -> TelemetryRing:
+        return self.overclocker.history
+
+    @property
+    def results(self) -> List[Dict]:
+        return [{'miner_ip': self.miner_ip, **r} for r in self.overclocker.results]
+
+    def stop(self, reason: str):
+        if not self.emergency_stop:
+            logger.error(f"[{self.miner_ip}] 🛑 Stopping sweep: {reason}")
+        self.overclocker.emergency_stop = True
+        self.overclocker.wake.set()
+        self.stop_reason = reason
+
+    def voltage_allowed(self, core_voltage: int) -> bool:
+        """Fleet runs are unattended: dangerous voltages need up-front opt-in (no logging, for planning)"""
+        if not SAFETY_CONFIG['min_voltage'] <= core_voltage <= SAFETY_CONFIG['max_voltage']:
+            return False
+        return core_voltage < SAFETY_CONFIG['cv_danger_threshold'] or self.overclocker.allow_danger_voltage
+
+    async def start(self) -> bool:
+        """Validate, back up the original settings and open the journal; False if unreachable"""
+        if not await self.call(self.overclocker.prepare_sweep):
+            logger.error(f"[{self.miner_ip}] Unreachable, skipping miner")
+            return False
+        return True
+
+    async def test_point(self, frequency: int, core_voltage: int,
+                         stable_note: str, unstable_note: str) -> Optional[bool]:
+        """Apply, test and record one point. Returns None if it could not be tested."""
+        return await self.call(self.overclocker.test_point, frequency, core_voltage, stable_note, unstable_note)
+
+    async def sweep(self, apply_best: bool = False):
+        """The search of SAFETY_CONFIG['sweep_strategy'] (see BitAxeSafeOverclock.search)"""
+        if not await self.start():
+            return
+        try:
+            await self.call(self.overclocker.search)
+        finally:
+            await self.finish(apply_best)
+
+    def best_result(self) -> Optional[Dict]:
+        """Best stable point according to the selection_* config (see select_best)"""
+        return select_best(self.results)
+
+    async def finish(self, apply_best: bool, best: Dict = None):
+        """Leave the miner on its best stable point (or best), or restore the original settings"""
+        await self.call(self._finish, apply_best, best)
+
+    def _finish(self, apply_best: bool, best: Dict = None):
+        overclocker = self.overclocker
+        best = (best or self.best_result()) if apply_best and not self.emergency_stop else None
+        if best:
+            overclocker.reset_thermal()
+            if not overclocker.apply_settings(best['frequency_mhz'], best['core_voltage_mv']):
+                logger.error(f"[{self.miner_ip}] Failed to apply best settings, restoring the original ones")
+                overclocker.restore_original_settings()
+        elif overclocker.original_settings:
+            overclocker.restore_original_settings()
+        filename = overclocker.save_results()
+        if overclocker.journal:
+            overclocker.journal.append('end', results_file=filename, emergency_stop=self.emergency_stop)
+            overclocker.journal.close()
+
+
+class FleetSweep:
+    """Run the overclock sweep on N miners concurrently"""
+
+    def __init__(self, miner_ips: List[str], allow_danger_voltage: bool = False,
+                 apply_best: bool = False, clocks: Dict[str, Clock] = None, clock: Clock = None):
+        self.miner_ips = list(miner_ips)
+        self.clocks = clocks or {}  # Per-miner clocks (e.g. one VirtualClock per simulator)
+        self.clock = clock or REAL_CLOCK  # Fleet-level timestamps (results file name)
+        self.allow_danger_voltage = allow_danger_voltage
+        self.apply_best = apply_best
+        self.miners: Dict[str, FleetMiner] = {}
+        self.results: List[Dict] = []
+        self._queue: Optional[asyncio.Queue] = None
+
+    def stop(self, reason: str = "fleet stop requested"):
+        for miner in self.miners.values():
+            miner.stop(reason)
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        """Run the sweep and yield result rows from every miner as they complete"""
+        self._queue = asyncio.Queue()
+        # Un worker per miner: le chiamate di ogni miner sono sequenziali
+        executor = ThreadPoolExecutor(max_workers=max(1, len(self.miner_ips)))
+        self.miners = {
+            ip: FleetMiner(ip, self._queue, executor, self.allow_danger_voltage, self.clocks.get(ip))
+            for ip in self.miner_ips
+        }
+        done = object()
+
+        async def run_all():
+            try:
+                await self.run_miners()
+            finally:
+                await self._queue.put(done)
+
+        task = asyncio.ensure_future(run_all())
+        try:
+            while True:
+                item = await self._queue.get()
+                if item is done:
+                    break
+                self.results.append(item)
+                yield item
+        finally:
+            if not task.done():
+                self.stop("result stream closed")
+            await task
+            executor.shutdown(wait=True)
+
+    async def run_miners(self):
+        """Every miner runs its own sweep; a failing miner does not stop the others"""
+        miners = list(self.miners.values())
+        outcomes = await asyncio.gather(*(m.sweep(self.apply_best) for m in miners), return_exceptions=True)
+        self.log_failures(miners, outcomes)
+
+    @staticmethod
+    def log_failures(miners: List[FleetMiner], outcomes: List):
+        """Log the exception of every miner whose task raised, and mark the miner failed"""
+        for miner, outcome in zip(miners, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"[{miner.miner_ip}] Sweep failed: {outcome!r}",
+                             exc_info=(type(outcome), outcome, outcome.__traceback__))
+                miner.failed = True
+                miner.stop_reason = miner.stop_reason or f"failed: {outcome!r}"
+
+    async def run(self) -> List[Dict]:
+        """Run the sweep to completion and return the combined results"""
+        async for _ in self.stream():
+            pass
+        return self.results
+
+    def save_results(self, filename: str = None) -> str:
+        """Save combined fleet results to CSV"""
+        filename = filename or f"bitaxe_fleet_results_{self.clock.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=FLEET_RESULT_FIELDNAMES)
+            writer.writeheader()
+            for result in self.results:
+                writer.writerow(result)
+        logger.info(f"Fleet results saved to {filename}")
+        return filename
+
+
+class GridScheduler:
+    """Hands out the points of one sweep grid to several miners
+    
+    Points come in TestPlanner order (frequency ascending within each voltage).
+    A miner gets the lowest open frequency of a voltage that no other miner is
+    working on, the cheapest transition from its last point first; only when
+    every voltage is busy does it take the next frequency of a busy one. A
+    failure on any miner drops the points beyond it (same or higher frequency,
+    same or lower voltage) for everyone.
+    """
+
+    def __init__(self, points: List[Tuple[int, int]], planner: TestPlanner = None):
+        self.planner = planner or TestPlanner()
+        self.pending = self.planner.order(points, prune=True)
+        self.in_flight: Dict[Tuple[int, int], str] = {}
+        self.failures: List[Tuple[int, int]] = []
+        self.positions: Dict[str, Tuple[int, int]] = {}
+
+    def beyond_failure(self, point: Tuple[int, int]) -> bool:
+        return any(f <= point[0] and v >= point[1] for f, v in self.failures)
+
+    def next_point(self, miner_ip: str) -> Optional[Tuple[int, int]]:
+        """Reserve the next point for miner_ip, or None when the grid is done"""
+        self.pending = [p for p in self.pending if not self.beyond_failure(p)]
+        lowest = {}
+        for point in self.pending:
+            lowest.setdefault(point[1], point)
+        if not lowest:
+            return None
+        busy = {v for _, v in self.in_flight}
+        candidates = [p for v, p in lowest.items() if v not in busy] or list(lowest.values())
+        position = self.positions.get(miner_ip)
+        point = min(candidates, key=lambda p: (self.planner.settle_time(position, p), self.pending.index(p)))
+        self.pending.remove(point)
+        self.in_flight[point] = miner_ip
+        self.positions[miner_ip] = point
+        return point
+
+    def done(self, point: Tuple[int, int], stable: Optional[bool]):
+        self.in_flight.pop(point, None)
+        if stable is False:
+            self.failures.append(point)
+
+
+def calibrate(anchor_results: Dict[str, List[Dict]]) -> Dict[str, Dict[str, float]]:
+    """Per-miner offsets from the anchor points every miner tested
+    
+    The reference is the median miner at each anchor. Hashrate and power get a
+    scale factor, temperature an additive offset (averaged over the stable anchors).
+    """
+    reference = {}
+    for rows in anchor_results.values():
+        for r in rows:
+            if r['stable']:
+                reference.setdefault((r['frequency_mhz'], r['core_voltage_mv']), []).append(r)
+    reference = {point: {key: statistics.median(r[key] for r in rows)
+                         for key in ('hashrate_ghs', 'power_w', 'temperature_c')}
+                 for point, rows in reference.items()}
+
+    calibration = {}
+    for miner_ip, rows in anchor_results.items():
+        hashrate, power, temperature = [], [], []
+        for r in rows:
+            ref = reference.get((r['frequency_mhz'], r['core_voltage_mv']))
+            if not r['stable'] or not ref:
+                continue
+            if ref['hashrate_ghs'] > 0:
+                hashrate.append(r['hashrate_ghs'] / ref['hashrate_ghs'])
+            if ref['power_w'] > 0:
+                power.append(r['power_w'] / ref['power_w'])
+            temperature.append(r['temperature_c'] - ref['temperature_c'])
+        calibration[miner_ip] = {
+            'hashrate': statistics.mean(hashrate) if hashrate else 1.0,
+            'power': statistics.mean(power) if power else 1.0,
+            'temperature': statistics.mean(temperature) if temperature else 0.0,
+            'anchors': len(temperature),
+        }
+    return calibration
+
+
+def normalize(result: Dict, offsets: Dict[str, float]) -> Dict:
+    """A result row expressed on the reference miner's scale"""
+    return {**result,
+            'hashrate_ghs': result['hashrate_ghs'] / offsets['hashrate'],
+            'share_hashrate_ghs': (result['share_hashrate_ghs'] / offsets['hashrate']
+                                   if result.get('share_hashrate_ghs') is not None else None),
+            'power_w': result['power_w'] / offsets['power'],
+            'temperature_c': result['temperature_c'] - offsets['temperature']}
+
+
+class DistributedSweep(FleetSweep):
+    """One logical grid sweep split across identical miners
+    
+    Every miner first tests the same anchor points (the distributed_anchors
+    lowest-power grid points); calibrate() turns them into per-miner offsets.
+    Miners whose ASIC model differs from the majority, or whose offsets exceed
+    distributed_max_offset, are left out. The rest of the grid is shared out by
+    a GridScheduler. results holds the merged rows normalised to the reference
+    miner (raw rows stay in raw_results and in each FleetMiner).
+    """
+
+    def __init__(self, miner_ips: List[str], anchors: int = None, **kwargs):
+        super().__init__(miner_ips, **kwargs)
+        self.anchor_count = SAFETY_CONFIG['distributed_anchors'] if anchors is None else anchors
+        self.planner = TestPlanner()
+        self.calibration: Dict[str, Dict[str, float]] = {}
+        self.scheduler: Optional[GridScheduler] = None
+        self.raw_results: List[Dict] = []
+
+    def grid_points(self) -> List[Tuple[int, int]]:
+        return [(f, v)
+                for v in range(SAFETY_CONFIG['cv_start'], SAFETY_CONFIG['cv_end'] + 1, SAFETY_CONFIG['cv_step'])
+                for f in range(SAFETY_CONFIG['freq_start'], SAFETY_CONFIG['freq_end'] + 1, SAFETY_CONFIG['freq_step'])]
+
+    async def run_miners(self):
+        ready = [m for m, ok in zip(self.miners.values(),
+                                    await asyncio.gather(*(m.start() for m in self.miners.values())))
+                 if ok]
+        started = ready
+        models = Counter(m.asic_model for m in started)
+        if len(models) > 1:
+            model = models.most_common(1)[0][0]
+            for miner in started:
+                if miner.asic_model != model:
+                    logger.warning(f"[{miner.miner_ip}] ASIC model {miner.asic_model} differs from {model}, not used")
+            started = [m for m in started if m.asic_model == model]
+
+        try:
+            # Punti ancora: i più freddi della griglia, testati da tutti i miner
+            points = [p for p in self.grid_points() if started and started[0].voltage_allowed(p[1])]
+            anchors = self.planner.order(points, method='cold_to_hot')[:self.anchor_count]
+            logger.info(f"📅 Distributed sweep: {len(points)} grid points on {len(started)} miners, "
+                        f"anchors {anchors}, ETA ~{self.eta(points, len(started)) / 60:.0f} min")
+
+            async def run_anchors(miner):
+                for frequency, core_voltage in anchors:
+                    if miner.emergency_stop:
+                        break
+                    await miner.test_point(frequency, core_voltage, 'anchor_stable', 'anchor_unstable')
+            await asyncio.gather(*(run_anchors(m) for m in started))
+
+            calibration = calibrate({m.miner_ip: m.results for m in started if not m.emergency_stop})
+            workers = []
+            for miner in started:
+                offsets = calibration.get(miner.miner_ip)
+                if not offsets:
+                    continue
+                deviation = max(abs(offsets['hashrate'] - 1), abs(offsets['power'] - 1))
+                logger.info(f"[{miner.miner_ip}] Calibration: hashrate x{offsets['hashrate']:.3f}, "
+                            f"power x{offsets['power']:.3f}, temperature {offsets['temperature']:+.1f}°C")
+                if offsets['anchors'] == 0 or deviation > SAFETY_CONFIG['distributed_max_offset']:
+                    logger.warning(f"[{miner.miner_ip}] Not comparable with the other miners, not used")
+                    continue
+                workers.append(miner)
+                self.calibration[miner.miner_ip] = offsets
+
+            self.scheduler = GridScheduler([p for p in points if p not in anchors], self.planner)
+            for miner in workers:
+                self.scheduler.positions[miner.miner_ip] = anchors[-1] if anchors else None
+            # Le ancore contano come risultati (anche per la potatura dopo un fallimento)
+            for point in anchors:
+                verdicts = [r['stable'] for m in workers for r in m.results
+                            if (r['frequency_mhz'], r['core_voltage_mv']) == point]
+                if verdicts and not all(verdicts):
+                    self.scheduler.failures.append(point)
+            await asyncio.gather(*(self.work(m) for m in workers))
+        finally:
+            best = select_best(self.merge()) if self.apply_best else None
+            # Solo i miner calibrati ricevono il miglior punto comune
+            outcomes = await asyncio.gather(*(m.finish(self.apply_best and m.miner_ip in self.calibration, best)
+                                              for m in ready), return_exceptions=True)
+            self.log_failures(ready, outcomes)
+
+    async def work(self, miner: FleetMiner):
+        """Test scheduler points on one miner until the grid is done"""
+        while not miner.emergency_stop:
+            point = self.scheduler.next_point(miner.miner_ip)
+            if point is None:
+                break
+            stable = await miner.test_point(*point, 'grid_stable', 'grid_unstable')
+            self.scheduler.done(point, stable)
+
+    def eta(self, points: List[Tuple[int, int]], miners: int) -> float:
+        """Rough duration (s): anchors on every miner, then the grid split evenly"""
+        if not miners or not points:
+            return 0.0
+        per_point = self.planner.test_time + self.planner.settle_time(None, points[0])
+        return per_point * (self.anchor_count + max(0, len(points) - self.anchor_count) / miners)
+
+    def merge(self) -> List[Dict]:
+        """Rows of all calibrated miners on the reference scale"""
+        return [normalize(r, self.calibration[r['miner_ip']])
+                for m in self.miners.values() for r in m.results
+                if r['miner_ip'] in self.calibration]
+
+    async def stream(self) -> AsyncIterator[Dict]:
+        """Yield raw rows as they complete; results becomes the merged set at the end"""
+        async for row in super().stream():
+            yield row
+        self.raw_results = self.results
+        self.results = self.merge()
+
+
+def run_fleet_sweep(miner_ips: List[str], **kwargs) -> List[Dict]:
+    """Blocking helper: sweep all miners concurrently and return the combined results"""
+    return asyncio.run(FleetSweep(miner_ips, **kwargs).run())
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fleet overclock sweep for multiple BitAxe miners')
+    parser.add_argument('miner_ips', nargs='+', help='IP addresses of the miners')
+    parser.add_argument('--allow-danger-voltage', action='store_true',
+                        help=f"Allow voltages >= {SAFETY_CONFIG['cv_danger_threshold']}mV without per-point confirmation")
+    parser.add_argument('--apply-best', action='store_true', help='Leave each miner on its best stable point')
+    parser.add_argument('--distribute', action='store_true',
+                        help='Identical miners: split one grid sweep across them and merge the results')
+    parser.add_argument('--anchors', type=int, default=None,
+                        help=f"Anchor points for --distribute (default {SAFETY_CONFIG['distributed_anchors']})")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    if args.distribute:
+        fleet = DistributedSweep(args.miner_ips, anchors=args.anchors,
+                                 allow_danger_voltage=args.allow_danger_voltage, apply_best=args.apply_best)
+    else:
+        fleet = FleetSweep(args.miner_ips, args.allow_danger_voltage, args.apply_best)
+    try:
+        asyncio.run(fleet.run())
+    except KeyboardInterrupt:
+        print("\n⚠️  Fleet sweep interrupted")
+    finally:
+        print(f"\n📊 Results saved to: {fleet.save_results()}")
+
+
+if __name__ == "__main__":
+    main()
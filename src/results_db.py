@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Results and telemetry database
+One SQLite file (WAL mode) for every sweep, test point and telemetry sample,
+indexed by miner, time and (frequency, voltage), instead of one CSV per run.
+
+Sweep results CSVs (single miner, fleet, interactive) and performance logs
+can be imported; imports are idempotent.
+
+License: MIT
+"""
+
+import csv
+import logging
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    from .bitaxe_safe_overclock import (
+        DATABASE_CONFIG, MINER_IP, REAL_CLOCK, RESULT_FIELDNAMES, Clock, MinerState,
+        add_selection_arguments, read_results_csv, select_best, selection_criteria
+    )
+except ImportError:
+    from bitaxe_safe_overclock import (
+        DATABASE_CONFIG, MINER_IP, REAL_CLOCK, RESULT_FIELDNAMES, Clock, MinerState,
+        add_selection_arguments, read_results_csv, select_best, selection_criteria
+    )
+
+logger = logging.getLogger(__name__)
+
+# Colonne dei punti di test (timestamp a parte: salvato come epoch)
+POINT_COLUMNS = [name for name in RESULT_FIELDNAMES if name != 'timestamp']
+TELEMETRY_COLUMNS = ['frequency', 'core_voltage', 'temperature', 'vr_temperature', 'hash_rate',
+                     'power', 'fan_speed', 'shares_accepted', 'shares_rejected', 'asic_errors']
+ROLLUP_METRICS = ['hashrate', 'power', 'temperature', 'efficiency']
+ROLLUP_COLUMNS = [f"{metric}_{stat}" for metric in ROLLUP_METRICS for stat in ('mean', 'min', 'max', 'p95')]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS miners (
+    id INTEGER PRIMARY KEY,
+    ip TEXT NOT NULL UNIQUE,
+    asic_model TEXT
+);
+CREATE TABLE IF NOT EXISTS sweeps (
+    id INTEGER PRIMARY KEY,
+    miner_id INTEGER NOT NULL REFERENCES miners(id),
+    started REAL,
+    strategy TEXT,
+    source TEXT,
+    UNIQUE (miner_id, source)
+);
+CREATE TABLE IF NOT EXISTS test_points (
+    id INTEGER PRIMARY KEY,
+    sweep_id INTEGER NOT NULL REFERENCES sweeps(id),
+    miner_id INTEGER NOT NULL REFERENCES miners(id),
+    timestamp REAL,
+    frequency_mhz INTEGER NOT NULL,
+    core_voltage_mv INTEGER NOT NULL,
+    hashrate_ghs REAL,
+    temperature_c REAL,
+    power_w REAL,
+    stable INTEGER NOT NULL,
+    cv REAL,
+    notes TEXT,
+    samples INTEGER,
+    settle_time_s REAL,
+    shares_accepted INTEGER,
+    shares_rejected INTEGER,
+    share_hashrate_ghs REAL
+);
+CREATE INDEX IF NOT EXISTS test_points_setting ON test_points (miner_id, frequency_mhz, core_voltage_mv, timestamp);
+CREATE INDEX IF NOT EXISTS test_points_time ON test_points (miner_id, timestamp);
+CREATE TABLE IF NOT EXISTS telemetry (
+    miner_id INTEGER NOT NULL REFERENCES miners(id),
+    timestamp REAL NOT NULL,
+    frequency INTEGER,
+    core_voltage INTEGER,
+    temperature REAL,
+    vr_temperature REAL,
+    hash_rate REAL,
+    power REAL,
+    fan_speed INTEGER,
+    shares_accepted INTEGER,
+    shares_rejected INTEGER,
+    asic_errors INTEGER
+);
+CREATE INDEX IF NOT EXISTS telemetry_time ON telemetry (miner_id, timestamp);
+CREATE TABLE IF NOT EXISTS rollups (
+    miner_id INTEGER NOT NULL REFERENCES miners(id),
+    resolution TEXT NOT NULL,
+    start REAL NOT NULL,
+    samples INTEGER NOT NULL,
+    hashrate_mean REAL,
+    hashrate_min REAL,
+    hashrate_max REAL,
+    hashrate_p95 REAL,
+    power_mean REAL,
+    power_min REAL,
+    power_max REAL,
+    power_p95 REAL,
+    temperature_mean REAL,
+    temperature_min REAL,
+    temperature_max REAL,
+    temperature_p95 REAL,
+    efficiency_mean REAL,
+    efficiency_min REAL,
+    efficiency_max REAL,
+    efficiency_p95 REAL,
+    PRIMARY KEY (miner_id, resolution, start)
+);
+"""
+
+
+def _epoch(timestamp) -> Optional[float]:
+    """ISO string, datetime or epoch seconds to epoch seconds (None if missing or unparseable)"""
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    try:
+        return datetime.fromisoformat(timestamp).timestamp() if timestamp else None
+    except ValueError:
+        return None
+
+
+class ResultsDB:
+    """SQLite store of miners, sweeps, test points and telemetry samples
+
+    Test points are committed as they are added (like the journal); telemetry
+    samples are buffered and written in batches of batch_size, or after
+    flush_interval seconds. Use as a context manager or call close().
+    """
+
+    def __init__(self, path: str = None, batch_size: int = None, flush_interval: float = None,
+                 clock: Clock = None):
+        self.path = path or DATABASE_CONFIG['path']
+        self.batch_size = batch_size or DATABASE_CONFIG['batch_size']
+        self.flush_interval = flush_interval if flush_interval is not None else DATABASE_CONFIG['flush_interval']
+        self.clock = clock or REAL_CLOCK
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._miner_ids: Dict[str, int] = {}
+        self._telemetry: List[tuple] = []
+        self._flushed = self.clock.monotonic()
+
+    def __enter__(self) -> 'ResultsDB':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # --- scrittura ---
+
+    def miner_id(self, miner_ip: str, asic_model: str = None) -> int:
+        """Id of a miner, created on first use"""
+        if miner_ip not in self._miner_ids:
+            with self.conn:
+                self.conn.execute("INSERT OR IGNORE INTO miners (ip) VALUES (?)", (miner_ip,))
+            row = self.conn.execute("SELECT id FROM miners WHERE ip = ?", (miner_ip,)).fetchone()
+            self._miner_ids[miner_ip] = row['id']
+        if asic_model:
+            with self.conn:
+                self.conn.execute("UPDATE miners SET asic_model = ? WHERE id = ?",
+                                  (asic_model, self._miner_ids[miner_ip]))
+        return self._miner_ids[miner_ip]
+
+    def start_sweep(self, miner_ip: str, strategy: str = None, source: str = None,
+                    started: float = None) -> int:
+        """Id of a new sweep; an existing sweep with the same source (results file) is reused"""
+        miner_id = self.miner_id(miner_ip)
+        if source is not None:
+            row = self.conn.execute("SELECT id FROM sweeps WHERE miner_id = ? AND source = ?",
+                                    (miner_id, source)).fetchone()
+            if row:
+                return row['id']
+        started = started if started is not None else self.clock.time()
+        with self.conn:
+            cursor = self.conn.execute("INSERT INTO sweeps (miner_id, started, strategy, source) VALUES (?, ?, ?, ?)",
+                                       (miner_id, started, strategy, source))
+        return cursor.lastrowid
+
+    def add_results(self, sweep_id: int, results: List[Dict]):
+        """Insert result records (sweep format) in one transaction"""
+        miner_id = self.conn.execute("SELECT miner_id FROM sweeps WHERE id = ?", (sweep_id,)).fetchone()[0]
+        rows = [(sweep_id, miner_id, _epoch(r.get('timestamp')))
+                + tuple(r.get(name) for name in POINT_COLUMNS) for r in results]
+        columns = ', '.join(['sweep_id', 'miner_id', 'timestamp'] + POINT_COLUMNS)
+        placeholders = ', '.join('?' * (len(POINT_COLUMNS) + 3))
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO test_points ({columns}) VALUES ({placeholders})", rows)
+
+    def add_result(self, sweep_id: int, result: Dict):
+        self.add_results(sweep_id, [result])
+
+    def add_sample(self, miner_ip: str, state: MinerState):
+        """Buffer one telemetry sample; written with the next batch"""
+        self._telemetry.append((self.miner_id(miner_ip), _epoch(state.timestamp))
+                               + tuple(getattr(state, name) for name in TELEMETRY_COLUMNS))
+        if (len(self._telemetry) >= self.batch_size or
+                self.clock.monotonic() - self._flushed >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write buffered telemetry"""
+        self._flushed = self.clock.monotonic()
+        if not self._telemetry:
+            return
+        columns = ', '.join(['miner_id', 'timestamp'] + TELEMETRY_COLUMNS)
+        placeholders = ', '.join('?' * (len(TELEMETRY_COLUMNS) + 2))
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO telemetry ({columns}) VALUES ({placeholders})", self._telemetry)
+        self._telemetry = []
+
+    # --- import CSV ---
+
+    def import_csv(self, filename: str, miner_ip: str = None) -> int:
+        """Import a sweep results CSV or a performance log; returns the rows imported
+
+        Rows without a miner_ip column are attributed to miner_ip (default MINER_IP).
+        A file already imported for a miner is skipped.
+        """
+        with open(filename, newline='') as csvfile:
+            header = next(csv.reader(csvfile), [])
+        if 'frequency_mhz' in header:
+            return self.import_results_csv(filename, miner_ip)
+        if 'hashrate' in header and 'voltage' in header:
+            return self.import_performance_csv(filename, miner_ip)
+        logger.warning(f"Skipping {filename}: not a results file or performance log")
+        return 0
+
+    def import_results_csv(self, filename: str, miner_ip: str = None) -> int:
+        source = os.path.abspath(filename)
+        with open(filename, newline='') as csvfile:
+            fleet_ips = sorted({row['miner_ip'] for row in csv.DictReader(csvfile) if row.get('miner_ip')})
+        # File di fleet: uno sweep per miner
+        by_miner = {ip: read_results_csv(filename, ip) for ip in fleet_ips} or \
+            {miner_ip or MINER_IP: read_results_csv(filename)}
+        imported = 0
+        for ip, results in by_miner.items():
+            if not results or self._imported(ip, source):
+                continue
+            started = min(filter(None, (_epoch(r['timestamp']) for r in results)), default=None)
+            sweep_id = self.start_sweep(ip, strategy='import', source=source, started=started)
+            self.add_results(sweep_id, results)
+            imported += len(results)
+        return imported
+
+    def import_performance_csv(self, filename: str, miner_ip: str = None) -> int:
+        miner_ip = miner_ip or MINER_IP
+        source = os.path.abspath(filename)
+        if self._imported(miner_ip, source):
+            return 0
+        miner_id = self.miner_id(miner_ip)
+        rows = []
+        with open(filename, newline='') as csvfile:
+            for row in csv.DictReader(csvfile):
+                try:
+                    rows.append((miner_id, _epoch(row['timestamp']), int(float(row['frequency'])),
+                                 int(float(row['voltage'])), float(row['temperature']), None,
+                                 float(row['hashrate']), float(row['power']), None, None, None, None))
+                except (KeyError, TypeError, ValueError):
+                    logger.warning(f"Skipping malformed row in {filename}: {row}")
+        columns = ', '.join(['miner_id', 'timestamp'] + TELEMETRY_COLUMNS)
+        placeholders = ', '.join('?' * (len(TELEMETRY_COLUMNS) + 2))
+        with self.conn:
+            self.conn.executemany(f"INSERT INTO telemetry ({columns}) VALUES ({placeholders})",
+                                  [row for row in rows if row[1] is not None])
+        # Il file conta come sweep di sola telemetria, così non viene importato due volte
+        self.start_sweep(miner_ip, strategy='monitor', source=source, started=rows[0][1] if rows else None)
+        return len(rows)
+
+    def _imported(self, miner_ip: str, source: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM sweeps WHERE miner_id = ? AND source = ?",
+                                 (self.miner_id(miner_ip), source)).fetchone() is not None
+
+    # --- query ---
+
+    def results(self, miner_ip: str = None, sweep_id: int = None, stable: bool = None,
+                latest: bool = False, max_power: float = None, min_hashrate: float = None,
+                max_temperature: float = None) -> List[Dict]:
+        """Test points as result records (the read_results_csv format plus miner_ip/sweep_id)
+
+        latest keeps only the most recent result of each (miner, frequency, voltage), like
+        the warm start does: a point that became unstable is not chosen on old evidence.
+        """
+        where, params = [], []
+        for clause, value in (("m.ip = ?", miner_ip), ("p.sweep_id = ?", sweep_id),
+                              ("p.stable = ?", None if stable is None else int(stable)),
+                              ("p.power_w <= ?", max_power), ("p.hashrate_ghs >= ?", min_hashrate),
+                              ("p.temperature_c <= ?", max_temperature)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if latest:
+            where.append("NOT EXISTS (SELECT 1 FROM test_points n WHERE n.miner_id = p.miner_id "
+                         "AND n.frequency_mhz = p.frequency_mhz AND n.core_voltage_mv = p.core_voltage_mv "
+                         "AND (n.timestamp > p.timestamp OR (n.timestamp = p.timestamp AND n.id > p.id)))")
+        query = ("SELECT p.*, m.ip AS miner_ip FROM test_points p JOIN miners m ON m.id = p.miner_id"
+                 + (" WHERE " + " AND ".join(where) if where else "") + " ORDER BY p.timestamp, p.id")
+        results = []
+        for row in self.conn.execute(query, params):
+            result = {name: row[name] for name in POINT_COLUMNS}
+            result.update({
+                'miner_ip': row['miner_ip'],
+                'sweep_id': row['sweep_id'],
+                'timestamp': datetime.fromtimestamp(row['timestamp']).isoformat() if row['timestamp'] else '',
+                'stable': bool(row['stable']),
+                'notes': row['notes'] or '',
+            })
+            results.append(result)
+        return results
+
+    def best(self, miner_ip: str, **criteria) -> Optional[Dict]:
+        """Best stable point of a miner across all its sweeps (latest verdict per point)
+
+        criteria as for rank_settings(); the constraints are also applied in SQL.
+        """
+        constraints = {key: criteria.get(key) for key in ('max_power', 'min_hashrate', 'max_temperature')}
+        return select_best(self.results(miner_ip, stable=True, latest=True, **constraints), **criteria)
+
+    def sweeps(self, miner_ip: str = None) -> List[Dict]:
+        query = ("SELECT s.id, m.ip AS miner_ip, s.started, s.strategy, s.source, COUNT(p.id) AS points "
+                 "FROM sweeps s JOIN miners m ON m.id = s.miner_id LEFT JOIN test_points p ON p.sweep_id = s.id"
+                 + (" WHERE m.ip = ?" if miner_ip else "") + " GROUP BY s.id ORDER BY s.started, s.id")
+        return [dict(row) for row in self.conn.execute(query, (miner_ip,) if miner_ip else ())]
+
+    def save_rollups(self, rows: List[Dict]):
+        """Insert or replace rollup rows (miner_ip, resolution, start, samples and ROLLUP_COLUMNS)"""
+        columns = ', '.join(['miner_id', 'resolution', 'start', 'samples'] + ROLLUP_COLUMNS)
+        placeholders = ', '.join('?' * (len(ROLLUP_COLUMNS) + 4))
+        with self.conn:
+            self.conn.executemany(f"INSERT OR REPLACE INTO rollups ({columns}) VALUES ({placeholders})",
+                                  [(self.miner_id(row['miner_ip']), row['resolution'], row['start'], row['samples'])
+                                   + tuple(row[name] for name in ROLLUP_COLUMNS) for row in rows])
+
+    def rollups(self, miner_ip: str, resolution: str, start: float = None, end: float = None) -> List[Dict]:
+        """Rollup rows of a miner whose bucket starts between two epoch times"""
+        query = ("SELECT r.*, m.ip AS miner_ip FROM rollups r JOIN miners m ON m.id = r.miner_id"
+                 " WHERE m.ip = ? AND r.resolution = ? AND r.start >= ? AND r.start <= ? ORDER BY r.start")
+        rows = self.conn.execute(query, (miner_ip, resolution, start if start is not None else float('-inf'),
+                                         end if end is not None else float('inf')))
+        return [dict(row) for row in rows]
+
+    def prune(self, retention: Dict[str, Optional[float]], now: float = None) -> int:
+        """Delete telemetry ('raw') and rollups older than their retention in seconds; returns rows deleted"""
+        self.flush()
+        now = now if now is not None else self.clock.time()
+        deleted = 0
+        with self.conn:
+            for resolution, seconds in retention.items():
+                if seconds is None:
+                    continue
+                if resolution == 'raw':
+                    cursor = self.conn.execute("DELETE FROM telemetry WHERE timestamp < ?", (now - seconds,))
+                else:
+                    cursor = self.conn.execute("DELETE FROM rollups WHERE resolution = ? AND start < ?",
+                                               (resolution, now - seconds))
+                deleted += cursor.rowcount
+        return deleted
+
+    def telemetry(self, miner_ip: str, start: float = None, end: float = None) -> List[Dict]:
+        """Telemetry samples of a miner between two epoch times"""
+        self.flush()
+        query = ("SELECT t.* FROM telemetry t JOIN miners m ON m.id = t.miner_id WHERE m.ip = ?"
+                 " AND t.timestamp >= ? AND t.timestamp <= ? ORDER BY t.timestamp")
+        rows = self.conn.execute(query, (miner_ip, start if start is not None else float('-inf'),
+                                         end if end is not None else float('inf')))
+        return [dict(row) for row in rows]
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='BitAxe results and telemetry database')
+    parser.add_argument('--db', default=DATABASE_CONFIG['path'], help='Database file')
+    commands = parser.add_subparsers(dest='command', required=True)
+    importer = commands.add_parser('import', help='Import sweep results CSVs and performance logs')
+    importer.add_argument('files', nargs='+', help='CSV files')
+    importer.add_argument('--ip', default=None, help='Miner of files without a miner_ip column (default: MINER_IP)')
+    best = commands.add_parser('best', help='Best stable point of a miner across all sweeps')
+    best.add_argument('--ip', default=MINER_IP, help='IP del BitAxe (default: MINER_IP)')
+    add_selection_arguments(best)
+    listing = commands.add_parser('sweeps', help='List sweeps')
+    listing.add_argument('--ip', default=None)
+    args = parser.parse_args()
+
+    with ResultsDB(args.db) as db:
+        if args.command == 'import':
+            for filename in args.files:
+                print(f"📥 {filename}: {db.import_csv(filename, args.ip)} rows")
+        elif args.command == 'best':
+            result = db.best(args.ip, **selection_criteria(args))
+            if not result:
+                print(f"❌ No stable results for {args.ip}")
+                return 1
+            print(f"🎯 {result['frequency_mhz']}MHz @ {result['core_voltage_mv']}mV: "
+                  f"{result['hashrate_ghs']:.1f} GH/s, {result['power_w']:.1f}W, {result['temperature_c']:.1f}°C "
+                  f"({result['timestamp']})")
+        else:
+            for sweep in db.sweeps(args.ip):
+                started = datetime.fromtimestamp(sweep['started']).isoformat() if sweep['started'] else '?'
+                print(f"{sweep['id']:4d}  {sweep['miner_ip']:15s}  {started}  {sweep['strategy'] or '':10s}  "
+                      f"{sweep['points']:4d} points  {sweep['source'] or ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
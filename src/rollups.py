@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Telemetry rollups
+Incremental 1-minute, 1-hour and 1-day aggregates (mean/min/max/p95 of
+hashrate, power, temperature and efficiency) maintained as samples arrive,
+stored in the results database with a retention per resolution. A year
+of trend data is a few thousand rows instead of millions of samples.
+
+License: MIT
+"""
+
+import logging
+import math
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .bitaxe_safe_overclock import DATABASE_CONFIG, MINER_IP, REAL_CLOCK, ROLLUP_CONFIG, Clock, MinerState
+    from .results_db import ROLLUP_METRICS, ResultsDB, _epoch
+except ImportError:
+    from bitaxe_safe_overclock import DATABASE_CONFIG, MINER_IP, REAL_CLOCK, ROLLUP_CONFIG, Clock, MinerState
+    from results_db import ROLLUP_METRICS, ResultsDB, _epoch
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingQuantile:
+    """P² estimate of one quantile (Jain & Chlamtac) in constant memory
+
+    The first `exact` values are kept, so small buckets (a 1-minute bucket
+    at 5s polling) get the exact nearest-rank quantile.
+    """
+
+    def __init__(self, p: float = 0.95, exact: int = 100):
+        self.p = p
+        self.exact = exact
+        self.count = 0
+        self.values: List[float] = []
+        self.heights: List[float] = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, value: float):
+        self.count += 1
+        if len(self.values) < self.exact:
+            self.values.append(value)
+        if self.count <= 5:
+            self.heights.append(value)
+            self.heights.sort()
+            return
+        q, n = self.heights, self.positions
+        if value < q[0]:
+            q[0] = value
+            k = 0
+        elif value >= q[4]:
+            q[4] = value
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= value < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+        for i in (1, 2, 3):
+            d = self.desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                # Interpolazione parabolica, lineare se esce dall'ordine dei marker
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                if not q[i - 1] < height < q[i + 1]:
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    @property
+    def value(self) -> Optional[float]:
+        if not self.count:
+            return None
+        if self.count <= len(self.values):
+            ordered = sorted(self.values)
+            return ordered[max(0, math.ceil(self.p * len(ordered)) - 1)]
+        return self.heights[2]
+
+
+class RollupBucket:
+    """Running mean/min/max/quantile of the rollup metrics over one time bucket"""
+
+    def __init__(self, miner_ip: str, resolution: str, start: float, quantile: float = 0.95,
+                 prior: Dict = None):
+        self.miner_ip = miner_ip
+        self.resolution = resolution
+        self.start = start
+        self.samples = 0
+        self.sums = dict.fromkeys(ROLLUP_METRICS, 0.0)
+        self.mins: Dict[str, float] = {}
+        self.maxs: Dict[str, float] = {}
+        self.quantiles = {metric: StreamingQuantile(quantile) for metric in ROLLUP_METRICS}
+        # Bucket già salvato prima di un riavvio: i conteggi proseguono da lì
+        self.prior = prior
+
+    def add(self, values: Dict[str, float]):
+        self.samples += 1
+        for metric, value in values.items():
+            self.sums[metric] += value
+            self.mins[metric] = min(self.mins.get(metric, value), value)
+            self.maxs[metric] = max(self.maxs.get(metric, value), value)
+            self.quantiles[metric].add(value)
+
+    def row(self) -> Dict:
+        """Rollup row for ResultsDB.save_rollups()"""
+        row = {'miner_ip': self.miner_ip, 'resolution': self.resolution, 'start': self.start,
+               'samples': self.samples}
+        for metric in ROLLUP_METRICS:
+            row[f"{metric}_mean"] = self.sums[metric] / self.samples
+            row[f"{metric}_min"] = self.mins[metric]
+            row[f"{metric}_max"] = self.maxs[metric]
+            row[f"{metric}_p95"] = self.quantiles[metric].value
+        prior = self.prior
+        if prior and prior['samples']:
+            total = prior['samples'] + self.samples
+            row['samples'] = total
+            for metric in ROLLUP_METRICS:
+                # Il quantile non si può unire esattamente: media pesata dei due
+                for stat in ('mean', 'p95'):
+                    name = f"{metric}_{stat}"
+                    if prior[name] is not None:
+                        row[name] = (prior[name] * prior['samples'] + row[name] * self.samples) / total
+                if prior[f"{metric}_min"] is not None:
+                    row[f"{metric}_min"] = min(prior[f"{metric}_min"], row[f"{metric}_min"])
+                    row[f"{metric}_max"] = max(prior[f"{metric}_max"], row[f"{metric}_max"])
+        return row
+
+
+def rollup_values(state: MinerState) -> Dict[str, float]:
+    return {
+        'hashrate': state.hash_rate,
+        'power': state.power,
+        'temperature': state.temperature,
+        'efficiency': state.hash_rate / state.power if state.power > 0 else 0.0,
+    }
+
+
+class RollupPipeline:
+    """Maintain the rollups of every resolution as telemetry samples arrive
+
+    One open bucket per (miner, resolution); a bucket is saved when the
+    first sample of the next one arrives, and open buckets are saved by
+    flush()/close(). Retention is applied every prune_interval seconds.
+    Samples must arrive in time order per miner.
+    """
+
+    def __init__(self, db: ResultsDB, resolutions: Dict[str, int] = None,
+                 retention: Dict[str, Optional[float]] = None, clock: Clock = None):
+        self.db = db
+        self.resolutions = resolutions or ROLLUP_CONFIG['resolutions']
+        self.retention = retention if retention is not None else ROLLUP_CONFIG['retention']
+        self.clock = clock or REAL_CLOCK
+        self.open: Dict[Tuple[str, str], RollupBucket] = {}
+        self._pruned = None
+
+    def __enter__(self) -> 'RollupPipeline':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, miner_ip: str, state: MinerState):
+        timestamp = _epoch(state.timestamp)
+        if timestamp is None:
+            return
+        values = rollup_values(state)
+        closed = []
+        for resolution, seconds in self.resolutions.items():
+            start = timestamp - timestamp % seconds
+            bucket = self.open.get((miner_ip, resolution))
+            if bucket is None or bucket.start != start:
+                if bucket is not None:
+                    closed.append(bucket.row())
+                bucket = self.open[(miner_ip, resolution)] = self._new_bucket(miner_ip, resolution, start)
+            bucket.add(values)
+        if closed:
+            self.db.save_rollups(closed)
+        if self._pruned is None or self.clock.monotonic() - self._pruned >= ROLLUP_CONFIG['prune_interval']:
+            self.prune()
+
+    def _new_bucket(self, miner_ip: str, resolution: str, start: float) -> RollupBucket:
+        prior = self.db.rollups(miner_ip, resolution, start, start)
+        return RollupBucket(miner_ip, resolution, start, ROLLUP_CONFIG['quantile'], prior[0] if prior else None)
+
+    def flush(self):
+        """Save the open (partial) buckets; they keep accumulating"""
+        rows = [bucket.row() for bucket in self.open.values() if bucket.samples]
+        if rows:
+            self.db.save_rollups(rows)
+
+    def prune(self) -> int:
+        self._pruned = self.clock.monotonic()
+        deleted = self.db.prune(self.retention)
+        if deleted:
+            logger.info(f"🧹 Retention: {deleted} old telemetry/rollup rows deleted")
+        return deleted
+
+    def close(self):
+        self.flush()
+
+    def backfill(self, miner_ip: str) -> int:
+        """Build the rollups of the raw telemetry already in the database; returns samples read
+
+        For telemetry imported from performance logs. Run it before adding new samples.
+        """
+        count = 0
+        for row in self.db.telemetry(miner_ip):
+            self.add(miner_ip, MinerState(
+                frequency=row['frequency'], core_voltage=row['core_voltage'], temperature=row['temperature'] or 0,
+                vr_temperature=row['vr_temperature'] or 0, hash_rate=row['hash_rate'] or 0, power=row['power'] or 0,
+                shares_accepted=row['shares_accepted'] or 0, shares_rejected=row['shares_rejected'] or 0,
+                uptime=0, timestamp=row['timestamp']))
+            count += 1
+        self.flush()
+        return count
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='BitAxe telemetry rollups')
+    parser.add_argument('--db', default=DATABASE_CONFIG['path'], help='Database file')
+    commands = parser.add_subparsers(dest='command', required=True)
+    show = commands.add_parser('show', help='Rollups of a miner')
+    show.add_argument('--ip', default=MINER_IP, help='IP del BitAxe (default: MINER_IP)')
+    show.add_argument('--resolution', default='1h', choices=list(ROLLUP_CONFIG['resolutions']))
+    show.add_argument('--days', type=float, default=None, help='Only the last N days')
+    backfill = commands.add_parser('backfill', help='Rollups of the telemetry already in the database')
+    backfill.add_argument('--ip', default=MINER_IP, help='IP del BitAxe (default: MINER_IP)')
+    commands.add_parser('prune', help='Apply the retention now')
+    args = parser.parse_args()
+
+    with ResultsDB(args.db) as db:
+        if args.command == 'show':
+            start = db.clock.time() - args.days * 86400 if args.days else None
+            for row in db.rollups(args.ip, args.resolution, start):
+                print(f"{datetime.fromtimestamp(row['start']).isoformat()}  {row['samples']:6d} samples  "
+                      f"⛏️ {row['hashrate_mean']:.1f} GH/s (p95 {row['hashrate_p95']:.1f})  "
+                      f"💡 {row['power_mean']:.1f}W  🌡️ {row['temperature_mean']:.1f}°C "
+                      f"(max {row['temperature_max']:.1f})  📈 {row['efficiency_mean']:.2f} GH/J")
+        elif args.command == 'backfill':
+            # Retention disattivata: il backfill riguarda proprio la telemetria vecchia
+            print(f"📊 {RollupPipeline(db, retention={}).backfill(args.ip)} samples aggregated")
+        else:
+            print(f"🧹 {db.prune(ROLLUP_CONFIG['retention'])} rows deleted")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
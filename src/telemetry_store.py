@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Columnar telemetry store
+Append-only binary file of telemetry samples: one fixed-width typed column
+per field, written in chunks (optionally zlib-compressed). About 40 bytes
+per sample instead of ~120 for a performance log CSV row. Readers map the
+file and get the columns of uncompressed chunks as memoryviews, without
+copying or parsing.
+
+License: MIT
+"""
+
+import array
+import csv
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+try:
+    from .bitaxe_safe_overclock import REAL_CLOCK, TELEMETRY_STORE_CONFIG, Clock, MinerState
+except ImportError:
+    from bitaxe_safe_overclock import REAL_CLOCK, TELEMETRY_STORE_CONFIG, Clock, MinerState
+
+logger = logging.getLogger(__name__)
+
+# (campo di MinerState, typecode di array) - timestamp in secondi epoch
+COLUMNS = [
+    ('timestamp', 'd'),
+    ('frequency', 'H'),
+    ('core_voltage', 'H'),
+    ('temperature', 'f'),
+    ('vr_temperature', 'f'),
+    ('hash_rate', 'f'),
+    ('power', 'f'),
+    ('fan_speed', 'H'),
+    ('shares_accepted', 'I'),
+    ('shares_rejected', 'I'),
+    ('asic_errors', 'I'),
+]
+
+MAGIC = b"BXTS"
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sHI')     # magic, versione, lunghezza header JSON
+CHUNK_HEADER = struct.Struct('<4sIII')   # magic, righe, flag, lunghezza payload
+CHUNK_MAGIC = b"CHNK"
+COMPRESSED = 1
+ALIGN = 8                                # Colonne allineate per il cast dei memoryview
+
+
+def _pad(length: int) -> int:
+    return -length % ALIGN
+
+
+def _epoch(timestamp) -> float:
+    return timestamp.timestamp() if isinstance(timestamp, datetime) else float(timestamp)
+
+
+def _scan(buffer) -> Tuple[Dict, List[Tuple[int, int, int, int]], int]:
+    """Header, complete chunks (payload offset, rows, flags, size) and end of the last one
+
+    A chunk cut short by a crash during the write is not returned.
+    """
+    if len(buffer) < FILE_HEADER.size:
+        raise ValueError("Not a telemetry store: file too short")
+    magic, version, length = FILE_HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Not a telemetry store (version {VERSION})")
+    header = json.loads(bytes(buffer[FILE_HEADER.size:FILE_HEADER.size + length]))
+    offset = FILE_HEADER.size + length
+    offset += _pad(offset)
+    chunks = []
+    while offset + CHUNK_HEADER.size <= len(buffer):
+        magic, rows, flags, size = CHUNK_HEADER.unpack_from(buffer, offset)
+        end = offset + CHUNK_HEADER.size + size
+        if magic != CHUNK_MAGIC or end + _pad(end) > len(buffer):
+            break
+        chunks.append((offset + CHUNK_HEADER.size, rows, flags, size))
+        offset = end + _pad(end)
+    return header, chunks, offset
+
+
+class TelemetryWriter:
+    """Append telemetry samples to a columnar store file
+
+    Samples are buffered in typed arrays and written as one chunk every
+    chunk_rows samples, or after flush_interval seconds. Chunks are not
+    fsync'd: a power cut loses at most the unwritten buffer, and a torn
+    last chunk is dropped when the file is reopened.
+    """
+
+    def __init__(self, path: str, miner_ip: str = None, chunk_rows: int = None,
+                 flush_interval: float = None, compress: bool = None, clock: Clock = None):
+        self.path = path
+        self.chunk_rows = chunk_rows or TELEMETRY_STORE_CONFIG['chunk_rows']
+        self.flush_interval = (flush_interval if flush_interval is not None
+                               else TELEMETRY_STORE_CONFIG['flush_interval'])
+        self.compress = compress if compress is not None else TELEMETRY_STORE_CONFIG['compress']
+        self.clock = clock or REAL_CLOCK
+        self.miner_ip = miner_ip
+        self._limits = {name: 2 ** (8 * array.array(code).itemsize) - 1
+                        for name, code in COLUMNS if code in 'HI'}
+        self._new_buffer()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as existing, \
+                    mmap.mmap(existing.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                header, _, end = _scan(mapped)
+            if [tuple(column[:2]) for column in header['columns']] != COLUMNS or \
+                    header['byteorder'] != sys.byteorder:
+                raise ValueError(f"{path}: different column layout, use a new file")
+            self.miner_ip = header.get('miner_ip') or miner_ip
+            self._file = open(path, 'r+b')
+            self._file.truncate(end)     # Via l'eventuale chunk troncato
+            self._file.seek(end)
+        else:
+            header = json.dumps({
+                'miner_ip': miner_ip,
+                'byteorder': sys.byteorder,
+                'columns': [[name, code, array.array(code).itemsize] for name, code in COLUMNS],
+            }).encode()
+            self._file = open(path, 'wb')
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION, len(header)) + header
+                             + b'\0' * _pad(FILE_HEADER.size + len(header)))
+            self._file.flush()
+        self._flushed = self.clock.monotonic()
+
+    def __enter__(self) -> 'TelemetryWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _new_buffer(self):
+        self.buffer = {name: array.array(code) for name, code in COLUMNS}
+
+    def append(self, state: MinerState):
+        """Buffer one sample; written with the next chunk"""
+        for name, code in COLUMNS:
+            if name == 'timestamp':
+                self.buffer[name].append(_epoch(state.timestamp))
+            elif code in 'HI':
+                self.buffer[name].append(min(max(int(getattr(state, name) or 0), 0), self._limits[name]))
+            else:
+                self.buffer[name].append(float(getattr(state, name) or 0))
+        if (len(self.buffer['timestamp']) >= self.chunk_rows or
+                self.clock.monotonic() - self._flushed >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered samples as one chunk"""
+        self._flushed = self.clock.monotonic()
+        rows = len(self.buffer['timestamp'])
+        if not rows:
+            return
+        payload = b''.join(column.tobytes() + b'\0' * _pad(len(column) * column.itemsize)
+                           for column in self.buffer.values())
+        flags = 0
+        if self.compress:
+            payload, flags = zlib.compress(payload), COMPRESSED
+        # Un'unica write per chunk: su crash resta al più un chunk troncato
+        self._file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, rows, flags, len(payload)) + payload
+                         + b'\0' * _pad(CHUNK_HEADER.size + len(payload)))
+        self._file.flush()
+        self._new_buffer()
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+
+class TelemetryReader:
+    """Memory-mapped read access to a columnar store file
+
+    chunks() yields the columns of each chunk as memoryviews over the
+    mapped file (compressed chunks are decompressed first). Release any
+    views kept around before close().
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.header, self._chunks, _ = _scan(self._map)
+        self.miner_ip = self.header.get('miner_ip')
+        self._swap = self.header['byteorder'] != sys.byteorder
+        self.columns = {}
+        for name, code, itemsize in self.header['columns']:
+            if array.array(code).itemsize != itemsize:
+                raise ValueError(f"{path}: column {name} has {itemsize}-byte items, "
+                                 f"'{code}' is {array.array(code).itemsize} bytes here")
+            self.columns[name] = code
+
+    def __enter__(self) -> 'TelemetryReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(rows for _, rows, _, _ in self._chunks)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def chunks(self) -> Iterator[Dict[str, memoryview]]:
+        view = memoryview(self._map)
+        for offset, rows, flags, size in self._chunks:
+            data = view[offset:offset + size]
+            if flags & COMPRESSED:
+                data = memoryview(zlib.decompress(data))
+            columns, position = {}, 0
+            for name, code in self.columns.items():
+                length = rows * array.array(code).itemsize
+                column = data[position:position + length].cast(code)
+                if self._swap:
+                    column = array.array(code, column)
+                    column.byteswap()
+                    column = memoryview(column)
+                columns[name] = column
+                position += length + _pad(length)
+            yield columns
+
+    def column(self, name: str) -> array.array:
+        """One column over all chunks, as a single typed array"""
+        return self.window(columns=[name])[name]
+
+    def window(self, start: float = None, end: float = None, columns: List[str] = None) -> Dict[str, array.array]:
+        """Columns of the samples with start <= timestamp <= end (epoch seconds)
+
+        Chunks outside the window are skipped; samples are in append order,
+        so each chunk is cut with a binary search on its timestamps.
+        """
+        names = columns or list(self.columns)
+        result = {name: array.array(self.columns[name]) for name in names}
+        for chunk in self.chunks():
+            timestamps = chunk['timestamp']
+            low = bisect_left(timestamps, start) if start is not None else 0
+            high = bisect_right(timestamps, end) if end is not None else len(timestamps)
+            if low < high:
+                for name in names:
+                    result[name].frombytes(chunk[name][low:high].cast('B'))
+        return result
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='BitAxe columnar telemetry store')
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help='Samples, time range and size of a store file')
+    info.add_argument('file')
+    export = commands.add_parser('export', help='Export a store file as a performance log CSV')
+    export.add_argument('file')
+    export.add_argument('csv_file')
+    args = parser.parse_args()
+
+    with TelemetryReader(args.file) as reader:
+        timestamps = reader.column('timestamp')
+        if args.command == 'info':
+            size = os.path.getsize(args.file)
+            print(f"📦 {args.file}: {len(reader)} samples in {len(reader._chunks)} chunks, "
+                  f"{size} bytes ({size / max(len(reader), 1):.1f} bytes/sample)")
+            if timestamps:
+                print(f"   {reader.miner_ip or '?'}: {datetime.fromtimestamp(timestamps[0]).isoformat()} - "
+                      f"{datetime.fromtimestamp(timestamps[-1]).isoformat()}")
+        else:
+            data = reader.window()
+            with open(args.csv_file, 'w', newline='') as csvfile:
+                writer = csv.writer(csvfile)
+                # Stesse colonne del log di monitor_performance.py
+                writer.writerow(['timestamp', 'voltage', 'frequency', 'hashrate', 'temperature', 'power', 'efficiency'])
+                for i in range(len(timestamps)):
+                    power = data['power'][i]
+                    writer.writerow([datetime.fromtimestamp(timestamps[i]).isoformat(), data['core_voltage'][i],
+                                     data['frequency'][i], data['hash_rate'][i], data['temperature'][i], power,
+                                     data['hash_rate'][i] / power if power > 0 else 0])
+            print(f"📤 {len(timestamps)} samples written to {args.csv_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
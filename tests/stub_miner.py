@@ -0,0 +1,53 @@
+"""Minimal AxeOS stand-in served over real HTTP, for tests that exercise the transport
+
+Subclass StubMinerHandler and override info() and patch(); StubMiner serves it on
+127.0.0.1 from a background thread. For realistic miner behaviour use
+src/axeos_simulator.py instead.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+
+class StubMinerHandler(BaseHTTPRequestHandler):
+    """Keep-alive JSON endpoints: GET returns info(), PATCH returns patch(body)"""
+    protocol_version = "HTTP/1.1"
+
+    def info(self) -> Dict:
+        return {}
+
+    def patch(self, data: Dict) -> Dict:
+        return {}
+
+    def reply(self, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.reply(self.info())
+
+    def do_PATCH(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.reply(self.patch(json.loads(self.rfile.read(length) or b"{}")))
+
+    def log_message(self, *args):
+        pass
+
+
+class StubMiner:
+    """A StubMinerHandler subclass served on a free local port"""
+
+    def __init__(self, handler: type):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.address = f"127.0.0.1:{self.server.server_address[1]}"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
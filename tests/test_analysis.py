@@ -0,0 +1,92 @@
+import csv
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+import src.bitaxe_safe_overclock as bso
+from src import analysis
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS = [os.path.join(REPO_DIR, name) for name in ("bitaxe_safe_tuning_results_20250910_170544.csv",
+                                                     "bitaxe_safe_tuning_results_20250910_222850.csv")]
+LOG = os.path.join(REPO_DIR, "performance_log_20250910_223534.csv")
+
+
+@unittest.skipIf(analysis.np is None, "NumPy not installed (extra 'analysis')")
+class TestAnalysis(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_ranking_matches_rank_settings(self):
+        # One test per setting in a single sweep: the tables hold the rows themselves
+        results = bso.read_results_csv(RESULTS[1])
+        table = analysis.analyze(RESULTS[1:])['results']
+        self.assertEqual(int(table['rows'].sum()), len(results))
+        setting = lambda r: (r['frequency_mhz'], r['core_voltage_mv'])
+        for criteria in ({'objective': 'hashrate'}, {'objective': 'efficiency'}, {'objective': 'weighted'},
+                         {'max_power': 20}, {'min_hashrate': 1300, 'max_temperature': 64}):
+            ranked = analysis.top_k(table, 5, **criteria)
+            self.assertEqual([setting(r) for r in ranked],
+                             [setting(r) for r in bso.rank_settings(results, **criteria)[:5]], criteria)
+
+    def test_setting_aggregates(self):
+        table = analysis.analyze(RESULTS)['results']
+        rows = [r for filename in RESULTS for r in bso.read_results_csv(filename)
+                if (r['frequency_mhz'], r['core_voltage_mv']) == (600, 1100)]
+        i = list(zip(table['frequency_mhz'], table['core_voltage_mv'])).index((600, 1100))
+        self.assertEqual(table['rows'][i], len(rows))
+        self.assertAlmostEqual(table['hashrate_ghs'][i], sum(r['hashrate_ghs'] for r in rows) / len(rows))
+        self.assertAlmostEqual(table['cv'][i], sum(r['cv'] for r in rows) / len(rows))
+        self.assertAlmostEqual(table['joules_per_th'][i], table['power_w'][i] / table['hashrate_ghs'][i] * 1000)
+
+    def test_latest_verdict_wins(self):
+        filename = os.path.join(self.tmpdir.name, "retune.csv")
+        with open(filename, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=bso.RESULT_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerow({'timestamp': "2025-09-11T09:00:00", 'frequency_mhz': 750, 'core_voltage_mv': 1150,
+                             'hashrate_ghs': 1400.0, 'temperature_c': 70.0, 'power_w': 24.0, 'stable': False,
+                             'cv': 0.2, 'notes': 'unstable'})
+        table = analysis.analyze(RESULTS + [filename])['results']
+        self.assertNotEqual(analysis.top_k(table, 1, objective='hashrate')[0]['frequency_mhz'], 750)
+
+    def test_chunks_gzip_and_pool_give_same_tables(self):
+        compressed = os.path.join(self.tmpdir.name, "performance_log.csv.gz")
+        with open(LOG, "rb") as source, gzip.open(compressed, "wb") as target:
+            shutil.copyfileobj(source, target)
+        for n in range(4):
+            shutil.copy(LOG, os.path.join(self.tmpdir.name, f"performance_log_{n}.csv"))
+        single = analysis.analyze([LOG])['telemetry']
+        chunked = analysis.analyze([compressed], chunk_rows=7)['telemetry']
+        for name in single:
+            self.assertTrue(analysis.np.allclose(single[name], chunked[name]), name)
+        pooled = analysis.analyze([os.path.join(self.tmpdir.name, "performance_log_*.csv")], processes=2)['telemetry']
+        self.assertEqual(list(pooled['rows']), list(single['rows'] * 4))
+        self.assertTrue(analysis.np.allclose(pooled['cv'], single['cv']))
+
+    def test_log_aggregates_and_malformed_rows(self):
+        with open(LOG, newline='') as csvfile:
+            rows = [r for r in csv.DictReader(csvfile) if int(float(r['frequency'])) == 750]
+        filename = os.path.join(self.tmpdir.name, "performance_log_bad.csv")
+        shutil.copy(LOG, filename)
+        with open(filename, "a") as log:
+            log.write("2025-09-10T23:00:00,1150,750,,66.0,23.0,0\n")
+            log.write("garbage\n")
+        table = analysis.analyze([filename])['telemetry']
+        i = list(table['frequency_mhz']).index(750)
+        hashrates = [float(r['hashrate']) for r in rows]
+        mean = sum(hashrates) / len(hashrates)
+        self.assertEqual(table['rows'][i], len(rows))
+        self.assertAlmostEqual(table['hashrate_ghs'][i], mean)
+        std = (sum((h - mean) ** 2 for h in hashrates) / len(hashrates)) ** 0.5
+        self.assertAlmostEqual(table['cv'][i], std / mean)
+        self.assertEqual(table['temperature_max'][i], max(float(r['temperature']) for r in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,17 +1,12 @@
-import requests
 import json
+from src.bitaxe_safe_overclock import get_transport
 
 MINER_IP = "192.168.1.97"
 
 def test_endpoint(endpoint, method="GET", data=None):
-    url = f"http://{MINER_IP}{endpoint}"
+    transport = get_transport(MINER_IP)
     try:
-        if method == "GET":
-            response = requests.get(url, timeout=10)
-        elif method == "POST":
-            response = requests.post(url, json=data, timeout=10)
-        elif method == "PATCH":
-            response = requests.patch(url, json=data, timeout=10)
+        response = transport.request(method, endpoint, data=data)
         
         print(f"{method} {endpoint}: {response.status_code}")
         if response.status_code == 200:
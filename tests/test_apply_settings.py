@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+from src.bitaxe_safe_overclock import (
+    BitAxeSafeOverclock, MinerState, RunningStats, SAFETY_CONFIG, close_transports
+)
+from tests.stub_miner import StubMiner, StubMinerHandler
+
+
+class _ClampingHandler(StubMinerHandler):
+    """Stand-in AxeOS that clamps coreVoltage to 1200mV"""
+    settings = {}
+    patches = 0
+
+    def info(self):
+        return dict(self.settings)
+
+    def patch(self, data):
+        type(self).patches += 1
+        if "coreVoltage" in data:
+            data["coreVoltage"] = min(data["coreVoltage"], 1200)
+        if self.settings.get("autofanspeed"):
+            data.pop("fanspeed", None)  # The firmware keeps driving the fan
+        self.settings.update(data)
+        return {}
+
+
+class TestAtomicApply(unittest.TestCase):
+    def setUp(self):
+        _ClampingHandler.settings = {"frequency": 500, "coreVoltage": 1100, "fanspeed": 40}
+        _ClampingHandler.patches = 0
+        self.miner = StubMiner(_ClampingHandler)
+        self.overclocker = BitAxeSafeOverclock(self.miner.address)
+
+    def tearDown(self):
+        close_transports()
+        self.miner.stop()
+
+    def test_single_patch_applies_all_fields(self):
+        success, mismatches = self.overclocker.apply_settings_atomic(625, 1150, fan_speed=80)
+        self.assertTrue(success)
+        self.assertEqual(mismatches, {})
+        self.assertEqual(_ClampingHandler.patches, 1)
+        self.assertEqual(_ClampingHandler.settings, {"frequency": 625, "coreVoltage": 1150, "fanspeed": 80})
+
+    def test_clamped_value_is_reported(self):
+        success, mismatches = self.overclocker.apply_settings_atomic(700, 1250)
+        self.assertFalse(success)
+        self.assertEqual(mismatches, {"coreVoltage": (1250, 1200)})
+
+    def test_fanspeed_is_not_compared_with_autofan(self):
+        _ClampingHandler.settings["autofanspeed"] = 1
+        with self.assertLogs(self.overclocker.logger, 'WARNING') as logs:
+            success, mismatches = self.overclocker.apply_settings_atomic(625, 1150, fan_speed=80)
+        self.assertTrue(success)
+        self.assertEqual(mismatches, {})
+        self.assertTrue(any("Autofan is on" in line for line in logs.output))
+
+    def test_point_sends_the_fan_with_the_settings(self):
+        # Last sample: 62°C with the fan at 40% -> fan control wants 80%
+        self.overclocker.snapshot.put(MinerState.from_system_info({"temp": 62.0, "fanspeed": 40}))
+        self.assertEqual(self.overclocker.planned_fan_speed(), 80)
+        with mock.patch.dict(SAFETY_CONFIG, {"settle_mode": "fixed", "settle_time": 0}), \
+                mock.patch.object(self.overclocker, "test_stability", return_value=(False, RunningStats(), 0.0)):
+            self.overclocker.test_point(625, 1150, "stable", "unstable")
+        self.assertEqual(_ClampingHandler.patches, 1)
+        self.assertEqual(_ClampingHandler.settings, {"frequency": 625, "coreVoltage": 1150, "fanspeed": 80})
+
+    def test_apply_settings_fails_on_clamp(self):
+        with mock.patch.dict(SAFETY_CONFIG, {"settle_time": 0}):
+            self.assertTrue(self.overclocker.apply_settings(600, 1150))
+            self.assertFalse(self.overclocker.apply_settings(600, 1250))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import threading
+import time
+import unittest
+
+from src.bitaxe_safe_overclock import BitAxeSafeOverclock, Clock, VirtualClock, close_transports
+
+
+class TestClock(unittest.TestCase):
+    def test_sleep_returns_early_when_interrupted(self):
+        clock = Clock()
+        flag = {"stop": False}
+        threading.Timer(0.1, lambda: flag.update(stop=True)).start()
+        started = time.monotonic()
+        self.assertFalse(clock.sleep(30, lambda: flag["stop"]))
+        self.assertLess(time.monotonic() - started, 1)
+
+    def test_wake_cuts_wait_short(self):
+        clock = Clock()
+        wake = threading.Event()
+        threading.Timer(0.1, wake.set).start()
+        started = time.monotonic()
+        self.assertFalse(clock.sleep(30, wake=wake))
+        self.assertLess(time.monotonic() - started, 1)
+        # The wake-up is not consumed by (or leaked into) other waits on the same clock
+        self.assertTrue(clock.sleep(0.05))
+        self.assertFalse(clock.sleep(30, wake=wake))
+
+    def test_emergency_stop_does_not_cut_restore_backoff(self):
+        clock = VirtualClock(start=0)
+        overclocker = BitAxeSafeOverclock("127.0.0.1:1", clock=clock)
+        try:
+            overclocker.wake.set()
+            self.assertFalse(overclocker.wait(60))
+            # Retry backoff during the restore waits in full
+            self.assertTrue(clock.sleep(2))
+            self.assertEqual(clock.monotonic(), 2)
+        finally:
+            close_transports()
+
+    def test_full_sleep_completes(self):
+        self.assertTrue(Clock().sleep(0.05))
+
+    def test_virtual_clock_advances_without_waiting(self):
+        clock = VirtualClock(start=1000)
+        started = time.monotonic()
+        self.assertTrue(clock.sleep(3600))
+        self.assertEqual(clock.monotonic(), 3600)
+        self.assertEqual(clock.time(), 4600)
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertFalse(clock.sleep(10, lambda: True))
+        self.assertEqual(clock.monotonic(), 3600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.axeos_simulator import AxeOSSimulator, ChipModel, SimulatedMiner, VirtualClock
+from src.bitaxe_safe_overclock import SAFETY_CONFIG, close_transports
+from src.fleet_sweep import DistributedSweep, GridScheduler, calibrate
+
+CONFIG = {
+    'freq_start': 600,
+    'freq_end': 750,
+    'cv_start': 1100,
+    'cv_end': 1150,
+    'min_efficiency': 0,
+    'fan_control_enabled': False,  # Fan control would even out the temperature offsets
+}
+
+
+def anchor_row(frequency, hashrate, power, temperature, stable=True):
+    return {'frequency_mhz': frequency, 'core_voltage_mv': 1100, 'hashrate_ghs': hashrate,
+            'power_w': power, 'temperature_c': temperature, 'stable': stable}
+
+
+class TestGridScheduler(unittest.TestCase):
+    def test_miners_spread_over_voltages_and_failures_prune(self):
+        points = [(f, v) for v in (1100, 1125) for f in (600, 625, 650)]
+        scheduler = GridScheduler(points)
+        first = scheduler.next_point("a")
+        second = scheduler.next_point("b")
+        self.assertEqual({first, second}, {(600, 1100), (600, 1125)})
+
+        scheduler.done((600, 1100), False)
+        scheduler.done((600, 1125), True)
+        remaining = []
+        while True:
+            point = scheduler.next_point("a")
+            if point is None:
+                break
+            remaining.append(point)
+            scheduler.done(point, True)
+        self.assertEqual(remaining, [(625, 1125), (650, 1125)])
+
+
+class TestCalibrate(unittest.TestCase):
+    def test_offsets_relative_to_median_miner(self):
+        calibration = calibrate({
+            "a": [anchor_row(600, 1290, 15.0, 55.0), anchor_row(625, 1344, 15.5, 56.0)],
+            "b": [anchor_row(600, 1316, 15.3, 57.0), anchor_row(625, 1371, 15.8, 58.0)],
+            "c": [anchor_row(600, 1264, 14.7, 53.0), anchor_row(625, 1317, 15.2, 54.0)],
+            "d": [anchor_row(600, 1290, 15.0, 55.0, stable=False), anchor_row(625, 1344, 15.5, 56.0, stable=False)],
+        })
+        self.assertEqual(calibration["a"], {'hashrate': 1.0, 'power': 1.0, 'temperature': 0.0, 'anchors': 2})
+        self.assertAlmostEqual(calibration["b"]['hashrate'], 1.02, places=2)
+        self.assertAlmostEqual(calibration["b"]['temperature'], 2.0)
+        self.assertAlmostEqual(calibration["c"]['power'], 0.98, places=2)
+        # No stable anchor: no offsets, and the sweep leaves the miner out
+        self.assertEqual(calibration["d"]['anchors'], 0)
+
+
+class TestDistributedSweep(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.simulators = []
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        close_transports()
+        for simulator in self.simulators:
+            simulator.stop()
+
+    def start(self, model: ChipModel, seed: int) -> AxeOSSimulator:
+        simulator = AxeOSSimulator(SimulatedMiner(model, VirtualClock(start=0), seed=seed)).start()
+        self.simulators.append(simulator)
+        return simulator
+
+    def run_sweep(self, simulators, **kwargs) -> DistributedSweep:
+        fleet = DistributedSweep([s.address for s in simulators],
+                                 clocks={s.address: s.miner.clock for s in simulators}, **kwargs)
+        with mock.patch.dict(SAFETY_CONFIG, CONFIG):
+            asyncio.run(fleet.run())
+        return fleet
+
+    def test_grid_is_split_and_merged(self):
+        single = self.run_sweep([self.start(ChipModel(), 0)])
+        single_time = self.simulators[0].miner.clock.monotonic()
+
+        boards = [self.start(ChipModel(hashrate_per_mhz=2.15 * (1 + 0.05 * k), ambient_temperature=39.5 + 2 * k), k)
+                  for k in range(4)]
+        fleet = self.run_sweep(boards)
+
+        points = lambda results: {(r['frequency_mhz'], r['core_voltage_mv']) for r in results}
+        # Same coverage as one device (plus a few speculative points beyond a failure)
+        self.assertLessEqual(points(single.results), points(fleet.results))
+        self.assertLessEqual(len(points(fleet.results)), len(points(single.results)) + 3)
+        # Every miner took part, in a fraction of the single-device time (anchors cost two tests each)
+        self.assertTrue(all(len(fleet.miners[s.address].results) > 2 for s in boards))
+        self.assertLess(max(s.miner.clock.monotonic() for s in boards), single_time * 0.6)
+        # Offsets recovered from the anchors, merged rows on the reference scale
+        scales = [fleet.calibration[s.address]['hashrate'] for s in boards]
+        self.assertAlmostEqual(scales[3] / scales[0], 1.15, delta=0.05)
+        temperatures = [fleet.calibration[s.address]['temperature'] for s in boards]
+        self.assertAlmostEqual(temperatures[3] - temperatures[0], 6.0, delta=1.0)
+        anchors = lambda results: [r['hashrate_ghs'] for r in results
+                                   if r['notes'] == 'anchor_stable' and r['frequency_mhz'] == 600]
+        self.assertEqual(len(anchors(fleet.results)), 4)
+        spread = lambda hashrates: max(hashrates) / min(hashrates)
+        self.assertLess(spread(anchors(fleet.results)), spread(anchors(fleet.raw_results)))
+        # Original settings restored everywhere
+        for simulator in boards:
+            self.assertEqual((simulator.miner.frequency, simulator.miner.core_voltage), (525, 1100))
+
+    def test_outlier_miner_is_left_out(self):
+        boards = [self.start(ChipModel(), 0), self.start(ChipModel(), 1),
+                  self.start(ChipModel(hashrate_per_mhz=1.5), 2)]
+        fleet = self.run_sweep(boards)
+        self.assertNotIn(boards[2].address, fleet.calibration)
+        self.assertEqual(len(fleet.miners[boards[2].address].results), SAFETY_CONFIG['distributed_anchors'])
+        self.assertNotIn(boards[2].address, {r['miner_ip'] for r in fleet.results})
+
+
+if __name__ == '__main__':
+    unittest.main()
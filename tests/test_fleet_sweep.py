@@ -0,0 +1,105 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.bitaxe_safe_overclock import SAFETY_CONFIG, close_transports
+from src.fleet_sweep import FleetMiner, FleetSweep
+from tests.stub_miner import StubMiner, StubMinerHandler
+
+FAST_CONFIG = {
+    'settle_mode': 'fixed',
+    'settle_time': 0,
+    'stability_interval': 0,
+    'stability_samples': 3,
+    'freq_start': 600,
+    'freq_end': 700,
+    'cv_start': 1100,
+    'cv_end': 1200,
+    'cv_danger_threshold': 1175,
+}
+
+
+def make_server(voltage_offset):
+    """Stand-in miner: needs 1100mV + 1mV/MHz above 600MHz + voltage_offset to be stable"""
+    settings = {"frequency": 500, "coreVoltage": 1100}
+    samples = {"n": 0}
+
+    class Handler(StubMinerHandler):
+        def info(self):
+            samples["n"] += 1
+            required = 1100 + (settings["frequency"] - 600) + voltage_offset
+            hashrate = settings["frequency"] * 2.0
+            if settings["coreVoltage"] < required:
+                hashrate *= 0.5 if samples["n"] % 2 else 1.0
+            return {
+                "frequency": settings["frequency"], "coreVoltage": settings["coreVoltage"],
+                "temp": 55.0, "vrTemp": 50.0, "hashRate": hashrate, "power": 15.0,
+            }
+
+        def patch(self, data):
+            settings.update(data)
+            return {}
+
+    return StubMiner(Handler), settings
+
+
+class TestFleetSweep(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.servers = [make_server(offset) for offset in (0, 25, 50)]
+        self.ips = [miner.address for miner, _ in self.servers]
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        close_transports()
+        for miner, _ in self.servers:
+            miner.stop()
+
+    def test_concurrent_sweep_merges_results(self):
+        with mock.patch.dict(SAFETY_CONFIG, FAST_CONFIG):
+            fleet = FleetSweep(self.ips)
+            results = asyncio.run(fleet.run())
+
+        self.assertEqual({r['miner_ip'] for r in results}, set(self.ips))
+        best = {ip: miner.best_result() for ip, miner in fleet.miners.items()}
+        self.assertEqual(best[self.ips[0]]['frequency_mhz'], 650)
+        self.assertEqual(best[self.ips[0]]['core_voltage_mv'], 1150)
+        # Offset miners stop before the danger threshold without opt-in
+        self.assertTrue(all(r['core_voltage_mv'] < 1175 for r in results))
+        # Original settings are restored on every miner
+        for _, settings in self.servers:
+            self.assertEqual((settings["frequency"], settings["coreVoltage"]), (500, 1100))
+        # Each miner keeps its own finished journal and results file
+        journals = [name for name in os.listdir() if name.endswith('.journal')]
+        self.assertEqual(len(journals), len(self.ips))
+
+    def test_safety_state_is_per_miner(self):
+        with mock.patch.dict(SAFETY_CONFIG, dict(FAST_CONFIG, max_power=14)):
+            fleet = FleetSweep(self.ips[:1])
+            asyncio.run(fleet.run())
+        self.assertTrue(fleet.miners[self.ips[0]].emergency_stop)
+
+        with mock.patch.dict(SAFETY_CONFIG, FAST_CONFIG):
+            fleet = FleetSweep(self.ips)
+            asyncio.run(fleet.run())
+        self.assertFalse(any(m.emergency_stop for m in fleet.miners.values()))
+
+    def test_failing_miner_is_logged_and_marked(self):
+        with mock.patch.dict(SAFETY_CONFIG, FAST_CONFIG), \
+                mock.patch.object(FleetMiner, 'start', side_effect=RuntimeError("boom"), autospec=True):
+            fleet = FleetSweep(self.ips[:1])
+            with self.assertLogs('src.fleet_sweep', 'ERROR') as logs:
+                asyncio.run(fleet.run())
+        miner = fleet.miners[self.ips[0]]
+        self.assertTrue(miner.failed)
+        self.assertIn("boom", miner.stop_reason)
+        self.assertTrue(any("Sweep failed" in line and "boom" in line for line in logs.output))
+
+
+if __name__ == '__main__':
+    unittest.main()
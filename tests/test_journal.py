@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, SimulatedMiner, VirtualClock
+
+
+class Crash(BaseException):
+    """Stands in for SIGKILL / power loss: nothing after it runs"""
+
+
+class TestSweepJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "sweep.journal")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_torn_last_record_is_ignored(self):
+        journal = bso.SweepJournal(self.path)
+        journal.append('start', results_file='r.csv')
+        journal.append('point', result={'frequency_mhz': 600})
+        journal.close()
+        with open(self.path, 'a') as f:
+            f.write('{"type": "point", "resu')
+        records = bso.SweepJournal.read(self.path)
+        self.assertEqual([r['type'] for r in records], ['start', 'point'])
+
+    def test_append_after_torn_record(self):
+        journal = bso.SweepJournal(self.path)
+        journal.append('start', results_file='r.csv')
+        journal.append('point', result={'frequency_mhz': 600})
+        journal.close()
+        with open(self.path, 'a') as f:
+            f.write('{"type": "point", "resu')
+        # --resume reopens the journal and keeps appending
+        journal = bso.SweepJournal(self.path)
+        journal.append('resume')
+        journal.append('point', result={'frequency_mhz': 625})
+        journal.append('end')
+        journal.close()
+        records = bso.SweepJournal.read(self.path)
+        self.assertEqual([r['type'] for r in records], ['start', 'point', 'resume', 'point', 'end'])
+        self.assertIsNone(bso.SweepJournal.find_unfinished(self.path))
+        # A bad line in the middle (older journals) does not hide the records after it
+        with open(self.path, 'w') as f:
+            f.write('{"type": "start"}\n{"type": "po{"type": "end"}\n{"type": "end"}\n')
+        self.assertEqual([r['type'] for r in bso.SweepJournal.read(self.path)], ['start', 'end'])
+
+    def test_find_unfinished(self):
+        finished = bso.SweepJournal(os.path.join(self.tmpdir.name, "bitaxe_safe_tuning_results_1.journal"))
+        finished.append('start')
+        finished.append('end')
+        finished.close()
+        self.assertIsNone(bso.SweepJournal.find_unfinished(os.path.join(self.tmpdir.name, "*.journal")))
+        unfinished = bso.SweepJournal(os.path.join(self.tmpdir.name, "bitaxe_safe_tuning_results_0.journal"))
+        unfinished.append('start')
+        unfinished.close()
+        self.assertEqual(bso.SweepJournal.find_unfinished(os.path.join(self.tmpdir.name, "*.journal")),
+                         unfinished.path)
+
+
+class TestResume(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=2)).start()
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_resume_continues_from_last_finished_point(self):
+        first = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        real_test_point = first.test_point
+
+        def crash_after_five(*args):
+            if len(first.results) == 5:
+                raise Crash()
+            return real_test_point(*args)
+
+        with mock.patch.object(first, "test_point", side_effect=crash_after_five), \
+                mock.patch.object(first, "save_results", side_effect=Crash), \
+                mock.patch.object(first, "require_user_confirmation", return_value=True), \
+                mock.patch("builtins.input", return_value="2"):
+            with self.assertRaises(Crash):
+                first.run_overclock_sweep()
+        first.journal.close()
+
+        # The crash left the miner on a test point, not on the original settings
+        self.simulator.miner.patch_system({"frequency": 700, "coreVoltage": 1125})
+
+        second = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        self.assertTrue(second.resume())
+        with mock.patch.object(second, "require_user_confirmation", return_value=True), \
+                mock.patch.object(second, "apply_settings", wraps=second.apply_settings) as apply_settings, \
+                mock.patch("builtins.input", return_value="2"):
+            self.assertTrue(second.run_overclock_sweep())
+
+        self.assertEqual(second.results[:5], first.results)
+        self.assertGreater(len(second.results), 5)
+        self.assertEqual(second.results_file, first.results_file)
+        self.assertEqual(len(bso.read_results_csv(second.results_file)), len(second.results))
+        # Finished points were not re-tested; the last call restores the journaled original settings
+        applied = [c.args[:2] for c in apply_settings.call_args_list]
+        self.assertEqual(applied[:-1], [(r['frequency_mhz'], r['core_voltage_mv']) for r in second.results[5:]])
+        self.assertEqual(applied[-1], (525, 1100))
+        self.assertEqual((self.simulator.miner.frequency, self.simulator.miner.core_voltage), (525, 1100))
+        self.assertIsNone(bso.SweepJournal.find_unfinished())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, SimulatedMiner, VirtualClock
+
+GRID = [(f, v) for v in (1100, 1125, 1150) for f in range(600, 776, 25)]
+
+
+class TestTestPlanner(unittest.TestCase):
+    def setUp(self):
+        self.planner = bso.TestPlanner()
+
+    def test_big_power_steps_take_longer_to_settle(self):
+        small = self.planner.settle_time((600, 1100), (625, 1100))
+        large = self.planner.settle_time((600, 1100), (850, 1200))
+        self.assertEqual(small, bso.SAFETY_CONFIG['settle_window'])
+        self.assertGreater(large, 3 * small)
+        self.assertLessEqual(large, bso.SAFETY_CONFIG['settle_max_time'] + bso.SAFETY_CONFIG['plan_voltage_change_time'])
+
+    def test_orders(self):
+        cold = self.planner.order(GRID, method='cold_to_hot')
+        powers = [self.planner.power(*p) for p in cold]
+        self.assertEqual(powers, sorted(powers))
+
+        snake = self.planner.order(GRID, method='snake')
+        self.assertEqual(snake[:8], [(f, 1100) for f in range(600, 776, 25)])
+        self.assertEqual(snake[8:16], [(f, 1125) for f in range(775, 599, -25)])
+        self.assertEqual(sorted(self.planner.order(GRID, method='nearest')), sorted(GRID))
+
+        with self.assertRaises(ValueError):
+            self.planner.order(GRID, method='random')
+
+    def test_auto_beats_nested_loops(self):
+        start = (525, 1100)
+        auto = self.planner.order(GRID, start, method='auto')
+        self.assertEqual(sorted(auto), sorted(GRID))
+        for method in self.planner.ORDERS + ('given',):
+            self.assertLessEqual(self.planner.cost(auto, start), self.planner.cost(self.planner.order(GRID, start, method), start))
+        self.assertLess(self.planner.cost(auto, start), self.planner.cost(GRID, start))
+
+    def test_prune_keeps_frequency_ascending_per_voltage(self):
+        for method in self.planner.ORDERS:
+            ordered = self.planner.order(GRID, (525, 1100), method=method, prune=True)
+            for voltage in (1100, 1125, 1150):
+                freqs = [f for f, v in ordered if v == voltage]
+                self.assertEqual(freqs, sorted(freqs), method)
+
+    def test_observations_correct_the_eta(self):
+        # n samples are taken over n - 1 intervals
+        self.assertEqual(self.planner.test_time, (bso.SAFETY_CONFIG['stability_samples'] - 1) *
+                         bso.SAFETY_CONFIG['stability_interval'])
+        points = [(650, 1100), (700, 1125)]
+        before = self.planner.cost(points, (600, 1100))
+        for _ in range(10):
+            self.planner.observe((600, 1100), (650, 1100), settle_time=30.0, duration=130.0)
+        self.assertAlmostEqual(self.planner.test_time, 100.0)
+        self.assertGreater(self.planner.correction, 2.5)
+        self.assertLess(self.planner.cost(points, (600, 1100)), before)
+        self.assertEqual(self.planner.position, (650, 1100))
+
+    def test_fit_learns_power_model(self):
+        results = [{'frequency_mhz': f, 'core_voltage_mv': v, 'power_w': 1.8 + 0.0221 * f * (v / 1000) ** 2,
+                    'temperature_c': 40 + 1.15 * (1.8 + 0.0221 * f * (v / 1000) ** 2)} for f, v in GRID]
+        self.planner.fit(results)
+        self.assertAlmostEqual(self.planner.dynamic_power, 0.0221, places=4)
+        self.assertAlmostEqual(self.planner.thermal_resistance, 1.15, places=2)
+
+
+class TestGridSweep(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=1)).start()
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_eta_is_logged_before_settings_change_and_tracks_the_sweep(self):
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        etas = []
+        events = []
+        log_eta = overclocker.log_eta
+
+        def record_eta(label="ETA"):
+            events.append('eta')
+            etas.append((self.clock.monotonic(), overclocker.eta()[1]))
+            log_eta(label)
+
+        apply_settings = overclocker.apply_settings
+
+        def record_apply(*args):
+            events.append('apply')
+            return apply_settings(*args)
+
+        config = {'sweep_strategy': 'grid', 'freq_end': 750, 'min_efficiency': 0}
+        with mock.patch.dict(bso.SAFETY_CONFIG, config), \
+                mock.patch.object(overclocker, "log_eta", side_effect=record_eta), \
+                mock.patch.object(overclocker, "apply_settings", side_effect=record_apply), \
+                mock.patch.object(overclocker, "require_user_confirmation", return_value=True), \
+                mock.patch("builtins.input", return_value="2"):
+            self.assertTrue(overclocker.run_overclock_sweep())
+
+        self.assertEqual(events[0], 'eta')
+        # Every tested point is in plan order, failures prune the rest of their voltage
+        tested = [(r['frequency_mhz'], r['core_voltage_mv']) for r in overclocker.results]
+        self.assertEqual(tested, [p for p in overclocker.plan if p in tested])
+        self.assertLess(len(tested), len(overclocker.plan))
+        # Live estimates converge on the real end time
+        end = self.clock.monotonic()
+        first_error = abs(etas[0][0] + etas[0][1] - end)
+        last_errors = [abs(t + eta - end) for t, eta in etas[-3:]]
+        self.assertLess(max(last_errors), first_error)
+        self.assertLess(max(last_errors), 900)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, SimulatedMiner, VirtualClock
+from src.results_db import ResultsDB
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def result(frequency, voltage, stable, timestamp, hashrate=1300.0, power=16.0):
+    return {'timestamp': timestamp, 'frequency_mhz': frequency, 'core_voltage_mv': voltage,
+            'hashrate_ghs': hashrate, 'temperature_c': 60.0, 'power_w': power, 'stable': stable,
+            'cv': 0.01, 'notes': 'stable' if stable else 'unstable'}
+
+
+class TestResultsDB(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.clock = VirtualClock(start=0)
+        self.db = ResultsDB(os.path.join(self.tmpdir.name, "results.db"), batch_size=3,
+                            flush_interval=60, clock=self.clock)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def test_import_repo_csvs_once(self):
+        files = [os.path.join(REPO_DIR, name) for name in sorted(os.listdir(REPO_DIR)) if name.endswith(".csv")]
+        imported = sum(self.db.import_csv(filename, "10.0.0.1") for filename in files)
+        self.assertGreater(imported, 100)
+        self.assertEqual(sum(self.db.import_csv(filename, "10.0.0.1") for filename in files), 0)
+
+        sweep = os.path.join(REPO_DIR, "bitaxe_safe_tuning_results_20250910_222850.csv")
+        expected = bso.read_results_csv(sweep)
+        sweep_id, = [s['id'] for s in self.db.sweeps("10.0.0.1") if s['source'] == sweep]
+        rows = self.db.results(sweep_id=sweep_id)
+        self.assertEqual([(r['frequency_mhz'], r['core_voltage_mv'], r['stable']) for r in rows],
+                         [(r['frequency_mhz'], r['core_voltage_mv'], r['stable']) for r in expected])
+        self.assertAlmostEqual(rows[0]['hashrate_ghs'], expected[0]['hashrate_ghs'])
+        self.assertEqual(rows[0]['timestamp'], expected[0]['timestamp'])
+        self.assertEqual(len(self.db.telemetry("10.0.0.1")), 114)
+
+    def test_fleet_file_split_by_miner(self):
+        filename = os.path.join(self.tmpdir.name, "fleet.csv")
+        with open(filename, "w", newline="") as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=['miner_ip'] + bso.RESULT_FIELDNAMES, extrasaction='ignore')
+            writer.writeheader()
+            for ip in ("10.0.0.1", "10.0.0.2"):
+                writer.writerow(dict(result(600, 1100, True, "2025-09-10T17:00:00"), miner_ip=ip))
+        self.assertEqual(self.db.import_csv(filename), 2)
+        self.assertEqual({s['miner_ip']: s['points'] for s in self.db.sweeps()}, {"10.0.0.1": 1, "10.0.0.2": 1})
+
+    def test_best_uses_latest_verdict(self):
+        first = self.db.start_sweep("10.0.0.1", "grid")
+        self.db.add_results(first, [result(600, 1100, True, "2025-09-10T17:00:00"),
+                                    result(650, 1100, True, "2025-09-10T17:10:00", hashrate=1400.0)])
+        self.assertEqual(self.db.best("10.0.0.1")['frequency_mhz'], 650)
+        # A later sweep found 650MHz unstable: the old verdict no longer counts
+        second = self.db.start_sweep("10.0.0.1", "grid")
+        self.db.add_result(second, result(650, 1100, False, "2025-09-11T09:00:00"))
+        self.assertEqual(self.db.best("10.0.0.1")['frequency_mhz'], 600)
+        self.assertEqual(len(self.db.results("10.0.0.1")), 3)
+        self.assertIsNone(self.db.best("10.0.0.1", max_power=10))
+
+    def test_telemetry_written_in_batches(self):
+        state = bso.MinerState(frequency=600, core_voltage=1100, temperature=55.0, vr_temperature=50.0,
+                               hash_rate=1290.0, power=15.0, shares_accepted=0, shares_rejected=0,
+                               uptime=0, timestamp=self.clock.now())
+        self.db.add_sample("10.0.0.1", state)
+        self.db.add_sample("10.0.0.1", state)
+        count = lambda: self.db.conn.execute("SELECT COUNT(*) FROM telemetry").fetchone()[0]
+        self.assertEqual(count(), 0)
+        self.db.add_sample("10.0.0.1", state)
+        self.assertEqual(count(), 3)
+        self.db.add_sample("10.0.0.1", state)
+        self.clock.advance(61)
+        self.db.add_sample("10.0.0.1", state)
+        self.assertEqual(count(), 5)
+
+
+class TestSweepDatabase(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=2)).start()
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.db = ResultsDB("results.db", clock=self.clock)
+
+    def tearDown(self):
+        self.db.close()
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_sweep_results_and_telemetry_stored(self):
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        overclocker.db = self.db
+        overclocker.telemetry_sink = lambda state: self.db.add_sample(overclocker.miner_ip, state)
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'freq_end': 650, 'min_efficiency': 0}), \
+                mock.patch.object(overclocker, "require_user_confirmation", return_value=True), \
+                mock.patch("builtins.input", return_value="2"):
+            overclocker.run_overclock_sweep()
+        rows = self.db.results(sweep_id=overclocker.sweep_id)
+        self.assertEqual(len(rows), len(overclocker.results))
+        self.assertGreater(len(rows), 2)
+        self.assertEqual(rows, self.db.results(overclocker.miner_ip))
+        self.assertEqual(self.db.sweeps()[0]['source'], os.path.abspath(overclocker.results_file))
+        self.assertGreaterEqual(len(self.db.telemetry(overclocker.miner_ip)), len(rows) * 2)
+
+        # The next sweep of this miner warm-starts from the database
+        again = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        again.db = self.db
+        self.assertEqual(again.warm_start(), len(rows))
+        self.assertEqual(again.warm_start_files, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
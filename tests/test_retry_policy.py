@@ -0,0 +1,123 @@
+import unittest
+from unittest import mock
+
+import requests
+
+from src.axeos_simulator import VirtualClock
+from src.bitaxe_safe_overclock import (
+    SAFETY_CONFIG, BitAxeSafeOverclock, CircuitBreaker, LatencyTracker, MinerTransport, RetryPolicy,
+    close_transports, sample_schedule
+)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_grows_and_is_capped(self):
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=4.0, jitter=0)
+        self.assertEqual([policy.backoff(a) for a in range(5)], [0.5, 1.0, 2.0, 4.0, 4.0])
+
+    def test_jitter_stays_within_bounds(self):
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=1.0, jitter=0.5)
+        for _ in range(50):
+            self.assertTrue(0.5 <= policy.backoff(0) <= 1.0)
+
+    def test_idempotency_awareness(self):
+        policy = RetryPolicy()
+        read_timeout = requests.exceptions.ReadTimeout()
+        refused = requests.exceptions.ConnectionError()
+        self.assertTrue(policy.should_retry("GET", error=read_timeout))
+        self.assertFalse(policy.should_retry("PATCH", error=read_timeout))
+        self.assertTrue(policy.should_retry("PATCH", error=refused))
+        self.assertTrue(policy.should_retry("GET", status_code=503))
+        self.assertFalse(policy.should_retry("PATCH", status_code=503))
+        self.assertFalse(policy.should_retry("GET", status_code=404))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_and_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "closed")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        # reset_timeout elapsed: one trial call goes through
+        self.assertTrue(breaker.allow())
+        self.assertEqual(breaker.state, "half-open")
+        breaker.record_failure()
+        self.assertEqual(breaker.state, "open")
+        breaker.allow()
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+
+    def test_half_open_allows_a_single_probe(self):
+        clock = VirtualClock(start=0)
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+        clock.advance(30)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())     # The probe is still in flight
+        breaker.record_success()
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        clock.advance(30)
+        self.assertTrue(breaker.allow())
+        # A probe that never reported back does not block the miner forever
+        clock.advance(30)
+        self.assertTrue(breaker.allow())
+
+    def test_open_breaker_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+
+    def test_make_api_request_stops_calling_dead_miner(self):
+        overclocker = BitAxeSafeOverclock("127.0.0.1:1")
+        overclocker.retry_policy = RetryPolicy(max_attempts=3, backoff_base=0, jitter=0)
+        overclocker.transport.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        try:
+            self.assertIsNone(overclocker.make_api_request("/api/system/info"))
+            self.assertEqual(overclocker.transport.breaker.state, "open")
+            self.assertIsNone(overclocker.get_current_state(max_age=0))
+            self.assertEqual(overclocker.transport.breaker.failures, 3)
+        finally:
+            close_transports()
+
+    def test_unreachable_miner_is_not_unstable(self):
+        clock = VirtualClock(start=0)
+        overclocker = BitAxeSafeOverclock("127.0.0.1:1", clock=clock)
+        overclocker.retry_policy = RetryPolicy(max_attempts=1, backoff_base=0, jitter=0)
+        overclocker.transport.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=3600, clock=clock)
+        try:
+            with mock.patch.dict(SAFETY_CONFIG, {'settle_mode': 'fixed', 'settle_time': 0}):
+                polls, interval = sample_schedule()
+                stable, hashrates, _ = overclocker.test_stability(600, 1100)
+        finally:
+            close_transports()
+        self.assertIsNone(stable)
+        self.assertEqual(len(hashrates), 0)
+        # Failed polls keep the sampling cadence instead of spinning on the open breaker
+        self.assertEqual(clock.monotonic(), (polls - 1) * interval)
+
+
+class TestLatencyTracker(unittest.TestCase):
+    def test_timeout_follows_latency(self):
+        tracker = LatencyTracker()
+        self.assertEqual(tracker.timeout(10), 10)
+        for _ in range(20):
+            tracker.observe(0.2)
+        self.assertLess(tracker.timeout(10), 2)
+        self.assertGreaterEqual(tracker.timeout(10), 1.0)
+
+    def test_timeouts_are_tracked_per_method_and_endpoint(self):
+        transport = MinerTransport("127.0.0.1:1")
+        try:
+            for _ in range(20):
+                transport.latency.setdefault(("GET", "/api/system/info"), LatencyTracker()).observe(0.05)
+            self.assertLess(transport.timeout_for("/api/system/info")[1], 2)
+            # Fast status polls do not shorten the PATCH that re-initialises the ASIC
+            self.assertEqual(transport.timeout_for("/api/system", "PATCH")[1], 10)
+        finally:
+            transport.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
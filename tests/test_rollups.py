@@ -0,0 +1,102 @@
+import math
+import os
+import random
+import tempfile
+import unittest
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import VirtualClock
+from src.results_db import ResultsDB
+from src.rollups import RollupPipeline, StreamingQuantile
+
+START = 1757548800.0  # 2025-09-11T00:00:00Z, a day boundary
+
+
+def state(seconds, hashrate, power=16.0, temperature=60.0):
+    return bso.MinerState(frequency=600, core_voltage=1100, temperature=temperature, vr_temperature=50.0,
+                          hash_rate=hashrate, power=power, shares_accepted=0, shares_rejected=0,
+                          uptime=seconds, timestamp=START + seconds)
+
+
+class TestStreamingQuantile(unittest.TestCase):
+    def test_exact_for_small_buckets(self):
+        quantile = StreamingQuantile(0.95)
+        for value in range(1, 21):
+            quantile.add(value)
+        self.assertEqual(quantile.value, 19)
+        self.assertIsNone(StreamingQuantile().value)
+
+    def test_estimate_for_large_buckets(self):
+        rng = random.Random(1)
+        values = [rng.gauss(1300, 20) for _ in range(20000)]
+        quantile = StreamingQuantile(0.95)
+        for value in values:
+            quantile.add(value)
+        exact = sorted(values)[math.ceil(0.95 * len(values)) - 1]
+        self.assertAlmostEqual(quantile.value, exact, delta=1.0)
+        self.assertLessEqual(len(quantile.values), 100)
+
+
+class TestRollupPipeline(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.clock = VirtualClock(start=START + 2 * 86400)
+        self.db = ResultsDB(os.path.join(self.tmpdir.name, "results.db"), clock=self.clock)
+        self.rng = random.Random(0)
+
+    def tearDown(self):
+        self.db.close()
+        self.tmpdir.cleanup()
+
+    def feed(self, pipeline, seconds):
+        samples = []
+        for offset in seconds:
+            sample = state(offset, self.rng.gauss(1300, 20), power=self.rng.uniform(15, 17))
+            pipeline.add("10.0.0.1", sample)
+            samples.append(sample)
+        return samples
+
+    def test_rollups_match_raw_samples(self):
+        with RollupPipeline(self.db, retention={}, clock=self.clock) as pipeline:
+            samples = self.feed(pipeline, range(0, 7200, 5))
+        minutes = self.db.rollups("10.0.0.1", '1m')
+        self.assertEqual(len(minutes), 120)
+        self.assertEqual([r['samples'] for r in self.db.rollups("10.0.0.1", '1h')], [720, 720])
+        self.assertEqual(len(self.db.rollups("10.0.0.1", '1d')), 1)
+
+        first = [s.hash_rate for s in samples[:12]]
+        self.assertEqual(minutes[0]['start'], START)
+        self.assertAlmostEqual(minutes[0]['hashrate_mean'], sum(first) / 12)
+        self.assertEqual((minutes[0]['hashrate_min'], minutes[0]['hashrate_max']), (min(first), max(first)))
+        self.assertEqual(minutes[0]['hashrate_p95'], sorted(first)[11])
+        efficiency = [s.hash_rate / s.power for s in samples[:12]]
+        self.assertAlmostEqual(minutes[0]['efficiency_mean'], sum(efficiency) / 12)
+        day, = self.db.rollups("10.0.0.1", '1d')
+        self.assertAlmostEqual(day['power_mean'], sum(s.power for s in samples) / len(samples))
+
+    def test_restart_continues_open_bucket(self):
+        with RollupPipeline(self.db, retention={}, clock=self.clock) as pipeline:
+            first = self.feed(pipeline, range(0, 1800, 5))
+        with RollupPipeline(self.db, retention={}, clock=self.clock) as pipeline:
+            second = self.feed(pipeline, range(1800, 3600, 5))
+        hour, = self.db.rollups("10.0.0.1", '1h')
+        hashrates = [s.hash_rate for s in first + second]
+        self.assertEqual(hour['samples'], 720)
+        self.assertAlmostEqual(hour['hashrate_mean'], sum(hashrates) / 720)
+        self.assertEqual(hour['hashrate_max'], max(hashrates))
+
+    def test_retention_per_resolution(self):
+        retention = {'raw': 86400, '1m': 86400, '1h': 30 * 86400, '1d': None}
+        with RollupPipeline(self.db, retention=retention, clock=self.clock) as pipeline:
+            for sample in self.feed(pipeline, range(0, 600, 5)):
+                self.db.add_sample("10.0.0.1", sample)
+        # Two days later: minutes and raw samples expire, hours and days stay
+        self.assertEqual(pipeline.prune(), 10 + 120)
+        self.assertEqual(self.db.rollups("10.0.0.1", '1m'), [])
+        self.assertEqual(self.db.telemetry("10.0.0.1"), [])
+        self.assertEqual(len(self.db.rollups("10.0.0.1", '1h')), 1)
+        self.assertEqual(len(self.db.rollups("10.0.0.1", '1d')), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
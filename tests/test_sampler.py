@@ -0,0 +1,92 @@
+import math
+import random
+import statistics
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, SimulatedMiner, VirtualClock
+
+
+def smoothed_series(n, interval, smoothing=30.0, seed=0):
+    """Hashrate as seen through a firmware moving average: AR(1) with unit variance"""
+    rng = random.Random(seed)
+    rho = math.exp(-interval / smoothing)
+    value = rng.gauss(0, 1)
+    series = []
+    for _ in range(n):
+        value = rho * value + math.sqrt(1 - rho ** 2) * rng.gauss(0, 1)
+        series.append(1000 + 10 * value)
+    return series
+
+
+class TestRunningStats(unittest.TestCase):
+    def test_matches_statistics_module(self):
+        values = [1000.0, 1012.5, 987.0, 1003.2, 995.1]
+        stats = bso.RunningStats(values)
+        self.assertEqual(len(stats), 5)
+        self.assertAlmostEqual(stats.mean, statistics.mean(values))
+        self.assertAlmostEqual(stats.stdev, statistics.stdev(values))
+        self.assertEqual((stats.min, stats.max), (987.0, 1012.5))
+        self.assertEqual(stats.effective_samples, 5)
+
+    def test_correlated_samples_count_less(self):
+        stats = bso.RunningStats([1000.0] * 55, interval=5.0)
+        self.assertLess(stats.effective_samples, 55 / 5)
+        self.assertGreater(bso.RunningStats([1000.0] * 55, interval=60.0).effective_samples, 40)
+
+    def test_variance_corrected_for_smoothing(self):
+        # Mean of the estimates over many short runs: the naive estimate is biased low
+        naive, corrected = [], []
+        for seed in range(300):
+            series = smoothed_series(55, 5.0, seed=seed)
+            naive.append(statistics.variance(series))
+            corrected.append(bso.RunningStats(series, interval=5.0).variance)
+        self.assertLess(statistics.mean(naive), 90)
+        self.assertAlmostEqual(statistics.mean(corrected), 100, delta=10)
+
+    def test_shared_by_stability_criteria(self):
+        values = [1000, 1010, 990]
+        self.assertEqual(bso.evaluate_stability(bso.RunningStats(values)), bso.evaluate_stability(values))
+        self.assertEqual(bso.sequential_verdict(bso.RunningStats(values)), bso.sequential_verdict(values))
+
+
+class TestSampleSchedule(unittest.TestCase):
+    def test_same_duration_denser_polls(self):
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'stability_samples': 10, 'stability_interval': 30,
+                                                 'sample_interval': 5.0}):
+            self.assertEqual(bso.sample_schedule(), (55, 5.0))
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'stability_samples': 10, 'stability_interval': 30,
+                                                 'sample_interval': None}):
+            self.assertEqual(bso.sample_schedule(), (10, 30))
+
+
+class TestStreamingSampler(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=3)).start()
+
+    def tearDown(self):
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_raw_samples_go_to_telemetry_sink(self):
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        raw = []
+        overclocker.telemetry_sink = raw.append
+        overclocker.apply_settings(600, 1100)
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'sample_interval': 2.0, 'stability_mode': 'fixed'}):
+            started = self.clock.monotonic()
+            stable, hashrates, mean_hashrate = overclocker.test_stability(600, 1100)
+            sampling = self.clock.monotonic() - started - overclocker.last_settle_time
+            polls = bso.sample_schedule()[0]
+        self.assertTrue(stable)
+        self.assertEqual(len(raw), len(hashrates))
+        self.assertEqual(len(hashrates), polls)
+        self.assertAlmostEqual(sampling, 270, delta=5)
+        self.assertAlmostEqual(mean_hashrate, statistics.mean(s.hash_rate for s in raw))
+        self.assertEqual(hashrates.max, max(s.hash_rate for s in raw))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src.bitaxe_safe_overclock import (
+    BitAxeSafeOverclock, RESULT_FIELDNAMES, SAFETY_CONFIG, joules_per_th, pareto_frontier,
+    rank_settings, read_results_csv, select_best
+)
+
+
+def result(frequency, voltage, hashrate, power, temperature, stable=True, cv=0.02):
+    return {'timestamp': '', 'frequency_mhz': frequency, 'core_voltage_mv': voltage,
+            'hashrate_ghs': hashrate, 'temperature_c': temperature, 'power_w': power,
+            'stable': stable, 'cv': cv, 'notes': '', 'samples': 10, 'settle_time_s': 5.0}
+
+
+# Hashrate grows with frequency, J/TH and temperature grow faster
+RESULTS = [
+    result(600, 1100, 1290.0, 17.0, 55.0),   # 13.2 J/TH, coolest
+    result(650, 1100, 1398.0, 18.3, 57.0),   # 13.1 J/TH, most efficient
+    result(650, 1125, 1396.0, 19.0, 58.0),   # dominated by the 1100mV point
+    result(700, 1125, 1505.0, 20.6, 61.0),
+    result(750, 1150, 1612.0, 23.5, 65.0),
+    result(800, 1175, 1720.0, 26.6, 69.0, cv=0.08),
+    result(850, 1200, 1650.0, 30.0, 74.0, stable=False, cv=0.30),
+]
+
+
+class TestParetoFrontier(unittest.TestCase):
+    def test_dominated_and_unstable_points_are_excluded(self):
+        frontier = [(r['frequency_mhz'], r['core_voltage_mv']) for r in pareto_frontier(RESULTS)]
+        self.assertNotIn((650, 1125), frontier)
+        self.assertNotIn((850, 1200), frontier)
+        self.assertEqual(frontier, [(800, 1175), (750, 1150), (700, 1125), (650, 1100), (600, 1100)])
+
+    def test_joules_per_th(self):
+        self.assertAlmostEqual(joules_per_th(result(600, 1100, 1000.0, 15.0, 50.0)), 15.0)
+
+
+class TestRankSettings(unittest.TestCase):
+    def best(self, **criteria):
+        best = select_best(RESULTS, **criteria)
+        return best and (best['frequency_mhz'], best['core_voltage_mv'])
+
+    def test_max_hashrate_ignores_unstable_points(self):
+        self.assertEqual(self.best(objective='hashrate'), (800, 1175))
+
+    def test_max_hashrate_under_power_limit(self):
+        self.assertEqual(self.best(objective='hashrate', max_power=24), (750, 1150))
+
+    def test_best_efficiency_above_hashrate_floor(self):
+        self.assertEqual(self.best(objective='efficiency'), (650, 1100))
+        self.assertEqual(self.best(objective='efficiency', min_hashrate=1500), (700, 1125))
+
+    def test_weighted_score(self):
+        # Only hashrate counts: same as max hashrate
+        self.assertEqual(self.best(objective='weighted', weights={'efficiency': 0, 'temperature': 0, 'margin': 0}),
+                         (800, 1175))
+        # Temperature and stability margin weigh against the hottest, noisiest point
+        self.assertNotEqual(self.best(objective='weighted', weights={'temperature': 2.0, 'margin': 2.0}),
+                            (800, 1175))
+
+    def test_unsatisfiable_constraints(self):
+        self.assertIsNone(self.best(max_power=10))
+        self.assertEqual(rank_settings(RESULTS, min_hashrate=5000), [])
+
+    def test_defaults_come_from_config(self):
+        with mock.patch.dict(SAFETY_CONFIG, {'selection_objective': 'efficiency', 'selection_min_hashrate': 1500}):
+            self.assertEqual(self.best(), (700, 1125))
+
+    def test_unknown_objective(self):
+        with self.assertRaises(ValueError):
+            rank_settings(RESULTS, objective='coolest')
+
+
+class TestFindBestSettings(unittest.TestCase):
+    def test_uses_selector_on_given_results(self):
+        overclocker = BitAxeSafeOverclock("127.0.0.1:1")
+        best = overclocker.find_best_settings(RESULTS, objective='hashrate', max_power=24)
+        self.assertEqual((best['frequency'], best['core_voltage'], best['power']), (750, 1150, 23.5))
+        self.assertAlmostEqual(best['joules_per_th'], 23.5 / 1612.0 * 1000)
+        self.assertIsNone(overclocker.find_best_settings(RESULTS, max_power=10))
+
+    def test_csv_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "results.csv")
+            with open(filename, 'w', newline='') as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=RESULT_FIELDNAMES)
+                writer.writeheader()
+                writer.writerows(RESULTS)
+            best = select_best(read_results_csv(filename), objective='efficiency', min_hashrate=1500)
+        self.assertEqual((best['frequency_mhz'], best['core_voltage_mv']), (700, 1125))
+
+
+if __name__ == '__main__':
+    unittest.main()
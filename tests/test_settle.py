@@ -0,0 +1,61 @@
+import unittest
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, SimulatedMiner, VirtualClock
+
+
+class TestSettleDetector(unittest.TestCase):
+    def test_flat_telemetry_settles_after_one_window(self):
+        detector = bso.SettleDetector(window=10, hashrate_slope=1.0, temperature_slope=0.05)
+        for t in range(0, 8):
+            detector.add(t, 1000.0, 60.0)
+            self.assertFalse(detector.settled)
+        for t in range(8, 11):
+            detector.add(t, 1000.0, 60.0)
+        self.assertTrue(detector.settled)
+
+    def test_temperature_ramp_is_not_settled(self):
+        detector = bso.SettleDetector(window=10, hashrate_slope=1.0, temperature_slope=0.05)
+        for t in range(0, 21):
+            detector.add(t, 1000.0, 50.0 + 0.1 * t)
+        self.assertFalse(detector.settled)
+        self.assertAlmostEqual(detector.slopes()[1], 0.1)
+
+    def test_hashrate_ramp_is_not_settled(self):
+        detector = bso.SettleDetector(window=10, hashrate_slope=1.0, temperature_slope=0.05)
+        for t in range(0, 21):
+            detector.add(t, 500.0 + 20 * t, 60.0)
+        self.assertFalse(detector.settled)
+
+
+class TestWaitUntilSettled(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=3)).start()
+        self.overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+
+    def tearDown(self):
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_small_step_settles_fast_big_step_waits(self):
+        self.clock.advance(600)
+        self.assertTrue(self.overclocker.apply_settings(550, 1100))
+        small = self.overclocker.wait_until_settled()
+        self.assertLess(small, 2 * bso.SAFETY_CONFIG['settle_window'])
+
+        self.assertTrue(self.overclocker.apply_settings(800, 1200))
+        big = self.overclocker.wait_until_settled()
+        self.assertGreater(big, small)
+        self.assertLessEqual(big, bso.SAFETY_CONFIG['settle_max_time'] + bso.SAFETY_CONFIG['settle_poll_interval'])
+
+    def test_settle_time_is_recorded_per_point(self):
+        self.clock.advance(600)
+        self.overclocker.test_point(550, 1100, 'ok', 'ko')
+        result = self.overclocker.results[-1]
+        self.assertIsNotNone(result['settle_time_s'])
+        self.assertEqual(result['settle_time_s'], self.overclocker.last_settle_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
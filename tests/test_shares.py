@@ -0,0 +1,122 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, ChipModel, SimulatedMiner, VirtualClock
+
+START = datetime(2025, 9, 10, 17, 0, 0)
+
+
+def state(seconds, accepted, rejected, difficulty=1000.0):
+    return bso.MinerState(frequency=600, core_voltage=1100, temperature=55.0, vr_temperature=50.0,
+                          hash_rate=1290.0, power=15.0, shares_accepted=accepted, shares_rejected=rejected,
+                          uptime=seconds, pool_difficulty=difficulty, timestamp=START + timedelta(seconds=seconds))
+
+
+class TestShareEstimator(unittest.TestCase):
+    def test_hashrate_from_share_deltas(self):
+        estimator = bso.ShareEstimator()
+        for seconds, accepted, rejected in [(0, 500, 5), (150, 540, 5), (300, 580, 10)]:
+            estimator.add(state(seconds, accepted, rejected))
+        self.assertEqual((estimator.accepted, estimator.rejected), (80, 5))
+        self.assertAlmostEqual(estimator.reject_rate, 5 / 85)
+        self.assertAlmostEqual(estimator.hashrate, 85 * 1000 * 2 ** 32 / 300 / 1e9)
+        low, high = estimator.interval()
+        self.assertLess(low, estimator.hashrate)
+        self.assertGreater(high, estimator.hashrate)
+        # Exact Poisson 99% bounds for 85 events: 63.13 - 111.76
+        self.assertAlmostEqual(low / estimator.hashrate * 85, 63.13, delta=0.2)
+        self.assertAlmostEqual(high / estimator.hashrate * 85, 111.76, delta=0.2)
+
+    def test_counter_reset_and_unknown_difficulty(self):
+        estimator = bso.ShareEstimator()
+        estimator.add(state(0, 500, 5))
+        estimator.add(state(30, 3, 0))     # Miner restarted: interval skipped
+        estimator.add(state(60, 13, 0))
+        self.assertEqual((estimator.accepted, estimator.seconds), (10, 30))
+
+        estimator = bso.ShareEstimator()
+        estimator.add(state(0, 0, 0, difficulty=0))
+        estimator.add(state(60, 20, 0, difficulty=0))
+        self.assertIsNone(estimator.hashrate)
+        self.assertIsNone(estimator.interval())
+        self.assertFalse(estimator.mismatch(5000))
+
+    def test_mismatch_needs_enough_shares(self):
+        estimator = bso.ShareEstimator()
+        estimator.add(state(0, 0, 0))
+        estimator.add(state(300, 10, 0))
+        self.assertFalse(estimator.mismatch(1290.0))
+        estimator.add(state(1200, 40, 0))
+        # 40 shares in 20 minutes: about 143 GH/s of valid work
+        self.assertTrue(estimator.mismatch(1290.0))
+        self.assertFalse(estimator.mismatch(150.0))
+
+
+class TestShareStability(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.simulator = None
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        bso.close_transports()
+        self.simulator.stop()
+
+    def overclocker(self, model: ChipModel) -> bso.BitAxeSafeOverclock:
+        clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(model, clock, seed=2)).start()
+        return bso.BitAxeSafeOverclock(self.simulator.address, clock=clock)
+
+    def test_invalid_work_is_flagged(self):
+        # Below the boundary the firmware keeps reporting a smooth hashrate, but a third of it finds no shares
+        model = ChipModel(pool_difficulty=100, invalid_work_per_mv=0.015, instability_loss=0,
+                          instability_noise=0, reject_rate_per_mv=0, error_rate_per_mv=0)
+        overclocker = self.overclocker(model)
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'fan_control_enabled': False}):
+            self.assertFalse(overclocker.test_point(700, 1100, 'ok', 'ko'))
+            self.assertTrue(overclocker.test_point(600, 1100, 'ok', 'ko'))
+        flagged, valid = overclocker.results
+        self.assertEqual(flagged['notes'], 'ko_invalid_work')
+        self.assertLess(flagged['cv'], bso.SAFETY_CONFIG['max_cv_variation'])
+        self.assertLess(flagged['share_hashrate_ghs'], 0.8 * flagged['hashrate_ghs'])
+        self.assertAlmostEqual(valid['share_hashrate_ghs'], valid['hashrate_ghs'], delta=0.1 * valid['hashrate_ghs'])
+        self.assertGreater(valid['shares_accepted'], 500)
+        self.assertEqual(valid['shares_accepted'] + valid['shares_rejected'],
+                         overclocker.last_shares.shares)
+
+    def test_error_rate_fails_marginal_point_early(self):
+        # 10mV below the boundary: the CV barely moves, ASIC errors and rejects do
+        model = ChipModel(instability_noise=0.002, instability_loss=0)
+        overclocker = self.overclocker(model)
+        frequency = 700
+        voltage = int(model.required_voltage(frequency)) - 10
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'fan_control_enabled': False, 'max_reject_rate': 0.5,
+                                                 'max_asic_error_rate': 6.0}):
+            started = overclocker.clock.monotonic()
+            self.assertFalse(overclocker.test_point(frequency, voltage, 'ok', 'ko'))
+            elapsed = overclocker.clock.monotonic() - started - overclocker.last_settle_time
+        result = overclocker.results[-1]
+        self.assertEqual(result['notes'], 'ko_error_rate')
+        self.assertLess(result['cv'], bso.SAFETY_CONFIG['max_cv_variation'])
+        self.assertLessEqual(elapsed, 60)
+
+    def test_share_columns_round_trip(self):
+        overclocker = self.overclocker(ChipModel())
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'fan_control_enabled': False}):
+            overclocker.results_file = overclocker.new_results_filename()
+            overclocker.test_point(600, 1100, 'ok', 'ko')
+            overclocker.save_results()
+        row, = bso.read_results_csv(overclocker.results_file)
+        self.assertEqual(row['shares_accepted'], overclocker.results[0]['shares_accepted'])
+        self.assertAlmostEqual(row['share_hashrate_ghs'], overclocker.results[0]['share_hashrate_ghs'], places=3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, ChipModel, SimulatedMiner, VirtualClock
+
+
+class TestChipModel(unittest.TestCase):
+    def test_thermal_response_is_first_order(self):
+        clock = VirtualClock(start=0)
+        miner = SimulatedMiner(clock=clock, frequency=525, core_voltage=1100, fan_speed=100)
+        start = miner.temperature
+        miner.patch_system({"frequency": 750, "coreVoltage": 1150})
+        target = miner.steady_temperature(miner.model.power(750, 1150))
+        clock.advance(miner.model.thermal_time_constant)
+        miner.advance()
+        # One time constant covers ~63% of the step
+        self.assertAlmostEqual((miner.temperature - start) / (target - start), 1 - 1 / 2.718281828, places=2)
+
+    def test_instability_below_voltage_boundary(self):
+        model = ChipModel()
+        miner = SimulatedMiner(model, VirtualClock(start=0), frequency=750, core_voltage=1100)
+        self.assertLess(miner.margin(), 0)
+        self.assertLess(miner.target_hashrate(), model.hashrate_per_mhz * 750)
+        self.assertGreater(miner.reject_rate(), model.base_reject_rate)
+
+    def test_firmware_clamps_out_of_range_values(self):
+        miner = SimulatedMiner(clock=VirtualClock(start=0))
+        miner.patch_system({"coreVoltage": 1500, "frequency": 100})
+        self.assertEqual((miner.frequency, miner.core_voltage), (400, 1300))
+
+    def test_same_seed_is_deterministic(self):
+        infos = []
+        for _ in range(2):
+            clock = VirtualClock(start=0)
+            miner = SimulatedMiner(clock=clock, seed=7)
+            samples = []
+            for _ in range(5):
+                clock.advance(30)
+                samples.append(miner.system_info()["hashRate"])
+            infos.append(samples)
+        self.assertEqual(infos[0], infos[1])
+
+
+class TestSimulatedSweep(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=1)).start()
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_stability_runs_in_virtual_time(self):
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        started = time.monotonic()
+        overclocker.apply_settings(650, 1100)
+        stable, hashrates, _ = overclocker.test_stability(650, 1100)
+        self.assertTrue(stable)
+        self.assertEqual(len(hashrates), bso.sample_schedule()[0])
+        self.assertGreaterEqual(self.clock.monotonic(), 270)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_full_sweep_finds_voltage_boundary(self):
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        # Accept dangerous-voltage prompts, then choose "restore original settings"
+        with mock.patch.object(overclocker, "require_user_confirmation", return_value=True), \
+                mock.patch("builtins.input", return_value="2"):
+            self.assertTrue(overclocker.run_overclock_sweep())
+
+        # Long sweep in virtual time (unstable points end early on their error rate)
+        self.assertGreater(self.clock.monotonic(), 2400)
+        miner = self.simulator.miner
+        for result in overclocker.results:
+            if result['stable']:
+                required = miner.model.required_voltage(result['frequency_mhz'])
+                self.assertGreaterEqual(result['core_voltage_mv'], required - 10)
+        # Original settings restored at the end
+        self.assertEqual((miner.frequency, miner.core_voltage), (525, 1100))
+
+    def test_performance_monitor_runs_in_virtual_time(self):
+        from examples.monitor_performance import PerformanceMonitor
+
+        monitor = PerformanceMonitor(self.simulator.address, "perf.csv", clock=self.clock)
+        monitor.monitor(interval=5, duration=3600)
+        with open("perf.csv") as logfile:
+            self.assertGreaterEqual(len(logfile.readlines()), 720)
+        self.assertGreaterEqual(self.clock.monotonic(), 3600)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+
+from src.bitaxe_safe_overclock import BitAxeSafeOverclock, SAFETY_CONFIG, close_transports
+from tests.stub_miner import StubMiner, StubMinerHandler
+
+
+class _CountingHandler(StubMinerHandler):
+    info_polls = 0
+    fanspeed = 40
+
+    def info(self):
+        type(self).info_polls += 1
+        return {"frequency": 600, "coreVoltage": 1150, "temp": 62.0, "vrTemp": 55.0,
+                "hashRate": 1000.0, "power": 15.0, "fanspeed": type(self).fanspeed}
+
+    def patch(self, data):
+        type(self).fanspeed = data.get("fanspeed", type(self).fanspeed)
+        return {}
+
+
+class TestSnapshotCache(unittest.TestCase):
+    def setUp(self):
+        _CountingHandler.info_polls = 0
+        _CountingHandler.fanspeed = 40
+        self.miner = StubMiner(_CountingHandler)
+        self.overclocker = BitAxeSafeOverclock(self.miner.address)
+
+    def tearDown(self):
+        close_transports()
+        self.miner.stop()
+
+    def test_one_poll_per_tick(self):
+        config = {"settle_mode": "fixed", "settle_time": 0, "stability_interval": 0, "stability_samples": 3}
+        with mock.patch.dict(SAFETY_CONFIG, config):
+            stable, hashrates, _ = self.overclocker.test_stability(600, 1150)
+            final_state = self.overclocker.get_current_state()
+
+        self.assertTrue(stable)
+        self.assertEqual(len(hashrates), 3)
+        # Samples feed fan control and safety checks; the result row reuses the last one
+        self.assertEqual(_CountingHandler.info_polls, 3)
+        self.assertEqual(self.overclocker.snapshot.misses, 3)
+        self.assertEqual(self.overclocker.snapshot.hits, 1)
+        self.assertEqual(final_state.fan_speed, SAFETY_CONFIG['fan_speed_high'])
+
+    def test_expired_snapshot_is_refetched(self):
+        self.overclocker.get_current_state()
+        self.overclocker.get_current_state(max_age=0)
+        self.assertEqual(_CountingHandler.info_polls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+
+from src.bitaxe_safe_overclock import (
+    SAFETY_CONFIG, ShareEstimator, error_rate_violation, evaluate_stability, poisson_sf, sequential_verdict
+)
+
+
+ERROR_LIMITS = {'max_reject_rate': 0.5, 'max_asic_error_rate': 6.0}
+
+
+def counts(seconds, rejected=0, errors=0):
+    shares = ShareEstimator()
+    shares.seconds, shares.rejected, shares.errors = seconds, rejected, errors
+    return shares
+
+
+class TestSequentialVerdict(unittest.TestCase):
+    def test_clearly_unstable_stops_early(self):
+        self.assertFalse(sequential_verdict([1300.0, 800.0, 1350.0]))
+
+    def test_clearly_stable_stops_early(self):
+        samples = [1300.0, 1302.0, 1298.0, 1301.0, 1299.0, 1300.0]
+        self.assertIsNone(sequential_verdict(samples[:5]))
+        self.assertTrue(sequential_verdict(samples))
+
+    def test_borderline_keeps_sampling(self):
+        # CV right at the threshold is inside the indifference zone
+        samples = [1300.0, 1430.0, 1170.0]
+        self.assertIsNone(sequential_verdict(samples))
+
+    def test_respects_minimum_samples(self):
+        with mock.patch.dict(SAFETY_CONFIG, {"sequential_min_samples": 5}):
+            self.assertIsNone(sequential_verdict([1300.0, 800.0, 1350.0]))
+
+    def test_dead_hashrate_is_unstable(self):
+        self.assertFalse(sequential_verdict([0.0, 0.0, 0.0]))
+
+
+class TestEvaluateStability(unittest.TestCase):
+    def test_fixed_criteria(self):
+        stable, mean, cv = evaluate_stability([1000.0, 1010.0, 990.0])
+        self.assertTrue(stable)
+        self.assertAlmostEqual(mean, 1000.0)
+        self.assertAlmostEqual(cv, 0.01)
+        self.assertFalse(evaluate_stability([1000.0, 500.0, 1500.0])[0])
+
+
+@mock.patch.dict(SAFETY_CONFIG, ERROR_LIMITS)
+class TestErrorRate(unittest.TestCase):
+    def test_poisson_tail(self):
+        self.assertEqual(poisson_sf(0, 3.0), 1.0)
+        self.assertAlmostEqual(poisson_sf(1, 3.0), 1 - 0.049787, places=5)
+        self.assertAlmostEqual(poisson_sf(5, 0.5), 0.000172, places=6)
+
+    def test_burst_of_rejects_aborts_within_a_minute(self):
+        # 5 rejects in the first minute are very unlikely at 0.5/min
+        self.assertIn("rejected shares", error_rate_violation(counts(60, rejected=5)))
+        self.assertIsNone(error_rate_violation(counts(60, rejected=2)))
+
+    def test_final_verdict_compares_the_rate(self):
+        self.assertIsNone(error_rate_violation(counts(270, rejected=2)))
+        self.assertIsNotNone(error_rate_violation(counts(270, rejected=3), final=True))
+        self.assertIsNone(error_rate_violation(counts(270, errors=20), final=True))
+        self.assertIn("ASIC errors", error_rate_violation(counts(270, errors=30), final=True))
+
+    def test_disabled_limits(self):
+        with mock.patch.dict(SAFETY_CONFIG, {'max_reject_rate': None, 'max_asic_error_rate': None}):
+            self.assertIsNone(error_rate_violation(counts(60, rejected=50, errors=500), final=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
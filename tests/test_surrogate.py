@@ -0,0 +1,86 @@
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, ChipModel, SimulatedMiner, VirtualClock
+
+
+def synthetic_results(model, points):
+    results = []
+    for frequency, voltage in points:
+        stable = voltage >= model.required_voltage(frequency)
+        results.append({'frequency_mhz': frequency, 'core_voltage_mv': voltage, 'stable': stable,
+                        'hashrate_ghs': model.hashrate_per_mhz * frequency if stable else 0.0,
+                        'power_w': model.power(frequency, voltage)})
+    return results
+
+
+class TestSurrogateModel(unittest.TestCase):
+    def setUp(self):
+        self.chip = ChipModel()
+        points = [(600, 1100), (650, 1100), (700, 1100), (700, 1125), (750, 1125),
+                  (750, 1150), (800, 1175), (850, 1175), (850, 1200)]
+        self.model = bso.SurrogateModel('hashrate')
+        self.model.fit(synthetic_results(self.chip, points))
+
+    def test_stability_boundary(self):
+        self.assertGreater(self.model.stability(650, 1200), 0.9)
+        self.assertLess(self.model.stability(850, 1100), 0.1)
+
+    def test_performance_surface(self):
+        hashrate, power = self.model.predict(775, 1175)
+        self.assertAlmostEqual(hashrate, self.chip.hashrate_per_mhz * 775, delta=20)
+        self.assertAlmostEqual(power, self.chip.power(775, 1175), delta=0.5)
+
+    def test_dominated_points(self):
+        # Faster at lower voltage than an unstable point, or slower at higher voltage than a stable one
+        self.assertTrue(self.model.dominated(725, 1100))
+        self.assertTrue(self.model.dominated(650, 1125))
+        self.assertFalse(self.model.dominated(825, 1200))
+
+    def test_expected_improvement_favours_unexplored_gain(self):
+        self.assertGreater(self.model.expected_improvement(825, 1200), self.model.expected_improvement(600, 1200))
+
+
+class TestSurrogateSweep(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=1)).start()
+
+    def tearDown(self):
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_reaches_optimum_with_fewer_tests_than_grid(self):
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        with mock.patch.object(overclocker, "require_user_confirmation", return_value=True):
+            self.assertTrue(overclocker.surrogate_search())
+
+        # A stable point at the top of the frontier (their mean hashrates are within the noise)
+        self.assertGreaterEqual(max(r['frequency_mhz'] for r in overclocker.results if r['stable']), 825)
+        # The progressive sweep needs 15 points on the same simulated chip
+        self.assertLessEqual(len(overclocker.results), 8)
+        self.assertTrue(all(r['notes'].startswith('surrogate_') for r in overclocker.results))
+        self.assertTrue(all(r['core_voltage_mv'] <= bso.SAFETY_CONFIG['cv_end'] for r in overclocker.results))
+
+    def test_raises_voltage_when_starting_point_is_unstable(self):
+        self.simulator.stop()
+        chip = ChipModel(base_voltage=1130, knee_frequency=550)
+        self.simulator = AxeOSSimulator(SimulatedMiner(chip, clock=self.clock, seed=1)).start()
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        # The error-rate check fails the unstable point before its efficiency trips the safety stop
+        with mock.patch.object(overclocker, "require_user_confirmation", return_value=True), \
+                mock.patch.dict(bso.SAFETY_CONFIG, {'max_reject_rate': 0.5, 'max_asic_error_rate': 6.0}):
+            self.assertTrue(overclocker.surrogate_search())
+
+        start = bso.SAFETY_CONFIG['freq_start']
+        first = overclocker.results[0]
+        self.assertEqual((first['frequency_mhz'], first['core_voltage_mv'], first['stable']),
+                         (start, bso.SAFETY_CONFIG['cv_start'], False))
+        stable = [r for r in overclocker.results if r['stable']]
+        self.assertTrue(stable)
+        self.assertGreaterEqual(min(r['core_voltage_mv'] for r in stable), chip.required_voltage(start))
+
+
+if __name__ == '__main__':
+    unittest.main()
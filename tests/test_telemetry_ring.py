@@ -0,0 +1,75 @@
+import copy
+import dataclasses
+import pickle
+import unittest
+from datetime import datetime
+
+import src.bitaxe_safe_overclock as bso
+
+START = 1757523600.0  # 2025-09-10T17:00:00
+
+
+def state(seconds, hashrate=1290.5, temperature=55.0):
+    return bso.MinerState(frequency=600, core_voltage=1100, temperature=temperature, vr_temperature=50.0,
+                          hash_rate=hashrate, power=16.0, shares_accepted=seconds // 10, shares_rejected=1,
+                          uptime=seconds, timestamp=START + seconds)
+
+
+class TestMinerState(unittest.TestCase):
+    def test_frozen_record_with_epoch_timestamp(self):
+        sample = state(0)
+        self.assertEqual(sample.timestamp, START)
+        self.assertEqual(sample.efficiency, 1290.5 / 16.0)
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            sample.hash_rate = 0
+        moment = datetime(2025, 9, 10, 17, 0, 5)
+        converted = dataclasses.replace(sample, timestamp=moment)
+        self.assertEqual(converted.timestamp, moment.timestamp())
+        self.assertEqual(converted.isotime(), "2025-09-10T17:00:05")
+        self.assertIsInstance(bso.MinerState.from_system_info({'hashRate': 1000, 'power': 0}).timestamp, float)
+
+
+    def test_slotted_on_every_python_version(self):
+        sample = state(0)
+        self.assertFalse(hasattr(sample, '__dict__'))
+        self.assertEqual(bso.MinerState.__slots__, tuple(f.name for f in dataclasses.fields(bso.MinerState)))
+        with self.assertRaises(AttributeError):
+            object.__setattr__(sample, 'extra', 1)
+        self.assertEqual(pickle.loads(pickle.dumps(sample)), sample)
+        self.assertEqual(copy.deepcopy(sample), sample)
+
+
+class TestTelemetryRing(unittest.TestCase):
+    def test_wraps_at_capacity_with_flat_memory(self):
+        ring = bso.TelemetryRing(capacity=100)
+        sizes = {name: values.buffer_info() for name, values in ring.arrays.items()}
+        for seconds in range(0, 5000, 5):
+            ring.append(state(seconds, hashrate=seconds))
+        self.assertEqual(len(ring), 100)
+        self.assertEqual({name: values.buffer_info() for name, values in ring.arrays.items()}, sizes)
+        self.assertEqual(list(ring.column('hash_rate')), [float(s) for s in range(4500, 5000, 5)])
+        self.assertEqual(ring.latest(), state(4995, hashrate=4995))
+
+    def test_window_statistics(self):
+        ring = bso.TelemetryRing(capacity=100)
+        self.assertIsNone(ring.latest())
+        self.assertEqual(len(ring.column('hash_rate', 60)), 0)
+        for seconds in range(0, 300, 5):
+            ring.append(state(seconds, hashrate=1000 + seconds, temperature=50 + seconds / 10))
+        window = ring.stats('hash_rate', 60)
+        self.assertEqual(len(window), 13)       # 235..295
+        self.assertEqual((window.min, window.max), (1235.0, 1295.0))
+        self.assertAlmostEqual(window.mean, 1265.0)
+        self.assertEqual(ring.stats('temperature').max, 50 + 295 / 10)
+
+    def test_snapshot_cache_feeds_history(self):
+        ring = bso.TelemetryRing(capacity=10)
+        cache = bso.SnapshotCache(history=ring)
+        cache.put(state(0))
+        cache.update(temperature=70.0)      # Patch of the cached snapshot, not a new sample
+        cache.put(state(5))
+        self.assertEqual(list(ring.column('timestamp')), [START, START + 5])
+
+
+if __name__ == '__main__':
+    unittest.main()
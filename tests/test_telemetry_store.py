@@ -0,0 +1,115 @@
+import os
+import tempfile
+import unittest
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, SimulatedMiner, VirtualClock
+from src.telemetry_store import TelemetryReader, TelemetryWriter
+
+START = 1757523600.0  # 2025-09-10T17:00:00
+
+
+def state(seconds, hashrate=1290.5):
+    return bso.MinerState(frequency=600, core_voltage=1100, temperature=55.25, vr_temperature=50.0,
+                          hash_rate=hashrate, power=15.5, shares_accepted=seconds // 10, shares_rejected=1,
+                          uptime=seconds, fan_speed=-1, timestamp=START + seconds)
+
+
+class TestTelemetryStore(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "telemetry.bxt")
+        self.clock = VirtualClock(start=0)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write(self, samples, **kwargs):
+        with TelemetryWriter(self.path, "10.0.0.1", clock=self.clock, **kwargs) as writer:
+            for seconds in samples:
+                writer.append(state(seconds, hashrate=1000 + seconds))
+
+    def test_round_trip(self):
+        for compress in (False, True):
+            with self.subTest(compress=compress):
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                self.write(range(0, 5000, 5), chunk_rows=64, compress=compress)
+                with TelemetryReader(self.path) as reader:
+                    self.assertEqual(len(reader), 1000)
+                    self.assertEqual(reader.miner_ip, "10.0.0.1")
+                    hashrates = reader.column('hash_rate')
+                    self.assertEqual(hashrates[0], 1000.0)
+                    self.assertEqual(hashrates[-1], 1000.0 + 4995)
+                    self.assertEqual(reader.column('shares_accepted')[-1], 499)
+                    self.assertEqual(reader.column('fan_speed')[0], 0)     # Clamped to the column type
+                    window = reader.window(START + 100, START + 200)
+                    self.assertEqual(list(window['timestamp']), [START + s for s in range(100, 201, 5)])
+
+    def test_smaller_than_csv_and_zero_copy(self):
+        self.write(range(0, 5000, 5))
+        self.assertLess(os.path.getsize(self.path) / 1000, 50)
+        with TelemetryReader(self.path) as reader:
+            chunk = next(reader.chunks())
+            self.assertIsInstance(chunk['power'], memoryview)
+            self.assertEqual(chunk['power'].format, 'f')
+            self.assertEqual(chunk['power'][0], 15.5)
+            del chunk
+
+    def test_flush_by_size_and_time(self):
+        writer = TelemetryWriter(self.path, chunk_rows=3, flush_interval=60, clock=self.clock)
+        def rows():
+            with TelemetryReader(self.path) as reader:
+                return len(reader)
+        for seconds in (0, 5):
+            writer.append(state(seconds))
+        self.assertEqual(rows(), 0)
+        writer.append(state(10))
+        self.assertEqual(rows(), 3)
+        writer.append(state(15))
+        self.clock.advance(61)
+        writer.append(state(20))
+        self.assertEqual(rows(), 5)
+        writer.close()
+
+    def test_torn_chunk_dropped_on_reopen(self):
+        self.write(range(0, 50, 5), chunk_rows=5)
+        complete = os.path.getsize(self.path)
+        with open(self.path, "ab") as store:
+            store.write(b"CHNK\x05\x00\x00\x00")   # Crash in the middle of a chunk write
+        with TelemetryReader(self.path) as reader:
+            self.assertEqual(len(reader), 10)
+        self.write(range(50, 75, 5), chunk_rows=5)
+        self.assertGreater(os.path.getsize(self.path), complete)
+        with TelemetryReader(self.path) as reader:
+            self.assertEqual(list(reader.column('timestamp')), [START + s for s in range(0, 75, 5)])
+
+
+class TestMonitorStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=1)).start()
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_monitor_writes_store_instead_of_csv(self):
+        from examples.monitor_performance import PerformanceMonitor
+
+        with TelemetryWriter("perf.bxt", self.simulator.address, clock=self.clock) as store:
+            monitor = PerformanceMonitor(self.simulator.address, clock=self.clock, store=store)
+            monitor.monitor(interval=5, duration=3600)
+        self.assertEqual([name for name in os.listdir(".") if not name.endswith(".log")], ["perf.bxt"])
+        with TelemetryReader("perf.bxt") as reader:
+            self.assertGreaterEqual(len(reader), 720)
+            self.assertEqual(set(reader.column('frequency')), {525})
+
+
+if __name__ == '__main__':
+    unittest.main()
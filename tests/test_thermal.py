@@ -0,0 +1,81 @@
+import math
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, SimulatedMiner, VirtualClock
+
+
+def step_response(t, start=55.0, steady=75.0, tau=90.0):
+    return steady + (start - steady) * math.exp(-t / tau)
+
+
+class TestThermalModel(unittest.TestCase):
+    def test_extrapolates_steady_state_early(self):
+        model = bso.ThermalModel(tau=90.0)
+        for t in range(0, 26, 5):
+            model.add(t, round(step_response(t) * 8) / 8)  # 0.125°C sensor resolution
+        self.assertAlmostEqual(model.steady_state(), 75.0, delta=1.0)
+
+    def test_learns_time_constant(self):
+        model = bso.ThermalModel(tau=30.0)
+        for _ in range(4):
+            for t in range(0, 301, 10):
+                model.add(t, step_response(t, tau=120.0))
+            model.reset()
+        self.assertAlmostEqual(model.tau, 120.0, delta=10.0)
+
+    def test_needs_a_few_samples(self):
+        model = bso.ThermalModel(tau=90.0)
+        model.add(0, 55.0)
+        self.assertIsNone(model.steady_state())
+
+
+class TestThermalFeasibility(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        self.simulator = AxeOSSimulator(SimulatedMiner(clock=self.clock, seed=3, fan_speed=25)).start()
+        self.overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        self.clock.advance(600)
+
+    def tearDown(self):
+        bso.close_transports()
+        self.simulator.stop()
+
+    def test_doomed_point_ends_early(self):
+        miner = self.simulator.miner
+        limit = 75
+        self.assertGreater(miner.steady_temperature(miner.model.power(800, 1200)), limit + 5)
+        started = self.clock.monotonic()
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'max_temperature': limit, 'fan_control_enabled': False}):
+            stable = self.overclocker.test_point(800, 1200, 'ok', 'ko')
+
+        self.assertFalse(stable)
+        self.assertEqual(self.overclocker.results[-1]['notes'], 'thermally_infeasible')
+        self.assertFalse(self.overclocker.emergency_stop)
+        # Stopped well before the limit was reached, instead of after a 5-minute test
+        self.assertLess(self.clock.monotonic() - started, 60)
+        self.assertLess(miner.temperature, limit)
+
+    def test_final_apply_starts_a_new_thermal_point(self):
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'max_temperature': 75, 'fan_control_enabled': False}):
+            self.assertFalse(self.overclocker.test_point(800, 1200, 'ok', 'ko'))
+            self.overclocker.results.append({**self.overclocker.results[-1], 'frequency_mhz': 600,
+                                             'core_voltage_mv': 1100, 'stable': True, 'notes': 'ok',
+                                             'hashrate_ghs': 1290.0, 'temperature_c': 60.0})
+            started = self.clock.monotonic()
+            with mock.patch.object(self.overclocker, "require_user_confirmation", return_value=True):
+                self.assertTrue(self.overclocker.apply_best_settings())
+        # The infeasible verdict of the last swept point does not cut the settle short
+        self.assertIsNone(self.overclocker.thermal_infeasible)
+        self.assertGreaterEqual(self.overclocker.thermal_started, started)
+
+    def test_feasible_point_runs_in_full(self):
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'fan_control_enabled': False}):
+            self.assertTrue(self.overclocker.test_point(600, 1100, 'ok', 'ko'))
+        self.assertIsNone(self.overclocker.thermal_infeasible)
+        self.assertEqual(self.overclocker.results[-1]['samples'], bso.sample_schedule()[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
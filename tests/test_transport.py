@@ -0,0 +1,59 @@
+import unittest
+
+from src.axeos_simulator import VirtualClock
+from src.bitaxe_safe_overclock import MinerTransport, get_transport, close_transports
+from tests.stub_miner import StubMiner, StubMinerHandler
+
+
+class _KeepAliveHandler(StubMinerHandler):
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        type(self).connections += 1
+
+    def info(self):
+        return {"frequency": 600, "coreVoltage": 1150}
+
+    def patch(self, data):
+        return data
+
+
+class TestMinerTransport(unittest.TestCase):
+    def setUp(self):
+        _KeepAliveHandler.connections = 0
+        self.miner = StubMiner(_KeepAliveHandler)
+        self.host = self.miner.address
+
+    def tearDown(self):
+        close_transports()
+        self.miner.stop()
+
+    def test_requests_reuse_one_connection(self):
+        with MinerTransport(self.host) as transport:
+            for _ in range(5):
+                self.assertEqual(transport.get("/api/system/info").json()["frequency"], 600)
+            self.assertEqual(transport.patch("/api/system", data={"frequency": 625}).json(), {"frequency": 625})
+        self.assertEqual(_KeepAliveHandler.connections, 1)
+
+    def test_per_endpoint_timeouts(self):
+        transport = MinerTransport(self.host, endpoint_timeouts={"/api/system/info": 2})
+        self.assertEqual(transport.timeout_for("/api/system/info")[1], 2)
+        self.assertEqual(transport.timeout_for("/api/unknown")[1], 10)
+        transport.close()
+
+    def test_shared_transport_per_miner(self):
+        self.assertIs(get_transport(self.host), get_transport(self.host))
+        self.assertIsNot(get_transport(self.host), get_transport("127.0.0.2"))
+
+    def test_breaker_runs_on_the_callers_clock(self):
+        clock = VirtualClock(start=0)
+        shared = get_transport(self.host)
+        transport = get_transport(self.host, clock)
+        self.assertIsNot(transport, shared)
+        self.assertIs(transport.breaker.clock, clock)
+        self.assertIs(get_transport(self.host, clock), transport)
+
+
+if __name__ == '__main__':
+    unittest.main()
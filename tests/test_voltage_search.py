@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+
+from src.bitaxe_safe_overclock import BitAxeSafeOverclock, SAFETY_CONFIG
+
+
+class TestVoltageSearch(unittest.TestCase):
+    def setUp(self):
+        self.overclocker = BitAxeSafeOverclock("127.0.0.1:1")
+        self.tested = []
+
+    def search(self, min_stable, low=1000, high=1200, known_unstable=None, mode='bisection'):
+        def fake_test_point(frequency, core_voltage, stable_note, unstable_note):
+            self.tested.append(core_voltage)
+            return core_voltage >= min_stable
+
+        config = {'voltage_search': mode, 'cv_step': 25, 'cv_resolution': 5,
+                  'min_voltage': 1000, 'max_voltage': 1220, 'cv_danger_threshold': 1150}
+        with mock.patch.dict(SAFETY_CONFIG, config), \
+                mock.patch.object(self.overclocker, 'test_point', side_effect=fake_test_point), \
+                mock.patch.object(self.overclocker, 'require_user_confirmation', return_value=True) as confirm:
+            found = self.overclocker.find_min_stable_voltage(700, low, high, 'ok', 'ko', known_unstable)
+        return found, confirm
+
+    def test_bisection_finds_boundary_at_resolution(self):
+        found, _ = self.search(min_stable=1137)
+        self.assertEqual(found, 1140)
+        # Gallop (4 points) + log2(100/5) bisection steps, at 5mV instead of 25mV resolution
+        self.assertLessEqual(len(self.tested), 9)
+
+    def test_linear_mode_unchanged(self):
+        found, _ = self.search(min_stable=1137, mode='linear')
+        self.assertEqual(found, 1150)
+        self.assertEqual(self.tested, list(range(1000, 1151, 25)))
+
+    def test_known_unstable_seeds_bracket(self):
+        found, _ = self.search(min_stable=1112, low=1125, known_unstable=1100)
+        self.assertEqual(found, 1115)
+        self.assertEqual(self.tested[0], 1125)
+
+    def test_no_stable_voltage(self):
+        found, _ = self.search(min_stable=1300)
+        self.assertIsNone(found)
+        self.assertEqual(max(self.tested), 1200)
+
+    def test_dangerous_voltage_confirmed_once_per_frequency(self):
+        found, confirm = self.search(min_stable=1152, low=1100, known_unstable=1075)
+        self.assertEqual(found, 1155)
+        self.assertEqual(confirm.call_count, 1)
+
+    def test_hard_limit_is_respected(self):
+        found, _ = self.search(min_stable=1250, high=1300)
+        self.assertIsNone(found)
+        self.assertTrue(all(v <= 1220 for v in self.tested))
+
+
+if __name__ == '__main__':
+    unittest.main()
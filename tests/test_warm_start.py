@@ -0,0 +1,130 @@
+import csv
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import src.bitaxe_safe_overclock as bso
+from src.axeos_simulator import AxeOSSimulator, ChipModel, SimulatedMiner, VirtualClock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestReadResults(unittest.TestCase):
+    def test_reads_older_files_without_samples(self):
+        results = bso.read_results_csv(os.path.join(REPO_DIR, "bitaxe_safe_tuning_results_20250910_222850.csv"))
+        self.assertGreater(len(results), 0)
+        first = results[0]
+        self.assertEqual((first['frequency_mhz'], first['core_voltage_mv']), (600, 1100))
+        self.assertIs(first['stable'], True)
+        self.assertIsNone(first['samples'])
+        self.assertIn(False, [r['stable'] for r in results])
+
+    def test_skips_rows_of_other_miners(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "fleet.csv")
+            with open(filename, "w", newline="") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=['miner_ip'] + bso.RESULT_FIELDNAMES)
+                writer.writeheader()
+                for ip in ("10.0.0.1", "10.0.0.2"):
+                    writer.writerow({'miner_ip': ip, 'frequency_mhz': 600, 'core_voltage_mv': 1100,
+                                     'stable': True, 'samples': 10})
+            results = bso.read_results_csv(filename, "10.0.0.2")
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['samples'], 10)
+
+
+class TestKnownVerdict(unittest.TestCase):
+    def setUp(self):
+        self.overclocker = bso.BitAxeSafeOverclock("127.0.0.1:1")
+        self.overclocker.prior_verdicts = {
+            (600, 1100): True, (625, 1100): True, (650, 1100): False,
+            (650, 1125): True, (675, 1125): False,
+        }
+
+    def test_interior_points_are_known(self):
+        self.assertIs(self.overclocker.known_verdict(600, 1100), True)
+        self.assertIs(self.overclocker.known_verdict(625, 1150), True)
+        self.assertIs(self.overclocker.known_verdict(700, 1100), False)
+
+    def test_frontier_points_are_retested(self):
+        self.assertIsNone(self.overclocker.known_verdict(625, 1100))
+        self.assertIsNone(self.overclocker.known_verdict(650, 1100))
+        self.assertIsNone(self.overclocker.known_verdict(650, 1125))
+
+    def test_cold_start_tests_everything(self):
+        self.overclocker.prior_verdicts = {}
+        self.assertIsNone(self.overclocker.known_verdict(600, 1100))
+
+
+class TestBestAfterWarmStart(unittest.TestCase):
+    def row(self, frequency, core_voltage, hashrate, power, stable=True):
+        return {'timestamp': '2025-09-10T22:00:00', 'frequency_mhz': frequency, 'core_voltage_mv': core_voltage,
+                'hashrate_ghs': hashrate, 'temperature_c': 55.0, 'power_w': power, 'stable': stable,
+                'cv': 0.01, 'notes': 'progressive_freq_test', 'samples': 10}
+
+    def test_known_interior_point_can_be_selected(self):
+        overclocker = bso.BitAxeSafeOverclock("127.0.0.1:1")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "prior.csv")
+            with open(filename, "w", newline="") as csvfile:
+                writer = csv.DictWriter(csvfile, fieldnames=bso.RESULT_FIELDNAMES)
+                writer.writeheader()
+                # 625/1100 is the most efficient point and lies inside the stable region
+                writer.writerows([self.row(600, 1100, 1200, 15.0), self.row(625, 1100, 1300, 15.2),
+                                  self.row(650, 1100, 1300, 16.0, stable=False),
+                                  self.row(650, 1125, 1390, 17.5), self.row(675, 1125, 1400, 18.5, stable=False)])
+            overclocker.warm_start([filename])
+        self.assertIs(overclocker.known_verdict(625, 1125), True)
+        criteria = {'objective': 'efficiency'}
+
+        # Every point already known: nothing re-tested, the prior results still count
+        best = overclocker.find_best_settings(**criteria)
+        self.assertEqual((best['frequency'], best['core_voltage']), (625, 1100))
+
+        # Only the boundary re-tested: the known interior point still wins
+        overclocker.record_result(self.row(650, 1125, 1385, 17.6), journal=False)
+        best = overclocker.find_best_settings(**criteria)
+        self.assertEqual((best['frequency'], best['core_voltage']), (625, 1100))
+
+
+class TestWarmStartSweep(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(start=0)
+        # Sharp stability boundary, so points near it get the same verdict in both runs
+        chip = ChipModel(instability_noise=0.05)
+        self.simulator = AxeOSSimulator(SimulatedMiner(chip, clock=self.clock, seed=2)).start()
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+        bso.close_transports()
+        self.simulator.stop()
+
+    def sweep(self, warm_start):
+        overclocker = bso.BitAxeSafeOverclock(self.simulator.address, clock=self.clock)
+        if warm_start:
+            self.assertGreater(overclocker.warm_start(), 0)
+        with mock.patch.object(overclocker, "require_user_confirmation", return_value=True), \
+                mock.patch("builtins.input", return_value="2"):
+            overclocker.run_overclock_sweep()
+        self.clock.advance(1)  # Distinct results filename
+        return overclocker
+
+    def test_retune_only_retests_frontier(self):
+        # 850MHz needs 1204.5mV on the simulated chip: keep marginal points out of the grid
+        with mock.patch.dict(bso.SAFETY_CONFIG, {'freq_end': 825, 'min_efficiency': 0}):
+            cold = self.sweep(warm_start=False)
+            warm = self.sweep(warm_start=True)
+        self.assertLess(len(warm.results), len(cold.results) * 2 / 3)
+        top = lambda sweep: max(r['frequency_mhz'] for r in sweep.results if r['stable'])
+        self.assertEqual(top(warm), top(cold))
+        # Points well inside the stable region are not re-tested
+        self.assertNotIn((600, 1100), [(r['frequency_mhz'], r['core_voltage_mv']) for r in warm.results])
+
+
+if __name__ == '__main__':
+    unittest.main()